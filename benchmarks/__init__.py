@@ -0,0 +1,6 @@
+"""Benchmark suite for the Project Gantt Chart Manager backend
+
+generate_workbook, generate_transcript and generate_audio build synthetic inputs, stub_whisper
+stands in for the OpenAI transcription API and run drives the endpoints and analysis functions.
+Run it from the repository root: python -m benchmarks.run
+"""
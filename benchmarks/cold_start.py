@@ -0,0 +1,54 @@
+"""Cold start: time `import main` (which builds the app) in fresh interpreters
+
+Prints the import times and any library that main.py loads lazily (pandas, openpyxl, dateutil,
+openai, ...) but that was imported anyway. The budget itself is checked by
+tests/test_cold_start.py.
+
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Import time budget in seconds; FastAPI and pydantic alone take most of it
+COLD_START_BUDGET_SECONDS = float(os.environ.get("COLD_START_BUDGET_SECONDS", 1.2))
+LAZY_MODULES = ("pandas", "numpy", "openpyxl", "dateutil.parser", "openai", "httpx")
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+main.app
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "loaded": [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def measure_cold_start(runs: int = 5) -> Tuple[List[float], List[str]]:
+    """Import times of `runs` fresh interpreters and the lazy modules any of them loaded"""
+    env = dict(os.environ, LOG_LEVEL="WARNING")
+    # Compile once up front, so the first run does not pay for writing the bytecode cache
+    subprocess.run([sys.executable, "-m", "py_compile", os.path.join(REPO_ROOT, "main.py")], check=True)
+    timings, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO_ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        timings.append(probe["seconds"])
+        loaded.update(probe["loaded"])
+    return timings, sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    timings, loaded = measure_cold_start(args.runs)
+    print(f"import main: median {statistics.median(timings):.3f}s, max {max(timings):.3f}s over {len(timings)} runs "
+          f"(budget {COLD_START_BUDGET_SECONDS:.3f}s)")
+    print(f"lazy libraries imported at startup: {', '.join(loaded) or 'none'}")
+
+if __name__ == "__main__":
+    main()
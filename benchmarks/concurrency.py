@@ -0,0 +1,108 @@
+"""Event-loop responsiveness: GET / and POST /upload-excel latency while audio requests are in flight
+
+Starts the stub Whisper server with a long latency and the app under uvicorn, measures the
+probes on an idle server, then again while --audio /process-audio requests wait on the stub
+(each finished one is replaced until the probes are done). Transcription, parsing and file
+I/O run in the worker pools, so the busy latencies should stay close to the idle ones; prints
+p50/p99 of both and exits with status 1 when a busy p50 is more than --max-slowdown times
+the idle p50.
+
+    python -m benchmarks.concurrency --audio 8 --whisper-latency 2 --rows 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.generate_audio import generate_wav
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.run import XLSX_TYPE, percentile, workbook_variant
+from benchmarks.server import serve_app
+from benchmarks.stub_whisper import start_stub_whisper
+
+async def probe(client: httpx.AsyncClient, workbook: bytes, probes: int) -> Dict[str, List[float]]:
+    """Latencies of `probes` GET / and `probes` uploads of a new workbook variant, one at a time"""
+    latencies = {"GET /": [], "POST /upload-excel": []}
+    for number in range(probes):
+        started = time.perf_counter()
+        (await client.get("/")).raise_for_status()
+        latencies["GET /"].append(time.perf_counter() - started)
+        data = workbook_variant(workbook, int(time.monotonic() * 1000) * 1000 + number)  # Never cached
+        started = time.perf_counter()
+        response = await client.post("/upload-excel", headers={"X-Session-Id": f"probe-{number}"},
+                                     files={"file": ("planning.xlsx", data, XLSX_TYPE)})
+        response.raise_for_status()
+        latencies["POST /upload-excel"].append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+    return latencies
+
+async def measure_responsiveness(url: str, workbook: bytes, audio: int, audio_seconds: float,
+                                 probes: int) -> dict:
+    """Probe latencies idle and with `audio` /process-audio requests in flight"""
+    async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+        await probe(client, workbook, 1)  # Warm up the pools and the lazy imports
+        idle = await probe(client, workbook, probes)
+
+        recordings = iter(generate_wav(audio_seconds, seed=seed) for seed in range(10 ** 6))
+        stop = asyncio.Event()
+        transcribed = []
+
+        async def transcribe():
+            while not stop.is_set():
+                response = await client.post("/process-audio", headers={"X-Session-Id": "probe-0"},
+                                             files={"audio_file": ("meeting.wav", next(recordings), "audio/wav")})
+                response.raise_for_status()
+                transcribed.append(response.json()["transcript"])
+
+        in_flight = [asyncio.ensure_future(transcribe()) for _ in range(audio)]
+        await asyncio.sleep(0.5)  # Let the audio requests reach the stub
+        busy = await probe(client, workbook, probes)
+        stop.set()
+        await asyncio.gather(*in_flight)
+    return {"idle": idle, "busy": busy, "transcribed": len(transcribed)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio", type=int, default=8, help="Concurrent /process-audio requests (default: 8)")
+    parser.add_argument("--whisper-latency", type=float, default=2.0,
+                        help="Seconds the stub Whisper server takes per request (default: 2)")
+    parser.add_argument("--audio-seconds", type=float, default=5.0, help="Length of each recording (default: 5)")
+    parser.add_argument("--rows", type=int, default=1000, help="Task rows of the probe workbook (default: 1000)")
+    parser.add_argument("--probes", type=int, default=20, help="Probes of each endpoint per phase (default: 20)")
+    parser.add_argument("--max-slowdown", type=float, default=3.0,
+                        help="Largest allowed busy/idle p50 ratio (default: 3)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix="gantt-concurrency-") as work_dir:
+        path = os.path.join(work_dir, "planning.xlsx")
+        generate_workbook(path, args.rows)
+        with open(path, "rb") as workbook_file:
+            workbook = workbook_file.read()
+        stub = start_stub_whisper(latency=args.whisper_latency)
+        try:
+            env = dict(os.environ, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"), OPENAI_API_KEY="sk-benchmark",
+                       OPENAI_BASE_URL=stub.url, TRANSCRIPT_CACHE_PATH="",
+                       SESSION_STATE_PATH=os.path.join(work_dir, "sessions.sqlite3"))
+            with serve_app(env) as url:
+                result = asyncio.run(measure_responsiveness(url, workbook, args.audio, args.audio_seconds, args.probes))
+        finally:
+            stub.shutdown()
+
+    print(f"{args.audio} audio requests in flight, {result['transcribed']} transcribed during the busy phase")
+    failed = False
+    for endpoint in result["idle"]:
+        idle, busy = sorted(result["idle"][endpoint]), sorted(result["busy"][endpoint])
+        slowdown = statistics.median(busy) / statistics.median(idle)
+        failed = failed or slowdown > args.max_slowdown
+        print(f"{endpoint:20} idle p50 {statistics.median(idle) * 1000:8.2f} ms  p99 {percentile(idle, 0.99) * 1000:8.2f} ms"
+              f"  busy p50 {statistics.median(busy) * 1000:8.2f} ms  p99 {percentile(busy, 0.99) * 1000:8.2f} ms"
+              f"  {slowdown:5.2f}x")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
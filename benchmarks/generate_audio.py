@@ -0,0 +1,45 @@
+"""Synthetic speech-like audio: 16 kHz mono 16-bit wav with syllable-rate tone bursts and noise
+
+Different seeds give different bytes, so uploads can be made to miss the transcript cache.
+
+    python -m benchmarks.generate_audio meeting.wav --seconds 60
+"""
+import argparse
+import io
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def generate_wav(seconds: float, seed: int = 0, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """wav file bytes of `seconds` of audio"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voice = np.sin(2 * np.pi * np.cumsum(pitch) / sample_rate) + 0.4 * np.sin(2 * np.pi * np.cumsum(2 * pitch) / sample_rate)
+    # About four syllables per second, with pauses between sentences
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.6)
+    signal = 0.5 * voice * envelope + 0.02 * rng.standard_normal(len(t))
+    samples = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="wav file to write")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.path, "wb") as wav_file:
+        wav_file.write(generate_wav(args.seconds, args.seed))
+    print(f"Wrote {args.seconds:g}s of audio to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Synthetic Dutch/English meeting transcripts
+
+Sentences mention tasks from a workbook next to status keywords, and include the action,
+progress, issue and date-change phrasings the transcript analysis looks for, mixed with filler.
+
+    python -m benchmarks.generate_transcript --words 5000
+"""
+import argparse
+import random
+from typing import Sequence
+
+# {task} is a task name from the workbook, {n} a percentage, {day} a day of the month
+TASK_SENTENCES = [
+    "{task} is klaar en kan naar acceptatie.",
+    "Voor {task} zijn we nog bezig met de laatste punten.",
+    "{task} is vertraagd omdat de leverancier te laat is.",
+    "Bij {task} hebben we een blokker in de koppeling.",
+    "The {task} work is done and signed off.",
+    "We are still working on {task} this sprint.",
+    "{task} is running behind, we expect a delay of two weeks.",
+    "There is an issue with {task} in the test environment.",
+]
+PATTERN_SENTENCES = [
+    "We moeten de planning van de migratie herzien.",
+    "Toewijzen testscripts aan het QA team.",
+    "Actie de stuurgroep informeren over de scope.",
+    "Rapportage is {n}% klaar.",
+    "Documentbeheer heeft al afgerond.",
+    "Probleem: de testomgeving is niet beschikbaar.",
+    "Vertraagd omdat de data nog niet is aangeleverd.",
+    "Nieuwe deadline: {day} augustus.",
+    "We passen de livegang aan naar {day} september.",
+    "Action item: update the release notes.",
+    "We need to align the rollout with the support team.",
+    "Onboarding is {n}% complete.",
+    "Blocker: the payment gateway sandbox is down.",
+    "Change to {day} october for the dashboard release.",
+    "Payments has been completed.",
+]
+FILLER_SENTENCES = [
+    "Goedemorgen allemaal, laten we beginnen met de updates.",
+    "Dan gaan we door naar het volgende punt op de agenda.",
+    "Heeft iemand nog vragen hierover?",
+    "Ik deel zo even mijn scherm.",
+    "Let's keep this short, we have a hard stop at eleven.",
+    "Thanks, that is clear for me.",
+    "Kunnen we dit offline verder bespreken?",
+    "Okay, next topic.",
+]
+
+def generate_transcript(words: int, task_names: Sequence[str] = (), seed: int = 0) -> str:
+    """A transcript of about `words` words; with task names, a third of the sentences mention one"""
+    rnd = random.Random(seed)
+    sentences = []
+    count = 0
+    while count < words:
+        roll = rnd.random()
+        if task_names and roll < 0.35:
+            template = rnd.choice(TASK_SENTENCES)
+        elif roll < 0.65:
+            template = rnd.choice(PATTERN_SENTENCES)
+        else:
+            template = rnd.choice(FILLER_SENTENCES)
+        sentence = template.format(task=rnd.choice(task_names) if task_names else "",
+                                   n=rnd.randrange(10, 100, 10), day=rnd.randint(1, 28))
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=1000, help="Approximate transcript length (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate_transcript(args.words, seed=args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Synthetic Gantt workbooks in the layout /upload-excel parses
+
+Row 1 holds the column headers and the next 8 rows the sheet header, then one task per row:
+item_id (column 0), name (1), team (3), start and end date (4-5), status (7) and completion (8).
+Item ids follow the planning outline ("3", "3.2", "3.2.1"), and like the sheets the service
+receives, a few rows are section headers or have free-text dates and percentages as text.
+
+    python -m benchmarks.generate_workbook planning.xlsx --rows 100000
+"""
+import argparse
+import datetime
+import random
+from typing import List
+
+import openpyxl
+
+COLUMN_HEADERS = ["ID", "Activiteiten", "Omschrijving", "Team", "Start", "Eind", "Duur", "Status", "Gereed"]
+SHEET_HEADER = [
+    ["Projectplanning", "Portfolio"],
+    ["Versie", "1.0"],
+    ["Eigenaar", "PMO"],
+    ["Periode", "2024-2026"],
+    ["Bijgewerkt", "wekelijks"],
+    ["Legenda", "Gereed in %"],
+    ["Opmerking", "Gegenereerd voor benchmarks"],
+    ["ID", "Activiteiten"],
+]
+ACTIVITIES = [
+    "Tussentijds opslaan", "Schademelding", "Polisadministratie", "Klantportaal", "Rapportage",
+    "Datamigratie", "Testautomatisering", "Documentbeheer", "Premieberekening", "Uitkeringen",
+    "Claims intake", "Customer onboarding", "Reporting dashboard", "Payment gateway",
+]
+PHASES = ["analyse", "ontwerp", "bouw", "test", "acceptatie", "livegang", "review", "training", "rollout"]
+TEAMS = ["Team Alpha", "Team Beta", "Team Gamma", "Team Delta", "Data", "Infra", "Security", None]
+STATUSES = ["Planning", "In Progress", "Completed", "Delayed", "Blocked", None]
+SECTION_NAMES = ["Generieke services", "Autoschade"]
+DUTCH_MONTHS = ["januari", "februari", "maart", "april", "mei", "juni", "juli", "augustus",
+                "september", "oktober", "november", "december"]
+# One section header row per this many task rows
+SECTION_EVERY = 500
+FIRST_DAY = datetime.datetime(2024, 1, 1)
+
+def _date_cell(rnd: random.Random, day: datetime.datetime):
+    """Mostly real dates; some Dutch or ISO text and a few empty cells"""
+    roll = rnd.random()
+    if roll < 0.85:
+        return day
+    if roll < 0.92:
+        return f"{day.day} {DUTCH_MONTHS[day.month - 1]} {day.year}"
+    if roll < 0.96:
+        return day.strftime("%Y-%m-%d")
+    return None
+
+def _completion_cell(rnd: random.Random, status: str):
+    if status == "Completed":
+        return 100
+    roll = rnd.random()
+    if roll < 0.8:
+        return rnd.randrange(0, 100, 5)
+    if roll < 0.9:
+        return f"{rnd.randrange(0, 100, 5)}%"
+    return None
+
+def generate_workbook(path: str, rows: int, seed: int = 0, sheets: int = 1) -> List[str]:
+    """Write a workbook with `rows` task rows per sheet to `path`; returns the task names in sheet order"""
+    rnd = random.Random(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    names = []
+    for number in range(sheets):
+        _write_sheet(workbook.create_sheet("Planning" if number == 0 else f"Planning {number + 1}"), rows, rnd, names)
+    workbook.save(path)
+    return names
+
+def _write_sheet(sheet, rows: int, rnd: random.Random, names: List[str]):
+    sheet.append(COLUMN_HEADERS)
+    for header_row in SHEET_HEADER:
+        sheet.append(header_row)
+
+    main_item, sub_item, sub_sub_item = 0, 0, 0
+    for row in range(rows):
+        if row % SECTION_EVERY == SECTION_EVERY - 1:
+            sheet.append([None, SECTION_NAMES[row // SECTION_EVERY % len(SECTION_NAMES)]])
+        # Roughly one main item per dozen rows, each with sub-activities and their own tasks
+        roll = rnd.random()
+        if main_item == 0 or roll < 0.08:
+            main_item, sub_item, sub_sub_item = main_item + 1, 0, 0
+            item_id = main_item
+        elif sub_item == 0 or roll < 0.35:
+            sub_item, sub_sub_item = sub_item + 1, 0
+            item_id = f"{main_item}.{sub_item}"
+        else:
+            sub_sub_item += 1
+            item_id = f"{main_item}.{sub_item}.{sub_sub_item}"
+        name = f"{rnd.choice(ACTIVITIES)} {rnd.choice(PHASES)} {item_id}"
+        names.append(name)
+
+        start = FIRST_DAY + datetime.timedelta(days=rnd.randrange(0, 720))
+        end = start + datetime.timedelta(days=rnd.randrange(1, 120))
+        status = rnd.choice(STATUSES)
+        sheet.append([
+            item_id, name, None, rnd.choice(TEAMS), _date_cell(rnd, start), _date_cell(rnd, end),
+            (end - start).days, status, _completion_cell(rnd, status),
+        ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Workbook to write (.xlsx)")
+    parser.add_argument("--rows", type=int, default=1000, help="Task rows per sheet (default: 1000)")
+    parser.add_argument("--sheets", type=int, default=1, help="Planning sheets (default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_workbook(args.path, args.rows, args.seed, args.sheets)
+    print(f"Wrote {args.sheets} x {args.rows} task rows to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Multi-worker load test: the app under uvicorn --workers N with shared session state
+
+Every planner uploads its own workbook and then edits and reads it in a loop: accepting
+proposals, moving task dates, listing the task it changed and downloading the json export.
+Each request opens a new connection, so a planner's consecutive requests land on different
+workers. Every read is checked against the planner's own edits; a stale read or a lost session
+is a failure and makes the run exit with status 1. Prints throughput and p50/p99 latency per
+worker count.
+
+    python -m benchmarks.multi_worker --workers 1,4 --planners 8 --requests 100
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Sequence
+
+import httpx
+
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.server import serve_app
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Share of the planner requests per operation
+OPERATIONS = (("accept", 0.4), ("read", 0.3), ("update", 0.2), ("download", 0.1))
+
+class Planner:
+    """One user editing their own session, remembering what every task should look like now"""
+
+    def __init__(self, client: httpx.AsyncClient, session_id: str, names: Sequence[str], seed: int):
+        self.client = client
+        self.headers = {"X-Session-Id": session_id}
+        self.names = names
+        self.rnd = random.Random(seed)
+        self.progress = {}  # item_id -> completed
+        self.dates = {}  # name -> (start, end)
+        self.latencies = []
+        self.failures = []
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.request(method, path, headers=self.headers, **kwargs)
+        self.latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            self.failures.append(f"{method} {path}: {response.status_code} {response.text[:200]}")
+        return response
+
+    async def accept(self):
+        item_id = self.rnd.choice(self.names).rsplit(" ", 1)[1]
+        progress = self.rnd.randrange(101)
+        response = await self.request("POST", "/accept-proposal", json={
+            "taskId": item_id, "proposedStatus": "In Progress", "proposedProgress": progress})
+        if response.status_code == 200:
+            self.progress[item_id] = progress
+
+    async def read(self):
+        if not self.progress:
+            return await self.accept()
+        item_id = self.rnd.choice(list(self.progress))
+        response = await self.request("GET", "/projects", params={"item_id": item_id})
+        if response.status_code == 200:
+            seen = {project["completed"] for project in response.json()["projects"]}
+            if seen != {self.progress[item_id]}:
+                self.failures.append(f"task {item_id}: completed {sorted(seen)}, expected {self.progress[item_id]}")
+
+    async def update(self):
+        name = self.rnd.choice(self.names)
+        start = datetime.date(2025, 1, 1) + datetime.timedelta(days=self.rnd.randrange(300))
+        end = start + datetime.timedelta(days=14)
+        response = await self.request("POST", "/update-excel", json=[{
+            "project_name": name, "task_name": name, "new_start_date": start.isoformat(),
+            "new_end_date": end.isoformat()}])
+        if response.status_code == 200:
+            self.dates[name] = (start.isoformat(), end.isoformat())
+
+    async def download(self):
+        response = await self.request("GET", "/download-excel", params={"format": "json"})
+        if response.status_code == 200:
+            self.check(response.json())
+
+    def check(self, projects: List[dict]):
+        """Compare an export with every edit made so far"""
+        for project in projects:
+            expected = self.progress.get(project["item_id"])
+            if expected is not None and project["completed"] != expected:
+                self.failures.append(f"export task {project['item_id']}: completed {project['completed']}, expected {expected}")
+            dates = self.dates.get(project["name"])
+            if dates is not None and (project["start_date"], project["end_date"]) != dates:
+                self.failures.append(f"export task {project['name']!r}: dates {project['start_date']}..{project['end_date']}, "
+                                     f"expected {dates[0]}..{dates[1]}")
+
+    async def run(self, requests: int):
+        operations = [getattr(self, name) for name, _ in OPERATIONS]
+        weights = [share for _, share in OPERATIONS]
+        for _ in range(requests):
+            await self.rnd.choices(operations, weights)[0]()
+        # Whichever worker answers last must have all of this planner's edits
+        await self.download()
+
+async def run_load(url: str, data: bytes, names: Sequence[str], planners: int, requests: int, seed: int = 0) -> dict:
+    """Upload one workbook per planner, run the planners side by side; latencies, failures and workers seen"""
+    # No keep-alive: every request gets its own connection and so, potentially, its own worker
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        group = [Planner(client, f"planner-{seed}-{n}", names, seed * 1000 + n) for n in range(planners)]
+        for planner in group:
+            response = await client.post("/upload-excel", headers=planner.headers,
+                                         files={"file": ("planning.xlsx", data, XLSX_TYPE)})
+            response.raise_for_status()
+        started = time.perf_counter()
+        await asyncio.gather(*(planner.run(requests) for planner in group))
+        elapsed = time.perf_counter() - started
+        workers = set()
+        for _ in range(4 * planners):
+            stats = (await client.get("/sessions/stats")).json()
+            workers.add(stats.get("worker_pid"))
+    return {
+        "latencies": [latency for planner in group for latency in planner.latencies],
+        "failures": [failure for planner in group for failure in planner.failures],
+        "elapsed": elapsed,
+        "workers_seen": len(workers),
+    }
+
+async def measure_workers(worker_counts: Sequence[int], rows: int, planners: int, requests: int,
+                          work_dir: str, seed: int = 0) -> Dict[int, dict]:
+    """run_load against a fresh server per worker count, each with its own shared state database"""
+    path = os.path.join(work_dir, f"planning-{rows}.xlsx")
+    names = generate_workbook(path, rows, seed=seed)
+    with open(path, "rb") as workbook_file:
+        data = workbook_file.read()
+    results = {}
+    for workers in worker_counts:
+        env = dict(os.environ, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+                   SESSION_STATE_PATH=os.path.join(work_dir, f"sessions-{workers}.sqlite3"))
+        with serve_app(env, workers) as url:
+            results[workers] = await run_load(url, data, names, planners, requests, seed)
+    return results
+
+def summarize(latencies: List[float]) -> str:
+    centiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return f"p50 {centiles[49] * 1000:8.2f} ms  p99 {centiles[98] * 1000:8.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default=f"1,{max(2, min(4, os.cpu_count() or 1))}",
+                        help="Comma-separated uvicorn worker counts (default: 1 and the CPU count, 2 to 4)")
+    parser.add_argument("--rows", type=int, default=1000, help="Workbook size (default: 1000)")
+    parser.add_argument("--planners", type=int, default=8, help="Concurrent planners, one session each (default: 8)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per planner (default: 100)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(",") if count.strip()]
+    with tempfile.TemporaryDirectory(prefix="gantt-workers-") as work_dir:
+        results = asyncio.run(measure_workers(worker_counts, args.rows, args.planners, args.requests, work_dir, args.seed))
+    failed = False
+    for workers, result in results.items():
+        throughput = len(result["latencies"]) / result["elapsed"]
+        print(f"workers={workers} (answered by {result['workers_seen']}): {throughput:8.2f} req/s  "
+              f"{summarize(result['latencies'])}  failures {len(result['failures'])}")
+        for failure in result["failures"][:10]:
+            print(f"  FAIL: {failure}")
+        failed = failed or bool(result["failures"])
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Portfolio ingestion scaling: POST /upload-portfolio with a ZIP of generated workbooks per parse pool size
+
+Every third workbook has two planning sheets, and one archive member is not a workbook at
+all, so the per-file error report is exercised too. The app runs once per PARSE_POOL_SIZE;
+prints the wall time, the summed parse time and the speedup over the first pool size. Exits
+with status 1 when a workbook fails to parse or projects go missing.
+
+    python -m benchmarks.portfolio --pool-sizes 1,4 --workbooks 24 --rows 2000
+"""
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Dict, Sequence
+
+import httpx
+
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.server import serve_app
+
+BROKEN_MEMBER = "notes/broken.xlsx"
+
+def build_portfolio(work_dir: str, workbooks: int, rows: int, seed: int = 0) -> bytes:
+    """ZIP of `workbooks` generated workbooks in two folders plus one unreadable member"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for number in range(workbooks):
+            path = os.path.join(work_dir, f"portfolio-{number}.xlsx")
+            generate_workbook(path, rows, seed=seed + number, sheets=2 if number % 3 == 2 else 1)
+            archive.write(path, f"{('finance', 'operations')[number % 2]}/planning {number}.xlsx")
+        archive.writestr(BROKEN_MEMBER, b"not a workbook")
+    return buffer.getvalue()
+
+async def upload_portfolio(url: str, data: bytes, expected_projects: int, runs: int) -> dict:
+    """Upload the portfolio `runs` times; wall times, parse times and failures"""
+    latencies, parse_seconds, failures = [], [], []
+    async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+        for run in range(runs + 1):  # The first upload warms up the pool processes
+            started = time.perf_counter()
+            response = await client.post("/upload-portfolio", headers={"X-Session-Id": "portfolio"},
+                                         files=[("files", ("portfolio.zip", data, "application/zip"))])
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                failures.append(f"{response.status_code} {response.text[:200]}")
+                continue
+            payload = response.json()
+            errors = [report["file"] for report in payload["files"] if report["error"]]
+            if errors != [BROKEN_MEMBER]:
+                failures.append(f"files with errors: {errors}, expected only {BROKEN_MEMBER}")
+            if payload["project_count"] != expected_projects:
+                failures.append(f"{payload['project_count']} projects, expected {expected_projects}")
+            if run:
+                latencies.append(elapsed)
+                parse_seconds.append(payload["parse_seconds"])
+    return {"latencies": latencies, "parse_seconds": parse_seconds, "failures": failures}
+
+async def measure_pool_sizes(pool_sizes: Sequence[int], workbooks: int, rows: int, runs: int,
+                             work_dir: str, seed: int = 0) -> Dict[int, dict]:
+    """upload_portfolio against a fresh server per parse pool size"""
+    data = build_portfolio(work_dir, workbooks, rows, seed)
+    # Every generated task row becomes a project (section headers are not task rows)
+    expected_projects = rows * (workbooks + workbooks // 3)
+    results = {}
+    for pool_size in pool_sizes:
+        env = dict(os.environ, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"), PARSE_POOL_SIZE=str(pool_size),
+                   SESSION_STATE_PATH=os.path.join(work_dir, f"portfolio-sessions-{pool_size}.sqlite3"))
+        with serve_app(env) as url:
+            results[pool_size] = await upload_portfolio(url, data, expected_projects, runs)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", default=f"1,{os.cpu_count() or 1}",
+                        help="Comma-separated PARSE_POOL_SIZE values (default: 1 and the CPU count)")
+    parser.add_argument("--workbooks", type=int, default=24, help="Workbooks in the archive (default: 24)")
+    parser.add_argument("--rows", type=int, default=2000, help="Task rows per sheet (default: 2000)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed uploads per pool size (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    pool_sizes = [int(size) for size in args.pool_sizes.split(",") if size.strip()]
+    with tempfile.TemporaryDirectory(prefix="gantt-portfolio-") as work_dir:
+        results = asyncio.run(measure_pool_sizes(pool_sizes, args.workbooks, args.rows, args.runs, work_dir, args.seed))
+    failed = False
+    baseline = None
+    for pool_size, result in results.items():
+        for failure in result["failures"][:10]:
+            print(f"  FAIL: {failure}")
+        failed = failed or bool(result["failures"])
+        if not result["latencies"]:
+            continue
+        wall = statistics.median(result["latencies"])
+        baseline = baseline or wall
+        print(f"pool={pool_size}: wall {wall:7.2f}s  parse {statistics.median(result['parse_seconds']):7.2f}s  "
+              f"speedup {baseline / wall:5.2f}x")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""/upload-excel response for a large sheet: the orjson, compressed and NDJSON paths against the old response
+
+The old response ran the payload through FastAPI's jsonable_encoder and json.dumps and was
+sent uncompressed. This times that encoding and the orjson one in process on the parsed
+--rows sheet, then uploads the sheet to the app under uvicorn as json (identity and gzip)
+and as ndjson, reporting time to first byte and bytes on the wire. The old time to first
+byte is estimated as the json one with the orjson encoding swapped for the old encoding.
+
+    python -m benchmarks.responses --rows 50000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import zlib
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.run import XLSX_TYPE, load_main, workbook_variant
+from benchmarks.server import serve_app
+
+def time_call(func, runs: int) -> float:
+    """Median seconds of `runs` calls"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+async def upload(url: str, data: bytes, response_format: str, encoding: str, runs: int) -> dict:
+    """Median time to first byte, total time and bytes on the wire of `runs` uncached uploads"""
+    first_bytes, totals, sizes = [], [], []
+    async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+        for run in range(runs):
+            body = workbook_variant(data, hash((response_format, encoding, run)) & 0xFFFFFF)
+            started = time.perf_counter()
+            first_byte = None
+            async with client.stream("POST", "/upload-excel", params={"format": response_format},
+                                     files={"file": ("planning.xlsx", body, XLSX_TYPE)},
+                                     headers={"X-Session-Id": "responses", "Accept-Encoding": encoding}) as response:
+                response.raise_for_status()
+                async for _ in response.aiter_raw():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+                totals.append(time.perf_counter() - started)
+                sizes.append(response.num_bytes_downloaded)
+            first_bytes.append(first_byte)
+    return {"ttfb": statistics.median(first_bytes), "total": statistics.median(totals),
+            "bytes": statistics.median(sizes)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000, help="Task rows in the sheet (default: 50000)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per case (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    backend = load_main()
+    with tempfile.TemporaryDirectory(prefix="gantt-responses-") as work_dir:
+        path = os.path.join(work_dir, "planning.xlsx")
+        generate_workbook(path, args.rows, seed=args.seed)
+        with open(path, "rb") as workbook_file:
+            data = workbook_file.read()
+
+        parsed = backend.parse_workbook(path, "planning.xlsx")
+        payload = {"message": "Excel file uploaded successfully", "filename": "planning.xlsx",
+                   "projects": parsed.projects.to_dicts(), "total_rows": parsed.total_rows}
+        legacy_seconds = time_call(lambda: JSONResponse(jsonable_encoder(payload)), args.runs)
+        orjson_seconds = time_call(lambda: ORJSONResponse(payload), args.runs)
+        legacy_body = JSONResponse(jsonable_encoder(payload)).body
+        gzip_body = zlib.compress(ORJSONResponse(payload).body, backend.COMPRESSION_LEVEL, wbits=31)
+        print(f"encode  old {legacy_seconds * 1000:9.1f} ms  orjson {orjson_seconds * 1000:9.1f} ms  "
+              f"speedup {legacy_seconds / orjson_seconds:5.1f}x")
+        print(f"payload old {len(legacy_body):11,} B  gzip {len(gzip_body):11,} B  "
+              f"{len(legacy_body) / len(gzip_body):5.1f}x smaller")
+
+        env = dict(os.environ, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+                   SESSION_STATE_PATH=os.path.join(work_dir, "sessions.sqlite3"))
+        with serve_app(env) as url:
+            results = {}
+            for response_format, encoding in (("json", "identity"), ("json", "gzip"), ("ndjson", "identity"),
+                                              ("ndjson", "gzip")):
+                results[response_format, encoding] = result = asyncio.run(
+                    upload(url, data, response_format, encoding, args.runs))
+                print(f"{response_format:6} {encoding:8}  ttfb {result['ttfb'] * 1000:9.1f} ms  "
+                      f"total {result['total'] * 1000:9.1f} ms  {result['bytes']:11,.0f} B")
+        legacy_ttfb = results["json", "identity"]["ttfb"] - orjson_seconds + legacy_seconds
+        print(f"old    identity  ttfb {legacy_ttfb * 1000:9.1f} ms (estimated)  {len(legacy_body):11,} B")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""Benchmark runner: throughput and p50/p99 latency of the API endpoints and analysis functions
+
+Generates the inputs, starts the stub Whisper server and the app under uvicorn (or targets
+--url), runs the selected benchmarks and writes the results to benchmarks/results/<time>.json.
+With --compare, every result is set against an earlier results file; a p50 latency (or, for
+concurrent cases, a throughput) that got worse by more than --threshold is a regression and
+makes the run exit with status 1.
+
+    python -m benchmarks.run                                 # 100, 1000 and 10000 rows
+    python -m benchmarks.run --rows 100000 --only upload,parse
+    python -m benchmarks.run --compare benchmarks/results/20240801-120000.json
+
+Benchmarks:
+    upload          POST /upload-excel: new and cached uploads, json vs ndjson (time to first
+                    byte), response bytes with and without gzip (against the old response:
+                    python -m benchmarks.responses)
+    responsiveness  GET / latency while uploads are being parsed (with audio requests in flight:
+                    python -m benchmarks.concurrency)
+    update          POST /update-excel batches looked up by task name (task row updates)
+                    (against the old scan over every cell: python -m benchmarks.update_lookup)
+    download        GET /download-excel: xlsx as stored and after an edit (dirty rows written
+                    back), csv/json exports after an edit and cached, 304 polls
+    process_audio   POST /process-audio against the stub Whisper server: transcribed and cached
+    analysis        extract_project_updates, generate_task_proposals, generate_meeting_summary
+                    and analyze_transcript, in process
+    parse           parse_workbook in process per EXCEL_INGEST_MODE, with the tracemalloc peak
+    cold_start      `import main` in fresh interpreters (budget check: tests/test_cold_start.py)
+    multi_worker    planners editing and reading their sessions against 1 and several uvicorn
+                    workers with shared session state (also: python -m benchmarks.multi_worker)
+    portfolio       POST /upload-portfolio of a ZIP of workbooks with a parse pool of 1 and of
+                    every core (also: python -m benchmarks.portfolio)
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import httpx
+
+from benchmarks.cold_start import measure_cold_start
+from benchmarks.generate_audio import generate_wav
+from benchmarks.generate_transcript import generate_transcript
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.multi_worker import measure_workers
+from benchmarks.portfolio import measure_pool_sizes
+from benchmarks.server import serve_app
+from benchmarks.stub_whisper import start_stub_whisper
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# name -> (coroutine function taking the Context, whether it runs in process)
+BENCHMARKS = OrderedDict()
+
+def benchmark(name: str, in_process: bool = False):
+    """Register a benchmark; in-process benchmarks import main instead of calling the server"""
+    def decorator(func):
+        BENCHMARKS[name] = (func, in_process)
+        return func
+    return decorator
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def workbook_variant(data: bytes, index: int) -> bytes:
+    """The same workbook with its own zip comment, so the upload has a new digest (a cache miss)"""
+    buffer = io.BytesIO(data)
+    with zipfile.ZipFile(buffer, "a") as archive:
+        archive.comment = f"benchmark variant {index}".encode("ascii")
+    return buffer.getvalue()
+
+def describe(result: dict) -> str:
+    params = " ".join(f"{key}={value}" for key, value in result["params"].items())
+    return f"{result['name']} {params}".strip()
+
+def load_main():
+    """Import the app module in this process (for the in-process benchmarks)"""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import main
+    return main
+
+class Context:
+    """What a benchmark needs: the client, the options, generated inputs and the result list"""
+
+    def __init__(self, args: argparse.Namespace, client: Optional[httpx.AsyncClient], work_dir: str):
+        self.args = args
+        self.client = client
+        self.work_dir = work_dir
+        self.results = []
+        self._workbooks = {}
+        self._variants = 0
+
+    def workbook(self, rows: int) -> Tuple[str, bytes, List[str]]:
+        """Path, bytes and task names of the generated workbook with `rows` rows"""
+        if rows not in self._workbooks:
+            path = os.path.join(self.work_dir, f"planning-{rows}.xlsx")
+            names = generate_workbook(path, rows, seed=self.args.seed)
+            with open(path, "rb") as workbook_file:
+                self._workbooks[rows] = (path, workbook_file.read(), names)
+        return self._workbooks[rows]
+
+    def fresh(self, data: bytes) -> bytes:
+        """A workbook variant no earlier upload in this run has used"""
+        self._variants += 1
+        return workbook_variant(data, self._variants)
+
+    def iterations(self, rows: int = 0) -> int:
+        """--iterations, scaled down for sheets above 1000 rows (at least 3)"""
+        if rows <= 1000:
+            return self.args.iterations
+        return max(3, self.args.iterations * 1000 // rows)
+
+    async def upload(self, data: bytes, session_id: str) -> httpx.Response:
+        response = await self.client.post("/upload-excel", files={"file": ("planning.xlsx", data, XLSX_TYPE)},
+                                          headers={"X-Session-Id": session_id})
+        response.raise_for_status()
+        return response
+
+    def record(self, name: str, params: dict, latencies: List[float], elapsed: float,
+               concurrency: int = 1, details: Optional[dict] = None):
+        if not latencies:
+            raise RuntimeError(f"{name}: no samples")
+        ordered = sorted(latencies)
+        result = {
+            "name": name,
+            "params": params,
+            "iterations": len(ordered),
+            "concurrency": concurrency,
+            "throughput_per_s": round(len(ordered) / elapsed, 3),
+            "p50_ms": round(percentile(ordered, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+            "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+        for key, values in (details or {}).items():
+            result[key] = round(statistics.median(values), 3)
+        self.results.append(result)
+        extra = "".join(f" {key}={result[key]}" for key in (details or {}))
+        print(f"  {describe(result):58} {result['throughput_per_s']:>9.2f}/s  p50 {result['p50_ms']:>9.2f} ms  "
+              f"p99 {result['p99_ms']:>9.2f} ms{extra}", flush=True)
+
+    async def measure(self, name: str, call, iterations: int, concurrency: int = 1, warmup: int = 1,
+                      setup=None, **params):
+        """Time `call(i)` for every i in range(iterations), `concurrency` calls at a time
+
+        `setup(i)` runs untimed before each call (only with concurrency 1). Warm-up calls get
+        negative indexes. A call may return a dict of numbers; their medians are reported too.
+        """
+        if setup is not None and concurrency != 1:
+            raise ValueError("setup needs concurrency 1")
+        for index in range(warmup):
+            if setup is not None:
+                await setup(-1 - index)
+            await call(-1 - index)
+        latencies = []
+        details = {}
+        pending = iter(range(iterations))
+
+        async def worker():
+            for index in pending:
+                if setup is not None:
+                    await setup(index)
+                started = time.perf_counter()
+                extra = await call(index)
+                latencies.append(time.perf_counter() - started)
+                for key, value in (extra or {}).items():
+                    details.setdefault(key, []).append(value)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        # Sequential runs leave the setups out of the throughput
+        elapsed = sum(latencies) if concurrency == 1 else time.perf_counter() - started
+        self.record(name, params, latencies, elapsed, concurrency, details)
+
+    def measure_sync(self, name: str, func, iterations: int, warmup: int = 1, details: Optional[dict] = None, **params):
+        """Time an in-process function call `iterations` times"""
+        for _ in range(warmup):
+            func()
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - started)
+        self.record(name, params, latencies, sum(latencies), details=details)
+
+@benchmark("upload")
+async def bench_upload(ctx: Context):
+    for rows in ctx.args.rows:
+        _, data, _ = ctx.workbook(rows)
+        session_id = f"bench-upload-{rows}"
+
+        def upload_call(response_format: str, encoding: str, cached: bool):
+            async def call(index):
+                body = data if cached else ctx.fresh(data)
+                started = time.perf_counter()
+                first_byte = None
+                tail = b""
+                async with ctx.client.stream(
+                        "POST", "/upload-excel", params={"format": response_format},
+                        files={"file": ("planning.xlsx", body, XLSX_TYPE)},
+                        headers={"X-Session-Id": session_id, "Accept-Encoding": encoding}) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        if first_byte is None:
+                            first_byte = time.perf_counter() - started
+                        tail = (tail + chunk)[-256:]
+                    if response_format == "ndjson" and b'"done":true' not in tail:
+                        raise RuntimeError(f"NDJSON upload did not finish: {tail[-200:]!r}")
+                    return {"ttfb_ms": first_byte * 1000, "response_bytes": response.num_bytes_downloaded}
+            return call
+
+        iterations = ctx.iterations(rows)
+        for response_format, encoding, cached in (("json", "identity", False), ("ndjson", "identity", False),
+                                                  ("json", "identity", True), ("json", "gzip", True),
+                                                  ("ndjson", "gzip", True)):
+            await ctx.measure("upload", upload_call(response_format, encoding, cached), iterations, rows=rows,
+                              format=response_format, encoding=encoding, cache="hit" if cached else "miss")
+
+@benchmark("responsiveness")
+async def bench_responsiveness(ctx: Context):
+    """GET / must stay fast while uploads are parsed: parsing happens off the event loop"""
+    rows = max(ctx.args.rows)
+    _, data, _ = ctx.workbook(rows)
+    uploads = [asyncio.ensure_future(ctx.upload(ctx.fresh(data), f"bench-busy-{n}"))
+               for n in range(ctx.args.concurrency)]
+    latencies = []
+    started = time.perf_counter()
+    while not all(upload.done() for upload in uploads):
+        probe_started = time.perf_counter()
+        response = await ctx.client.get("/")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - probe_started)
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await asyncio.gather(*uploads)
+    ctx.record("responsiveness", {"rows": rows, "concurrent_uploads": len(uploads)}, latencies, sum(latencies),
+               details={"uploads_s": [elapsed]})
+
+@benchmark("update")
+async def bench_update(ctx: Context):
+    for rows in ctx.args.rows:
+        _, data, names = ctx.workbook(rows)
+        session_id = f"bench-update-{rows}"
+        await ctx.upload(data, session_id)
+        rnd = random.Random(ctx.args.seed)
+        for batch in (1, 50):
+            async def call(index, batch=batch):
+                day = datetime.date(2025, 1, 1) + datetime.timedelta(days=index % 300)
+                updates = [{"project_name": name, "task_name": name, "new_start_date": day.isoformat(),
+                            "new_end_date": (day + datetime.timedelta(days=14)).isoformat()}
+                           for name in rnd.sample(names, min(batch, len(names)))]
+                response = await ctx.client.post("/update-excel", json=updates, headers={"X-Session-Id": session_id})
+                response.raise_for_status()
+                return {"rows_updated": response.json()["rows_updated"]}
+            await ctx.measure("update", call, ctx.iterations(rows), rows=rows, batch=batch)
+
+@benchmark("download")
+async def bench_download(ctx: Context):
+    for rows in ctx.args.rows:
+        _, data, names = ctx.workbook(rows)
+        session_id = f"bench-download-{rows}"
+        headers = {"X-Session-Id": session_id}
+        await ctx.upload(data, session_id)
+        task_id = names[0].rsplit(" ", 1)[1]
+
+        async def edit(index):
+            # Accepting a proposal bumps the session version, so the next export is built afresh
+            response = await ctx.client.post("/accept-proposal", headers=headers, json={
+                "taskId": task_id, "proposedStatus": "In Progress", "proposedProgress": index % 100})
+            response.raise_for_status()
+
+        def download_call(export_format: str, etag: Optional[str] = None):
+            request_headers = dict(headers, **({"If-None-Match": etag} if etag else {}))
+            expect = 304 if etag else 200
+
+            async def call(index):
+                response = await ctx.client.get("/download-excel", params={"format": export_format},
+                                                headers=request_headers)
+                if response.status_code != expect:
+                    raise RuntimeError(f"/download-excel?format={export_format}: {response.status_code}, expected {expect}")
+                return {"response_bytes": len(response.content)}
+            return call
+
+        iterations = ctx.iterations(rows)
+        await ctx.measure("download", download_call("xlsx"), iterations, rows=rows, format="xlsx", export="file")
+        await ctx.measure("download", download_call("xlsx"), iterations, setup=edit,
+                          rows=rows, format="xlsx", export="write_back")
+        for export_format in ("csv", "json"):
+            await ctx.measure("download", download_call(export_format), iterations, setup=edit,
+                              rows=rows, format=export_format, export="after_edit")
+            await ctx.measure("download", download_call(export_format), iterations,
+                              rows=rows, format=export_format, export="cached")
+        current = await ctx.client.get("/download-excel", params={"format": "csv"}, headers=headers)
+        await ctx.measure("download", download_call("csv", current.headers["etag"]), iterations,
+                          rows=rows, format="csv", export="not_modified")
+
+@benchmark("process_audio")
+async def bench_process_audio(ctx: Context):
+    _, data, _ = ctx.workbook(min(ctx.args.rows))
+    session_id = "bench-audio"
+    await ctx.upload(data, session_id)
+    iterations = ctx.args.iterations
+    # One recording per call (and warm-up) so none of them is in the transcript cache yet
+    recordings = [generate_wav(ctx.args.audio_seconds, seed=ctx.args.seed * 1000 + n) for n in range(iterations + 1)]
+
+    def audio_call(cached: bool):
+        async def call(index):
+            recording = recordings[0] if cached else recordings[index]
+            response = await ctx.client.post("/process-audio", headers={"X-Session-Id": session_id},
+                                             files={"audio_file": ("meeting.wav", recording, "audio/wav")})
+            response.raise_for_status()
+            payload = response.json()
+            if "cached" not in payload or payload["transcript"].startswith("Could not understand"):
+                raise RuntimeError(f"Audio was not transcribed: {payload['transcript'][:100]}")
+            return {"proposals": len(payload["taskProposals"])}
+        return call
+
+    await ctx.measure("process_audio", audio_call(False), iterations, concurrency=ctx.args.concurrency,
+                      warmup=0, seconds=ctx.args.audio_seconds, cache="miss")
+    await ctx.measure("process_audio", audio_call(True), iterations, concurrency=ctx.args.concurrency,
+                      seconds=ctx.args.audio_seconds, cache="hit")
+
+@benchmark("analysis", in_process=True)
+async def bench_analysis(ctx: Context):
+    main = load_main()
+    workbooks = {}
+    for rows in ctx.args.rows:
+        path, _, names = ctx.workbook(rows)
+        workbooks[rows] = (main.parse_workbook(path, "planning.xlsx"), names)
+    for words in ctx.args.words:
+        transcript = generate_transcript(words, workbooks[min(ctx.args.rows)][1], seed=ctx.args.seed)
+        ctx.measure_sync("extract_project_updates", lambda: main.extract_project_updates(transcript),
+                         ctx.args.iterations, words=words)
+        ctx.measure_sync("generate_meeting_summary", lambda: main.generate_meeting_summary(transcript),
+                         ctx.args.iterations, words=words)
+        for rows, (workbook, names) in workbooks.items():
+            transcript = generate_transcript(words, names, seed=ctx.args.seed)
+            projects = workbook.projects.to_dicts()
+            ctx.measure_sync("generate_task_proposals", lambda: main.generate_task_proposals(transcript, projects),
+                             ctx.iterations(rows), rows=rows, words=words)
+            ctx.measure_sync("analyze_transcript", lambda: main.analyze_transcript(transcript, workbook),
+                             ctx.args.iterations, rows=rows, words=words)
+
+@benchmark("parse", in_process=True)
+async def bench_parse(ctx: Context):
+    main = load_main()
+    ingest_mode = main.EXCEL_INGEST_MODE
+    try:
+        for rows in ctx.args.rows:
+            path, _, _ = ctx.workbook(rows)
+            for mode in ("dataframe", "streaming"):
+                main.EXCEL_INGEST_MODE = mode  # Read by parse_workbook on every call
+                parse = lambda: main.parse_workbook(path, "planning.xlsx")
+                tracemalloc.start()
+                parse()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                ctx.measure_sync("parse", parse, ctx.iterations(rows), warmup=0,
+                                 details={"peak_mb": [peak / 1024 / 1024]}, rows=rows, mode=mode)
+    finally:
+        main.EXCEL_INGEST_MODE = ingest_mode
+
+@benchmark("cold_start", in_process=True)
+async def bench_cold_start(ctx: Context):
+    timings, loaded = measure_cold_start(max(3, ctx.args.iterations // 4))
+    ctx.record("cold_start", {}, timings, sum(timings), details={"lazy_modules_loaded": [len(loaded)]})
+
+@benchmark("multi_worker", in_process=True)
+async def bench_multi_worker(ctx: Context):
+    # Starts its own servers, one per worker count; stale reads or lost sessions fail the run
+    worker_counts = (1, max(2, min(4, os.cpu_count() or 1)))
+    rows = min(ctx.args.rows)
+    results = await measure_workers(worker_counts, rows, ctx.args.concurrency, ctx.args.iterations * 5,
+                                    ctx.work_dir, ctx.args.seed)
+    for workers, result in results.items():
+        if result["failures"]:
+            raise RuntimeError(f"multi_worker workers={workers}: " + "; ".join(result["failures"][:5]))
+        ctx.record("multi_worker", {"rows": rows, "workers": workers}, result["latencies"], result["elapsed"],
+                   ctx.args.concurrency, {"workers_seen": [result["workers_seen"]]})
+
+@benchmark("portfolio", in_process=True)
+async def bench_portfolio(ctx: Context):
+    # Starts its own servers, one per parse pool size; parse errors or missing projects fail the run
+    pool_sizes = (1, max(2, os.cpu_count() or 1))
+    rows = min(ctx.args.rows)
+    workbooks = 4 * ctx.args.concurrency
+    results = await measure_pool_sizes(pool_sizes, workbooks, rows, max(3, ctx.args.iterations // 4),
+                                       ctx.work_dir, ctx.args.seed)
+    for pool_size, result in results.items():
+        if result["failures"]:
+            raise RuntimeError(f"portfolio pool={pool_size}: " + "; ".join(result["failures"][:5]))
+        ctx.record("portfolio", {"rows": rows, "workbooks": workbooks, "pool": pool_size}, result["latencies"],
+                   sum(result["latencies"]), details={"parse_s": result["parse_seconds"]})
+
+def compare(previous: dict, results: List[dict], threshold: float) -> List[str]:
+    """Print every result against the earlier run; returns the regressions"""
+    key = lambda result: result["name"] + json.dumps(result["params"], sort_keys=True)
+    before = {key(result): result for result in previous["results"]}
+    regressions = []
+    print(f"\nCompared with {previous.get('commit') or 'unknown commit'} ({previous.get('started')}):")
+    for result in results:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        p50_change = result["p50_ms"] / old["p50_ms"] - 1 if old["p50_ms"] else 0.0
+        throughput_change = result["throughput_per_s"] / old["throughput_per_s"] - 1 if old["throughput_per_s"] else 0.0
+        line = (f"  {describe(result):58} p50 {old['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms ({p50_change:+7.1%})  "
+                f"throughput {throughput_change:+7.1%}")
+        # Sequential throughput is just 1/mean, so one outlier would flag it; p50 decides there
+        if p50_change > threshold or (result["concurrency"] > 1 and throughput_change < -threshold):
+            regressions.append(describe(result))
+            line += "  REGRESSION"
+        print(line)
+    return regressions
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmarks(args: argparse.Namespace, url: Optional[str], work_dir: str) -> List[dict]:
+    client = httpx.AsyncClient(base_url=url, timeout=600) if url else None
+    try:
+        ctx = Context(args, client, work_dir)
+        for name in args.only:
+            print(f"== {name}", flush=True)
+            await BENCHMARKS[name][0](ctx)
+        return ctx.results
+    finally:
+        if client is not None:
+            await client.aclose()
+
+def comma_list(kind):
+    return lambda text: [kind(item) for item in text.split(",") if item.strip()]
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", type=comma_list(str), default=list(BENCHMARKS),
+                        help=f"Comma-separated benchmarks (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--rows", type=comma_list(int), default=[100, 1000, 10000], help="Workbook sizes (default: 100,1000,10000)")
+    parser.add_argument("--words", type=comma_list(int), default=[500, 5000], help="Transcript lengths (default: 500,5000)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per case, fewer above 1000 rows (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Calls in flight for the concurrent cases (default: 4)")
+    parser.add_argument("--audio-seconds", type=float, default=10, help="Length of the generated recordings (default: 10)")
+    parser.add_argument("--whisper-latency", type=float, default=0.2, help="Stub Whisper response time in seconds (default: 0.2)")
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one (process_audio needs it to "
+                                      "use a stub: python -m benchmarks.stub_whisper and OPENAI_BASE_URL)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown counted as a regression (default: 0.2)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.only if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    started = datetime.datetime.now()
+    # Settings for the app, whether it runs in the uvicorn subprocess or is imported here
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    with tempfile.TemporaryDirectory(prefix="gantt-bench-") as work_dir, contextlib.ExitStack() as stack:
+        url = args.url
+        if url is None and any(not BENCHMARKS[name][1] for name in args.only):
+            stub = start_stub_whisper(latency=args.whisper_latency)
+            stack.callback(stub.shutdown)
+            env = dict(os.environ, OPENAI_API_KEY="sk-benchmark", OPENAI_BASE_URL=stub.url,
+                       TRANSCRIPT_CACHE_PATH=os.path.join(work_dir, "transcripts.sqlite3"),
+                       SESSION_STATE_PATH=os.path.join(work_dir, "sessions.sqlite3"))
+            url = stack.enter_context(serve_app(env))
+        results = asyncio.run(run_benchmarks(args, url, work_dir))
+
+    output = args.output or os.path.join(RESULTS_DIR, started.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump({
+            "started": started.isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "options": vars(args),
+            "results": results,
+        }, results_file, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare:
+        with open(args.compare) as previous_file:
+            regressions = compare(json.load(previous_file), results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: " + "; ".join(regressions))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Local stand-in for the OpenAI transcription API
+
+Answers POST /v1/audio/transcriptions after a fixed latency with a synthetic transcript
+(response_format=text), and optionally fails a share of the requests (or the first few) with
+429 so the client's retries are exercised. Counts the requests and the most that were in
+flight at once. Point the app at it with OPENAI_BASE_URL=<url>.
+
+    python -m benchmarks.stub_whisper --port 9100 --latency 0.5
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Sequence
+
+from benchmarks.generate_transcript import generate_transcript
+
+class StubWhisperHandler(BaseHTTPRequestHandler):
+    server: "StubWhisperServer"
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Sequence = ()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self._read_body()
+        if not self.path.rstrip("/").endswith("/audio/transcriptions"):
+            self._send(404, b'{"error": {"message": "Not found"}}', "application/json")
+            return
+        number = self.server.record_request()
+        try:
+            time.sleep(self.server.latency)
+        finally:
+            self.server.record_response()
+        if number <= self.server.fail_first or (self.server.error_rate and random.random() < self.server.error_rate):
+            headers = [] if self.server.retry_after is None else [("Retry-After", self.server.retry_after)]
+            self._send(429, b'{"error": {"message": "Rate limit reached", "type": "requests"}}',
+                       "application/json", headers)
+            return
+        # The same audio always gets the same transcript
+        transcripts = self.server.transcripts
+        self._send(200, transcripts[len(body) % len(transcripts)].encode("utf-8"), "text/plain; charset=utf-8")
+
+    def log_message(self, format, *args):
+        pass
+
+class StubWhisperServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2, error_rate: float = 0.0,
+                 transcript_words: int = 300, task_names: Sequence[str] = (), fail_first: int = 0,
+                 retry_after: Optional[str] = "0"):
+        super().__init__((host, port), StubWhisperHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_first = fail_first  # The first requests all get a 429
+        self.retry_after = retry_after  # Retry-After of the 429s; None leaves the header out
+        self.transcripts = [generate_transcript(transcript_words, task_names, seed) for seed in range(8)]
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record_request(self) -> int:
+        """Count a transcription request as started; returns its number (from 1)"""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self.requests
+
+    def record_response(self):
+        with self._lock:
+            self.in_flight -= 1
+
+def start_stub_whisper(**options) -> StubWhisperServer:
+    """Start a stub server on a background thread; stop it with shutdown()"""
+    server = StubWhisperServer(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before every response (default: 0.2)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    args = parser.parse_args()
+    server = StubWhisperServer(args.host, args.port, args.latency, args.error_rate)
+    print(f"Stub Whisper API on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
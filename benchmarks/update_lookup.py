@@ -0,0 +1,90 @@
+"""Task lookups for /update-excel: the row index against the old scan over every cell
+
+Generates a --rows sheet and --updates date updates by task name, then times
+    legacy    the old per-update loop, sheet.iter_rows() over every cell with a lowercase
+              substring match, on --legacy-updates of the updates (the total is extrapolated)
+    index     building the row index at ingest, and the lookups per match mode
+    endpoint  one POST /update-excel batch with every update, against the app under uvicorn
+and prints the legacy/index speedup. Exits with status 1 when an exact lookup misses a task.
+
+    python -m benchmarks.update_lookup --rows 10000 --updates 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+import openpyxl
+
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.run import XLSX_TYPE, load_main
+from benchmarks.server import serve_app
+
+def legacy_scan(sheet, name: str) -> list:
+    """The rows the old update_excel changed for `name`: every row with a cell containing it"""
+    rows = []
+    for row in sheet.iter_rows():
+        for cell in row:
+            if cell.value and name.lower() in str(cell.value).lower():
+                rows.append(cell.row)
+                break
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Task rows in the sheet (default: 10000)")
+    parser.add_argument("--updates", type=int, default=1000, help="Updates in the batch (default: 1000)")
+    parser.add_argument("--legacy-updates", type=int, default=20,
+                        help="Updates timed with the old scan; the rest is extrapolated (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    backend = load_main()
+    rnd = random.Random(args.seed)
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="gantt-lookup-") as work_dir:
+        path = os.path.join(work_dir, "planning.xlsx")
+        names = generate_workbook(path, args.rows, seed=args.seed)
+        queries = [rnd.choice(names) for _ in range(args.updates)]
+
+        sheet = openpyxl.load_workbook(path).active
+        started = time.perf_counter()
+        for name in queries[:args.legacy_updates]:
+            legacy_scan(sheet, name)
+        legacy = (time.perf_counter() - started) / min(args.legacy_updates, len(queries)) * len(queries)
+        print(f"legacy scan     {legacy:9.3f} s for {len(queries)} updates "
+              f"(extrapolated from {min(args.legacy_updates, len(queries))})")
+
+        parsed = backend.parse_workbook(path, "planning.xlsx")
+        started = time.perf_counter()
+        row_index = backend.RowIndex(list(parsed.projects), parsed.row_index.sheet_rows)
+        print(f"index build     {time.perf_counter() - started:9.3f} s for {len(parsed.projects)} tasks")
+        for match in backend.RowIndex.MATCH_MODES:
+            started = time.perf_counter()
+            misses = sum(not row_index.lookup(name, match) for name in queries)
+            elapsed = time.perf_counter() - started
+            failed = failed or (match == "exact" and misses > 0)
+            print(f"index {match:9} {elapsed:9.3f} s for {len(queries)} updates  "
+                  f"speedup {legacy / elapsed:9.0f}x  misses {misses}")
+
+        updates = [{"project_name": name, "task_name": name, "new_start_date": "2030-01-02",
+                    "new_end_date": "2030-02-03"} for name in queries]
+        env = dict(os.environ, LOG_LEVEL=os.environ.get("LOG_LEVEL", "WARNING"),
+                   SESSION_STATE_PATH=os.path.join(work_dir, "sessions.sqlite3"))
+        with serve_app(env) as url, open(path, "rb") as workbook_file:
+            headers = {"X-Session-Id": "lookup"}
+            httpx.post(url + "/upload-excel", headers=headers, timeout=600,
+                       files={"file": ("planning.xlsx", workbook_file.read(), XLSX_TYPE)}).raise_for_status()
+            started = time.perf_counter()
+            response = httpx.post(url + "/update-excel", headers=headers, json=updates, timeout=600)
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            print(f"endpoint        {elapsed:9.3f} s for {len(updates)} updates  "
+                  f"updates_applied {response.json()['updates_applied']}")
+            failed = failed or response.json()["updates_applied"] != len(updates)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,292 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Header, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import MutableHeaders
 from pydantic import BaseModel
-import pandas as pd
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
 import json
 import os
+import array
+import asyncio
+import functools
+import multiprocessing
+import operator
+import threading
+import base64
+import bisect
+import contextlib
+import cProfile
+import logging
+import pstats
+import sys
+import itertools
+import copy
+import difflib
+import hashlib
+import importlib
+import importlib.util
+import io
+import posixpath
+import stat
+import wave
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape as xml_escape, unescape as xml_unescape
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import tempfile
 import shutil
+import sqlite3
 import time
+import uuid
+import random
 import datetime
-from typing import List, Optional
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Iterator, List, Optional, Tuple
 import aiofiles
 import re
-from dateutil import parser
-from openai import OpenAI
+import orjson
+try:
+    import brotli  # Optional: enables brotli response compression
+except ImportError:
+    brotli = None
+try:
+    import fcntl  # Locks shared session files across worker processes (POSIX only)
+except ImportError:
+    fcntl = None
 
-app = FastAPI(title="Project Gantt Chart Manager", version="1.0.0")
+class LazyModule:
+    """Stands in for a heavy module and imports it on first attribute access
+
+    pandas, openpyxl, dateutil and the OpenAI SDK (with httpx) take most of the import time,
+    while `/`, `/cors-test` and health probes need none of them; a cold start skips them.
+    """
+
+    def __init__(self, name: str):
+        self._lazy_name = name
+        self._lazy_module = None
+        self._lazy_lock = threading.Lock()
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._lazy_module or self._lazy_load(), attribute)
+
+    def _lazy_load(self):
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                started = time.perf_counter()
+                self._lazy_module = importlib.import_module(self._lazy_name)
+                log_event(logging.INFO, "module_loaded", module=self._lazy_name,
+                          seconds=round(time.perf_counter() - started, 3))
+        return self._lazy_module
+
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+openpyxl = LazyModule("openpyxl")
+parser = LazyModule("dateutil.parser")
+httpx = LazyModule("httpx")
+openai = LazyModule("openai")
+LAZY_MODULES = (pd, np, openpyxl, parser, httpx, openai)
+# What parse pool workers use (they never transcribe)
+PARSE_MODULES = ("pandas", "numpy", "openpyxl", "dateutil.parser")
+
+app = FastAPI(title="Project Gantt Chart Manager", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Environment variables
 PORT = int(os.environ.get("PORT", 8000))
 ENVIRONMENT = os.environ.get("ENVIRONMENT", "development")
+# "dataframe" parses uploads with pd.read_excel, "streaming" reads rows with a read-only openpyxl iterator
+EXCEL_INGEST_MODE = os.environ.get("EXCEL_INGEST_MODE", "dataframe")
+# Default task matching for /update-excel: "exact", "prefix" or "substring"
+UPDATE_MATCH_MODE = os.environ.get("UPDATE_MATCH_MODE", "exact")
+
+# Instrumentation: leveled logging with one structured line per event (key=value text or JSON),
+# latency histograms and outcome counters in Prometheus text format on /metrics, and opt-in
+# per-request profiling (PROFILING_ENABLED=true, then send a request with "X-Profile: 1").
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")  # "text" or "json"
+# Logs every parsed row at DEBUG level; off by default because it dominates large uploads
+LOG_ROWS = os.environ.get("LOG_ROWS", "false").lower() == "true"
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_MAX_REPORTS = int(os.environ.get("PROFILE_MAX_REPORTS", 20))
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record: the event name followed by its fields, as key=value pairs or JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        if LOG_FORMAT == "json":
+            entry = {"time": self.formatTime(record), "level": record.levelname, "event": record.getMessage(), **fields}
+            if record.exc_info:
+                entry["exception"] = self.formatException(record.exc_info)
+            return orjson.dumps(entry, default=str).decode("utf-8")
+        pairs = " ".join(f"{key}={value!r}" if isinstance(value, str) and (" " in value or not value)
+                         else f"{key}={value}" for key, value in fields.items())
+        line = f"{self.formatTime(record)} {record.levelname} {record.getMessage()} {pairs}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+log = logging.getLogger("gantt")
+if not log.handlers:  # Parse pool workers import this module too
+    _log_handler = logging.StreamHandler(sys.stdout)
+    _log_handler.setFormatter(StructuredFormatter())
+    log.addHandler(_log_handler)
+    log.setLevel(LOG_LEVEL)
+    log.propagate = False
+
+def log_event(level: int, event: str, **fields):
+    """Log an event with structured fields; nothing is formatted when the level is disabled"""
+    if log.isEnabledFor(level):
+        log.log(level, event, extra={"fields": fields})
+
+METRICS = []
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(pairs) -> str:
+    """Prometheus label set, e.g. {stage="parse",le="0.5"}"""
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_label_value(value)}"' for name, value in pairs) + "}"
+
+class Counter:
+    """Monotonic Prometheus counter, one value per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(list(zip(self.labels, key)))} {value}")
+        return lines
+
+class Histogram:
+    """Prometheus histogram with fixed buckets, one series per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                pairs = list(zip(self.labels, key))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_label_text(pairs + [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_label_text(pairs + [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{_label_text(pairs)} {total}")
+                lines.append(f"{self.name}_count{_label_text(pairs)} {count}")
+        return lines
+
+def timed(histogram: Histogram, **labels):
+    """Decorator observing every call's duration in `histogram`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+STAGE_SECONDS = Histogram("gantt_stage_duration_seconds",
+                          "Duration of ingest, parse, save, export and transcription stages", ("stage",))
+ANALYSIS_SECONDS = Histogram("gantt_analysis_duration_seconds",
+                             "Duration of each transcript analysis function", ("function",))
+CACHE_REQUESTS = Counter("gantt_cache_requests_total", "Cache lookups by cache and outcome", ("cache", "outcome"))
+OPENAI_REQUESTS = Counter("gantt_openai_requests_total",
+                          "Upstream transcription attempts by outcome (success or error class)", ("outcome",))
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+# Profile reports by id, oldest dropped first
+profile_reports = OrderedDict()
+
+class ProfilingMiddleware:
+    """Runs requests marked "X-Profile: 1" under cProfile and answers with an X-Profile-Id header
+
+    cProfile follows the event loop thread, so coroutines of concurrent requests show up in the
+    report too (profile on a quiet instance); work done in the thread and process pools does not.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = None
+
+    async def __call__(self, scope, receive, send):
+        if not PROFILING_ENABLED or scope["type"] != "http" or \
+                dict(scope["headers"]).get(b"x-profile", b"").lower() not in (b"1", b"true"):
+            await self.app(scope, receive, send)
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])["X-Profile-Id"] = profile_id
+            await send(message)
+
+        # Only one profiler can be attached to the thread at a time
+        async with self._lock:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, profiled_send)
+            finally:
+                profiler.disable()
+                profile_reports[profile_id] = (scope["method"], scope["path"], pstats.Stats(profiler))
+                while len(profile_reports) > PROFILE_MAX_REPORTS:
+                    profile_reports.popitem(last=False)
+                log_event(logging.INFO, "request_profiled", profile_id=profile_id, path=scope["path"])
+
+app.add_middleware(ProfilingMiddleware)
 
 # CORS middleware - allow all origins in production, specific origins in development
 if ENVIRONMENT == "production":
@@ -45,9 +309,114 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression: JSON and NDJSON bodies are gzip- or brotli-encoded, whichever the client
+# prefers in Accept-Encoding (brotli only when the optional brotli package is installed).
+# Streamed bodies are compressed and flushed chunk by chunk so NDJSON rows still arrive as they
+# are produced; server-sent events and already-compressed files (xlsx) are passed through.
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", 1024))
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 6))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/plain", "text/csv")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header by q-value, preferring brotli on ties"""
+    best, best_q = None, 0.0
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("br", "gzip") or (coding == "br" and brotli is None):
+            continue
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if q > best_q or (q == best_q and coding == "br"):
+            best, best_q = coding, q
+    return best
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=min(COMPRESSION_LEVEL, 11))
+            self.compress, self.flush, self.finish = self._compressor.process, self._compressor.flush, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+            self.compress = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression for JSON, NDJSON and text responses"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip()
+                passthrough = (message["status"] in (204, 206, 304) or "content-encoding" in headers
+                               or content_type not in COMPRESSIBLE_TYPES)
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message  # Sent with the first body chunk, once the size is known
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag  # The encoded bytes are a different representation
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+                start = None
+            # Streaming: flush every chunk so the client sees rows as soon as they are produced
+            chunk = compressor.compress(body) + (compressor.flush() if more_body else compressor.finish())
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+app.add_middleware(CompressionMiddleware)
+
 # Debug logging for CORS
-print(f"Environment: {ENVIRONMENT}")
-print(f"Allowed origins: {allow_origins}")
+log_event(logging.INFO, "startup", environment=ENVIRONMENT, allowed_origins=",".join(allow_origins))
 
 # Pydantic models
 class Project(BaseModel):
@@ -67,14 +436,682 @@ class ProjectUpdate(BaseModel):
     new_start_date: str
     new_end_date: str
 
+class ProposalAcceptance(BaseModel):
+    taskId: str
+    proposedStatus: str
+    proposedProgress: int
+
 class AudioTranscript(BaseModel):
     transcript: str
     project_updates: List[ProjectUpdate]
 
-# Global variable to store the current Excel file
-current_excel_file = None
-# Global variable to store the current projects data
-current_projects = []
+# Execution pools: CPU-bound parsing runs in worker processes, blocking file and network I/O in threads.
+# PARSE_POOL_SIZE=0 runs parsing in the I/O thread pool instead (e.g. on single-core hosts).
+PARSE_POOL_SIZE = int(os.environ.get("PARSE_POOL_SIZE", min(4, os.cpu_count() or 1)))
+IO_POOL_SIZE = int(os.environ.get("IO_POOL_SIZE", 16))
+
+parse_pool = None
+io_pool = None
+
+def get_io_pool() -> ThreadPoolExecutor:
+    global io_pool
+    if io_pool is None:
+        io_pool = ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="io")
+    return io_pool
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    global parse_pool
+    if parse_pool is None and PARSE_POOL_SIZE > 0:
+        parse_pool = ProcessPoolExecutor(max_workers=PARSE_POOL_SIZE, mp_context=multiprocessing.get_context("spawn"))
+    return parse_pool
+
+async def run_blocking_io(func, *args, **kwargs):
+    """Run a blocking call (file copy, HTTP request, ...) in the bounded I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(func, *args, **kwargs))
+
+async def run_cpu_bound(func, *args):
+    """Run a CPU-bound function in the parse process pool; arguments and result must be picklable"""
+    pool = get_parse_pool()
+    if pool is None:
+        return await run_blocking_io(func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(func, *args))
+
+# Warm-up: with WARMUP_ON_STARTUP=true the lazily loaded libraries are imported in the background
+# right after startup, on an I/O thread and in every parse pool worker, so the first upload or
+# transcription does not pay for them. Without it they load on the first request needing them.
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "false").lower() == "true"
+
+def preload_modules(names: Optional[Tuple[str, ...]] = None):
+    """Import the lazily loaded modules now (all of them, or the ones named)"""
+    for module in LAZY_MODULES:
+        if names is None or module._lazy_name in names:
+            module._lazy_load()
+
+@app.on_event("startup")
+async def warm_up():
+    if not WARMUP_ON_STARTUP:
+        return
+    asyncio.get_running_loop().run_in_executor(get_io_pool(), preload_modules)
+    pool = get_parse_pool()
+    if pool is not None:
+        for _ in range(PARSE_POOL_SIZE):
+            pool.submit(preload_modules, PARSE_MODULES)
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+    if io_pool is not None:
+        io_pool.shutdown(wait=False, cancel_futures=True)
+
+# Workbook sessions: every planner works on their own upload, keyed by the X-Session-Id header.
+# Sessions are evicted least-recently-used first when there are too many, when their backing
+# files take too much disk space, or when they have been idle for too long.
+SESSION_MAX_ENTRIES = int(os.environ.get("SESSION_MAX_ENTRIES", 32))
+SESSION_MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", 512 * 1024 * 1024))
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", 4 * 60 * 60))
+DEFAULT_SESSION_ID = "default"
+
+# State directory: default home of the session database, the uploaded workbooks and the transcript
+# cache. It is created with mode 0700, and refused when another user owns it (the temp directory is
+# shared by every user of the host).
+STATE_DIR = os.environ.get("STATE_DIR", os.path.join(
+    tempfile.gettempdir(), f"project-gantt-backend-{os.getuid()}" if hasattr(os, "getuid") else "project-gantt-backend"))
+
+# Session database: sessions and their tasks live in SQLite (WAL) at SESSION_STATE_PATH, one row per
+# task with the session version of its last edit and the fields still to be written to the workbook.
+# Edits are indexed row updates; the backing workbook only gets the dirty rows, on /download-excel.
+# The database outlives restarts and is shared by every uvicorn worker on the host: workers keep
+# their own parsed copy and compare its version with the session row on every request (one indexed
+# lookup); a stale copy takes over the tasks changed since, a missing one is rebuilt from the tasks.
+# Uploads are kept in SESSION_FILES_DIR next to it; stored paths outside that directory are never
+# opened or deleted. An empty SESSION_STATE_PATH keeps sessions in process memory only.
+SESSION_STATE_PATH = os.environ.get("SESSION_STATE_PATH", os.path.join(STATE_DIR, "sessions.sqlite3"))
+SESSION_FILES_DIR = os.environ.get("SESSION_FILES_DIR", os.path.join(
+    os.path.dirname(os.path.abspath(SESSION_STATE_PATH)) if SESSION_STATE_PATH else STATE_DIR, "workbooks"))
+SESSION_SCHEMA_VERSION = 2  # PRAGMA user_version of the session database layout
+SESSION_TOUCH_SECONDS = 30  # How often a worker records that a shared session is still in use
+# Task fields that can be edited, and the dirty flag each sets until it is written to the workbook
+EDITABLE_FIELDS = ("start_date", "end_date", "status", "completed")
+DIRTY_DATES, DIRTY_STATUS, DIRTY_COMPLETED = 1, 2, 4
+DIRTY_FLAGS = {"start_date": DIRTY_DATES, "end_date": DIRTY_DATES, "status": DIRTY_STATUS, "completed": DIRTY_COMPLETED}
+
+class WorkbookSession:
+    """An uploaded workbook: its backing file and the parsed projects"""
+
+    def __init__(self, session_id: str, file_path: str, filename: str, workbook: "ParsedWorkbook",
+                 token: Optional[str] = None):
+        self.session_id = session_id
+        self.file_path = file_path
+        self.filename = filename
+        self.workbook = workbook
+        self._lock = None
+        self.size = os.path.getsize(file_path)
+        self.last_access = time.monotonic()
+        self.token = token or uuid.uuid4().hex[:12]  # Tells uploads apart in export ETags
+        self.version = 1
+        self.modified = time.time()
+        self.exports = {}  # format -> (version, body)
+        self.dirty = {}  # position -> DIRTY_* flags not yet in the workbook (without a session database)
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Serializes edits of the backing workbook; created on first use because sessions are
+        also rebuilt on I/O pool threads, where Python 3.9 cannot create asyncio primitives"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def bump(self, version: Optional[int] = None, modified: Optional[float] = None):
+        """Record a mutation: cached exports become stale and their validators change"""
+        self.version = version or self.version + 1
+        self.modified = modified or time.time()
+        self.exports.clear()
+
+    def delete_file(self):
+        delete_session_files(self.file_path)
+
+def is_within(path: str, directory: str) -> bool:
+    """Whether `path` resolves (following symlinks) to somewhere inside `directory`"""
+    directory = os.path.realpath(directory)
+    return os.path.commonpath([os.path.realpath(path), directory]) == directory
+
+@functools.lru_cache(maxsize=None)
+def private_state_dir() -> str:
+    """Create STATE_DIR with mode 0700 (tightening one this user created earlier); refuse it when
+    it is not a directory this user owns"""
+    os.makedirs(STATE_DIR, mode=0o700, exist_ok=True)
+    info = os.lstat(STATE_DIR)
+    if not stat.S_ISDIR(info.st_mode) or (hasattr(os, "getuid") and info.st_uid != os.getuid()):
+        raise RuntimeError(f"State directory {STATE_DIR} is not a directory owned by this user; set STATE_DIR")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(STATE_DIR, 0o700)
+    return STATE_DIR
+
+def make_state_dir(directory: str):
+    """Create a directory for service state (mode 0700); STATE_DIR is checked first when it lies inside"""
+    if is_within(directory, STATE_DIR):
+        private_state_dir()
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+def new_session_file(suffix: str = '.xlsx') -> "tempfile._TemporaryFileWrapper":
+    """Open a new backing file for an upload in SESSION_FILES_DIR"""
+    make_state_dir(SESSION_FILES_DIR)
+    return tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=SESSION_FILES_DIR)
+
+def delete_session_files(file_path: str):
+    """Delete a session's backing workbook and its edit lock file"""
+    for path in (file_path, file_path + ".lock"):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def lock_session_file(file_path: str):
+    """Open the session's lock file and take an exclusive lock on it (blocks; run in the I/O pool)"""
+    lock_file = open(file_path + ".lock", "a")
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    return lock_file
+
+def unlock_session_file(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    lock_file.close()
+
+@contextlib.contextmanager
+def sqlite_transaction(conn: sqlite3.Connection, begin: str):
+    """Run a block in a transaction on an autocommit connection: committed, or rolled back on error"""
+    conn.execute(begin)
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+class SharedSessionState:
+    """Workbook sessions and their tasks in a SQLite database shared by the worker processes on this host
+
+    Every thread gets its own connection: the event loop only reads (WAL readers never wait),
+    writes and whole-session reads run in the I/O pool. Backing file paths read from the database
+    are only handed out when they lie inside `files_dir`.
+    """
+
+    def __init__(self, path: str, files_dir: str):
+        self.path = path
+        self.files_dir = files_dir
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            make_state_dir(os.path.dirname(os.path.abspath(self.path)))
+            # Workers start together, so wait out each other's schema setup instead of failing
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        with sqlite_transaction(conn, "BEGIN IMMEDIATE"):
+            if conn.execute("PRAGMA user_version").fetchone()[0] == SESSION_SCHEMA_VERSION:
+                return
+            # Written by an earlier layout: its sessions are dropped and have to be uploaded again
+            for table in ("sessions", "session_snapshots", "session_changes", "tasks"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(
+                "CREATE TABLE sessions ("
+                "session_id TEXT PRIMARY KEY, token TEXT NOT NULL, file_path TEXT NOT NULL, filename TEXT NOT NULL, "
+                "size INTEGER NOT NULL, total_rows INTEGER NOT NULL, version INTEGER NOT NULL, modified REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX sessions_last_access ON sessions (last_access)")
+            # Positions are the sheet order; item_ids can repeat or be blank, so they are indexed, not the key
+            conn.execute(
+                "CREATE TABLE tasks ("
+                "session_id TEXT NOT NULL, position INTEGER NOT NULL, sheet_row INTEGER NOT NULL, "
+                "name TEXT, item_id TEXT, activity_type TEXT, is_title INTEGER, start_date TEXT, end_date TEXT, "
+                "team TEXT, status TEXT, completed INTEGER, version INTEGER NOT NULL, dirty INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (session_id, position)) WITHOUT ROWID"
+            )
+            for name, columns in (("item_id", "item_id"), ("team", "team"), ("status", "status"),
+                                  ("dates", "start_date, end_date"), ("version", "version")):
+                conn.execute(f"CREATE INDEX tasks_{name} ON tasks (session_id, {columns})")
+            conn.execute("CREATE INDEX tasks_dirty ON tasks (session_id) WHERE dirty != 0")
+            conn.execute(f"PRAGMA user_version = {SESSION_SCHEMA_VERSION}")
+
+    def _stored_file(self, file_path: Optional[str]) -> Optional[str]:
+        """A backing file path from the database, or None when it points outside files_dir"""
+        if file_path is None or is_within(file_path, self.files_dir):
+            return file_path
+        log_event(logging.WARNING, "session_file_outside_files_dir", file_path=file_path)
+        return None
+
+    def lookup(self, session_id: str) -> Optional[Tuple[str, int, float]]:
+        """(token, version, last access) of a session"""
+        return self._connection().execute(
+            "SELECT token, version, last_access FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+
+    def changed_tasks(self, session_id: str, token: str, version: int) -> Optional[Tuple[int, float, list]]:
+        """Session version and modification time, and the (position, fields) of the tasks edited
+        after `version`; None when the upload `token` is gone"""
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN"):  # One consistent view of both tables
+            row = conn.execute("SELECT version, modified FROM sessions WHERE session_id = ? AND token = ?",
+                               (session_id, token)).fetchone()
+            if row is None:
+                return None
+            tasks = conn.execute(
+                f"SELECT position, {', '.join(EDITABLE_FIELDS)} FROM tasks WHERE session_id = ? AND version > ?",
+                (session_id, version)).fetchall()
+        return row[0], row[1], [(task[0], dict(zip(EDITABLE_FIELDS, task[1:]))) for task in tasks]
+
+    def load(self, session_id: str) -> Optional[WorkbookSession]:
+        """Rebuild a session from its tasks; runs in the I/O pool"""
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN"):
+            row = conn.execute(
+                "SELECT token, file_path, filename, total_rows, version, modified FROM sessions WHERE session_id = ?",
+                (session_id,)).fetchone()
+            tasks = [] if row is None else conn.execute(
+                f"SELECT sheet_row, {', '.join(PROJECT_FIELDS)} FROM tasks WHERE session_id = ? ORDER BY position",
+                (session_id,)).fetchall()
+        if row is None:
+            return None
+        token, file_path, filename, total_rows, version, modified = row
+        if self._stored_file(file_path) is None:
+            self.delete(session_id)
+            return None
+        projects = [ProjectRecord(*task[1:]) for task in tasks]
+        for project in projects:
+            project.is_title = bool(project.is_title)
+        workbook = ParsedWorkbook(projects, [task[0] for task in tasks], total_rows)
+        try:
+            session = WorkbookSession(session_id, file_path, filename, workbook, token)
+        except FileNotFoundError:
+            self.delete(session_id)
+            return None
+        session.bump(version, modified)
+        return session
+
+    def save(self, session: WorkbookSession, max_entries: int, max_bytes: int,
+             ttl_seconds: float) -> Tuple[Optional[str], List[str]]:
+        """Store a new upload with its tasks and evict what no longer fits (runs in the I/O pool)
+
+        Returns the backing file of the upload it replaced, if any, and those of the evicted sessions.
+        """
+        projects = session.workbook.projects
+        sheet_rows = session.workbook.row_index.sheet_rows
+        now = time.time()
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN IMMEDIATE"):
+            previous = conn.execute("SELECT file_path FROM sessions WHERE session_id = ?",
+                                    (session.session_id,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (session.session_id, session.token, session.file_path, session.filename, session.size,
+                          session.workbook.total_rows, session.version, session.modified, now))
+            conn.execute("DELETE FROM tasks WHERE session_id = ?", (session.session_id,))
+            conn.executemany(
+                f"INSERT INTO tasks (session_id, position, sheet_row, {', '.join(PROJECT_FIELDS)}, version) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(PROJECT_FIELDS))}, ?)",
+                ((session.session_id, position, sheet_rows[position], *record.values(), session.version)
+                 for position, record in enumerate(projects)))
+            evicted = self._evict(conn, session.session_id, now, max_entries, max_bytes, ttl_seconds)
+        evicted = [file_path for file_path in map(self._stored_file, evicted) if file_path is not None]
+        if previous is None or previous[0] == session.file_path:
+            return None, evicted
+        return self._stored_file(previous[0]), evicted
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, keep: str, now: float, max_entries: int, max_bytes: int,
+               ttl_seconds: float) -> List[str]:
+        # Least recently used first; never the session just stored, even if it alone exceeds the limits
+        rows = conn.execute("SELECT session_id, file_path, size, last_access FROM sessions ORDER BY last_access").fetchall()
+        count = len(rows)
+        total_bytes = sum(row[2] for row in rows)
+        evicted = []
+        for session_id, file_path, size, last_access in rows:
+            if session_id == keep:
+                continue
+            if last_access >= now - ttl_seconds and count <= max_entries and total_bytes <= max_bytes:
+                break
+            evicted.append((session_id, file_path))
+            count -= 1
+            total_bytes -= size
+        for table in ("sessions", "tasks"):
+            conn.executemany(f"DELETE FROM {table} WHERE session_id = ?", [(session_id,) for session_id, _ in evicted])
+        return [file_path for _, file_path in evicted]
+
+    def update_tasks(self, session_id: str, token: str, changes: List[Tuple[int, dict]],
+                     mark_dirty: bool = True) -> Optional[int]:
+        """Apply task edits of the upload `token` as its next version (runs in the I/O pool)
+
+        Each edit is a primary key row update that also flags the fields for the next workbook
+        write-back (unless `mark_dirty` is false). Returns the new version, or None when that
+        upload is gone.
+        """
+        now = time.time()
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN IMMEDIATE"):  # Versions are handed out in commit order
+            row = conn.execute("SELECT version FROM sessions WHERE session_id = ? AND token = ?",
+                               (session_id, token)).fetchone()
+            if row is None:
+                return None
+            version = row[0] + 1
+            for position, fields in changes:
+                dirty = functools.reduce(operator.or_, (DIRTY_FLAGS[field] for field in fields), 0) if mark_dirty else 0
+                conn.execute(
+                    f"UPDATE tasks SET {', '.join(f'{field} = ?' for field in fields)}, version = ?, dirty = dirty | ? "
+                    "WHERE session_id = ? AND position = ?",
+                    (*fields.values(), version, dirty, session_id, position))
+            conn.execute("UPDATE sessions SET version = ?, modified = ?, last_access = ? WHERE session_id = ?",
+                         (version, now, now, session_id))
+        return version
+
+    def dirty_tasks(self, session_id: str, token: str) -> Tuple[int, list]:
+        """Session version and the (sheet row, dirty flags, dates, status, completed) of the tasks
+        not yet written to the workbook"""
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN"):
+            row = conn.execute("SELECT version FROM sessions WHERE session_id = ? AND token = ?",
+                               (session_id, token)).fetchone()
+            if row is None:
+                return 0, []
+            tasks = conn.execute(
+                "SELECT sheet_row, dirty, start_date, end_date, status, completed FROM tasks "
+                "WHERE session_id = ? AND dirty != 0", (session_id,)).fetchall()
+        return row[0], tasks
+
+    def mark_written(self, session_id: str, token: str, version: int, size: int):
+        """Clear the dirty flags up to `version` after the workbook was written, and record its size"""
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN IMMEDIATE"):
+            if conn.execute("UPDATE sessions SET size = ? WHERE session_id = ? AND token = ?",
+                            (size, session_id, token)).rowcount:
+                conn.execute("UPDATE tasks SET dirty = 0 WHERE session_id = ? AND dirty != 0 AND version <= ?",
+                             (session_id, version))
+
+    def touch(self, session_id: str):
+        self._connection().execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (time.time(), session_id))
+
+    def delete(self, session_id: str) -> Optional[str]:
+        """Forget a session; returns its backing file"""
+        conn = self._connection()
+        with sqlite_transaction(conn, "BEGIN IMMEDIATE"):
+            row = conn.execute("SELECT file_path FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            for table in ("sessions", "tasks"):
+                conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+        return self._stored_file(row[0]) if row else None
+
+    def stats(self) -> Tuple[int, int, int]:
+        """Session count, total backing file size and tasks waiting to be written to their workbooks"""
+        conn = self._connection()
+        sessions, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions").fetchone()
+        return sessions, total_bytes, conn.execute("SELECT COUNT(*) FROM tasks WHERE dirty != 0").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+def dirty_cell_updates(tasks) -> List[Tuple[int, dict]]:
+    """(row, {column: value}) worksheet writes for (sheet row, dirty flags, dates, status, completed) tasks"""
+    cell_updates = []
+    for sheet_row, dirty, start_date, end_date, status, completed in tasks:
+        cells = {}
+        if dirty & DIRTY_DATES:
+            for column, value in ((START_DATE_COLUMN, start_date), (END_DATE_COLUMN, end_date)):
+                if value and ISO_DATE.match(value):
+                    cells[column] = datetime.datetime.strptime(value[:10], '%Y-%m-%d')
+        if dirty & DIRTY_STATUS:
+            cells[STATUS_COLUMN] = status
+        if dirty & DIRTY_COMPLETED:
+            cells[COMPLETION_COLUMN] = Percentage(completed)  # Written in the form the cell already uses
+        if cells:
+            cell_updates.append((sheet_row, cells))
+    return cell_updates
+
+class WorkbookStore:
+    """LRU/TTL store of workbook sessions that deletes backing files on eviction
+
+    With a session database the store only caches this worker's parsed copies; which sessions
+    exist, their versions and eviction are decided in the database.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float,
+                 shared: Optional[SharedSessionState] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    async def get(self, session_id: str) -> Optional[WorkbookSession]:
+        if self.shared is not None:
+            return await self._get_shared(session_id)
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(session_id)
+            if session is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    async def _get_shared(self, session_id: str) -> Optional[WorkbookSession]:
+        state = self.shared.lookup(session_id)
+        if state is not None and state[2] < time.time() - self.ttl_seconds:
+            file_path = await run_blocking_io(self.shared.delete, session_id)
+            if file_path is not None:
+                delete_session_files(file_path)
+            self.evictions += 1
+            state = None
+        if state is None:
+            # Never uploaded, or evicted by another worker
+            with self._lock:
+                self._sessions.pop(session_id, None)
+                self.misses += 1
+            return None
+        token, version, last_access = state
+        session = self._sessions.get(session_id)
+        if session is not None and session.token == token and session.version < version:
+            self.refresh(session)
+        elif session is None or session.token != token:
+            session = await run_blocking_io(self.shared.load, session_id)
+            if session is None:
+                self.misses += 1
+                return None
+            with self._lock:
+                self.reloads += 1
+                current = self._sessions.get(session_id)
+                if current is not None and current.token == session.token and current.version >= session.version:
+                    session = current  # Another request reloaded it first
+                else:
+                    self._sessions[session_id] = session
+                    self._evict_to_fit()
+        with self._lock:
+            self.hits += 1
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        if time.time() - last_access > SESSION_TOUCH_SECONDS:
+            await run_blocking_io(self.shared.touch, session_id)
+        return session
+
+    def refresh(self, session: WorkbookSession):
+        """Bring a local copy up to the database version: take over the tasks edited since"""
+        changed = self.shared.changed_tasks(session.session_id, session.token, session.version)
+        if changed is None or changed[0] <= session.version:
+            return
+        version, modified, tasks = changed
+        for position, fields in tasks:
+            session.workbook.update_project(position, **fields)
+        session.bump(version, modified)
+        self.refreshes += 1
+
+    async def put(self, session: WorkbookSession):
+        if self.shared is not None:
+            previous_file, evicted_files = await run_blocking_io(
+                self.shared.save, session, self.max_entries, self.max_bytes, self.ttl_seconds)
+            for file_path in ([previous_file] if previous_file else []) + evicted_files:
+                delete_session_files(file_path)
+            with self._lock:
+                self._sessions.pop(session.session_id, None)
+                self._sessions[session.session_id] = session
+                self.evictions += len(evicted_files)
+                self._evict_to_fit()
+            return
+        with self._lock:
+            previous = self._sessions.pop(session.session_id, None)
+            if previous is not None and previous.file_path != session.file_path:
+                previous.delete_file()
+            self._sessions[session.session_id] = session
+            self._evict_expired()
+            self._evict_to_fit()
+
+    @contextlib.asynccontextmanager
+    async def edit_lock(self, session: WorkbookSession):
+        """Serialize writes of a session's backing file; with a session database, across worker processes too"""
+        async with session.lock:
+            if self.shared is None:
+                yield
+                return
+            lock_file = await run_blocking_io(lock_session_file, session.file_path)
+            try:
+                yield
+            finally:
+                unlock_session_file(lock_file)
+
+    async def apply_changes(self, session: WorkbookSession, changes: List[Tuple[int, dict]]) -> WorkbookSession:
+        """Apply task edits as the session's next version; returns the session to use from then on
+
+        The edits are marked dirty and reach the backing workbook with the next write_back();
+        portfolio sessions are never written back, so their edits are not marked. With a session
+        database they are stored first and then taken over, so every worker ends up with the same
+        tasks whatever order the edits arrive in.
+        """
+        mark_dirty = not is_portfolio(session)
+        if self.shared is None:
+            for position, fields in changes:
+                session.workbook.update_project(position, **fields)
+                for field in fields if mark_dirty else ():
+                    session.dirty[position] = session.dirty.get(position, 0) | DIRTY_FLAGS[field]
+            session.bump()
+            return session
+        version = await run_blocking_io(self.shared.update_tasks, session.session_id, session.token, changes,
+                                        mark_dirty)
+        current = await self.get(session.session_id) if version is not None else None
+        if current is None or current.token != session.token:
+            raise HTTPException(status_code=409, detail="The workbook was replaced or evicted by another request")
+        return current
+
+    async def write_back(self, session: WorkbookSession):
+        """Write the tasks edited since the last write-back into the backing workbook (dirty rows only)"""
+        async with self.edit_lock(session):
+            if self.shared is None:
+                version = session.version
+                sheet_rows = session.workbook.row_index.sheet_rows
+                tasks = [(sheet_rows[position], dirty, *(session.workbook.projects[position][field] for field in EDITABLE_FIELDS))
+                         for position, dirty in session.dirty.items()]
+            else:
+                version, tasks = await run_blocking_io(self.shared.dirty_tasks, session.session_id, session.token)
+            if not tasks:
+                return
+            cell_updates = dirty_cell_updates(tasks)
+            if cell_updates:
+                # Load, update and save the workbook in the process pool
+                with STAGE_SECONDS.time(stage="save"):
+                    await run_cpu_bound(apply_workbook_updates, session.file_path, cell_updates)
+            session.size = os.path.getsize(session.file_path)
+            if self.shared is not None:
+                await run_blocking_io(self.shared.mark_written, session.session_id, session.token, version, session.size)
+                return
+            if session.version == version:  # Otherwise edits arrived meanwhile: keep all flags, rewriting is harmless
+                session.dirty.clear()
+            with self._lock:
+                self._evict_to_fit()
+
+    def clear(self):
+        with self._lock:
+            if self.shared is None:
+                for session in self._sessions.values():
+                    session.delete_file()
+            self._sessions.clear()
+        if self.shared is not None:
+            # The other workers (and this one after a restart) keep using the stored sessions
+            self.shared.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self.shared is None:
+                self._evict_expired()
+                sessions = len(self._sessions)
+                total_bytes = sum(session.size for session in self._sessions.values())
+                dirty_tasks = sum(len(session.dirty) for session in self._sessions.values())
+            stats = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+        if self.shared is None:
+            return {"sessions": sessions, "bytes": total_bytes, "dirty_tasks": dirty_tasks, **stats}
+        sessions, total_bytes, dirty_tasks = self.shared.stats()
+        return {"sessions": sessions, "bytes": total_bytes, "dirty_tasks": dirty_tasks, **stats,
+                "shared_state": self.shared.path, "worker_pid": os.getpid(), "local_sessions": len(self._sessions),
+                "reloads": self.reloads, "refreshes": self.refreshes}
+
+    def _evict(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        if self.shared is None:
+            session.delete_file()
+            self.evictions += 1
+
+    def _evict_expired(self):
+        deadline = time.monotonic() - self.ttl_seconds
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_access < deadline]:
+            self._evict(session_id)
+
+    def _evict_to_fit(self):
+        # Never evict the most recently used session, even if it alone exceeds the byte limit.
+        # With a session database only the local copy count is bounded; files are evicted in the database.
+        total_bytes = 0 if self.shared is not None else sum(session.size for session in self._sessions.values())
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_entries or total_bytes > self.max_bytes):
+            session_id = next(iter(self._sessions))
+            if self.shared is None:
+                total_bytes -= self._sessions[session_id].size
+            self._evict(session_id)
+
+workbook_store = WorkbookStore(SESSION_MAX_ENTRIES, SESSION_MAX_BYTES, SESSION_TTL_SECONDS,
+                               SharedSessionState(SESSION_STATE_PATH, SESSION_FILES_DIR) if SESSION_STATE_PATH else None)
+
+def get_session_id(x_session_id: Optional[str] = Header(None)) -> str:
+    """Session (workbook) id from the X-Session-Id header; clients without one share the default session"""
+    return x_session_id or DEFAULT_SESSION_ID
+
+async def require_session(session_id: str, detail: str = "No Excel file uploaded") -> WorkbookSession:
+    session = await workbook_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=400, detail=detail)
+    return session
+
+@app.on_event("shutdown")
+async def shutdown_sessions():
+    workbook_store.clear()
 
 @app.get("/")
 async def root():
@@ -115,13 +1152,7 @@ async def dutch_test():
         }
     
     try:
-        # Initialize OpenAI client
-        try:
-            client = OpenAI(api_key=openai_api_key)
-        except Exception as init_error:
-            import openai
-            openai.api_key = openai_api_key
-            client = openai
+        client = get_transcription_client()
         
         # Test with a simple Dutch phrase
         test_text = "Dit is een test van de Nederlandse taalverwerking."
@@ -130,7 +1161,8 @@ async def dutch_test():
             "dutch_support": True,
             "message": "Dutch language processing is configured",
             "test_phrase": test_text,
-            "client_type": "new" if hasattr(client, 'audio') else "old"
+            "client_type": "async-pooled",
+            "client": client.stats()
         }
         
     except Exception as e:
@@ -139,605 +1171,2930 @@ async def dutch_test():
             "message": f"Error testing Dutch support: {str(e)}"
         }
 
-@app.post("/upload-excel")
-async def upload_excel(file: UploadFile = File(...)):
-    """Upload and parse Excel file containing Gantt chart data"""
-    global current_excel_file
-    
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="File must be an Excel file")
-    
+# Excel layout: rows before this DataFrame index hold the sheet header
+EXCEL_HEADER_ROWS = 8
+# Worksheet columns (1-based) holding the start and end dates (DataFrame columns 4 and 5),
+# the status and the completion (DataFrame columns 7 and 8)
+START_DATE_COLUMN = 5
+END_DATE_COLUMN = 6
+STATUS_COLUMN = 8
+COMPLETION_COLUMN = 9
+# Names in the Activiteiten column that mark header or section rows (like "Generieke services", "Autoschade")
+SKIPPED_ROW_NAMES = {'activiteiten', 'nan', 'generieke services', 'autoschade'}
+
+def _column_text(column: "pd.Series") -> "pd.Series":
+    """Return str(value) for every present cell and "" for empty cells"""
+    return column.astype(object).map(str).where(column.notna(), "")
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float))
+
+def _parse_completion_text(text: str) -> int:
+    """Parse a textual completion cell like "35%" or "0.2" into a percentage"""
     try:
-        # Save uploaded file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-        shutil.copyfileobj(file.file, temp_file)
-        temp_file.close()
-        
-        current_excel_file = temp_file.name
-        
-        # Read Excel file
-        df = pd.read_excel(temp_file.name)
-        
-        # Extract project data (assuming specific structure)
-        projects = []
-        
-        # Look for project data in the Excel file
-        for index, row in df.iterrows():
-            # Skip rows before row 8 (where headers start)
-            if index < 8:
-                continue
-                
-            # Check if this row contains project data
-            project_name = str(row.iloc[1]) if pd.notna(row.iloc[1]) else ""  # Activiteiten column
-            item_id = str(row.iloc[0]) if pd.notna(row.iloc[0]) else ""      # # column
-            
-            # Skip if no meaningful data or if it's a header
-            if not project_name.strip() or project_name.strip().lower() in ['activiteiten', 'nan']:
-                continue
-                
-            # Skip section headers (like "Generieke services", "Autoschade")
-            if project_name.strip().lower() in ['generieke services', 'autoschade']:
-                continue
-                
-            # Extract data from the row
-            team = "Unassigned"  # Default team value
-            start_date = None
-            end_date = None
-            status = "Planning"
-            completed = 0
-            activity_type = "general"
-            
-            # Parse team from column 3 (Team column)
-            if len(row) > 3 and pd.notna(row.iloc[3]):
-                team_value = str(row.iloc[3]).strip()
-                if team_value and team_value.lower() != 'nan':
-                    team = team_value
-            
-            # Parse dates from columns 4 and 5 (Start and End dates)
-            if len(row) > 4 and pd.notna(row.iloc[4]):
-                try:
-                    if isinstance(row.iloc[4], datetime):
-                        start_date = row.iloc[4].strftime('%Y-%m-%d')
-                    else:
-                        start_date = str(row.iloc[4])
-                except:
-                    start_date = str(row.iloc[4]) if pd.notna(row.iloc[4]) else None
-                    
-            if len(row) > 5 and pd.notna(row.iloc[5]):
-                try:
-                    if isinstance(row.iloc[5], datetime):
-                        end_date = row.iloc[5].strftime('%Y-%m-%d')
-                    else:
-                        end_date = str(row.iloc[5])
-                except:
-                    end_date = str(row.iloc[5]) if pd.notna(row.iloc[5]) else None
-            
-            # Parse status from column 7
-            if len(row) > 7 and pd.notna(row.iloc[7]):
-                status = str(row.iloc[7])
-            
-            # Parse completion percentage from column 8
-            if len(row) > 8 and pd.notna(row.iloc[8]):
-                try:
-                    completed_value = row.iloc[8]
-                    if isinstance(completed_value, (int, float)):
-                        # Convert decimal to percentage (e.g., 0.2 -> 20, 1 -> 100)
-                        if completed_value <= 1:
-                            completed = int(completed_value * 100)
-                        else:
-                            completed = int(completed_value)
-                    else:
-                        completed_str = str(completed_value).strip()
-                        if '%' in completed_str:
-                            completed = int(completed_str.replace('%', '').strip())
-                        elif completed_str.replace('.', '').isdigit():
-                            completed = int(float(completed_str) * 100)
-                        else:
-                            completed = 0
-                except (ValueError, TypeError):
-                    completed = 0
-            
-            # Determine activity type based on item ID
-            is_title = False
-            if item_id and item_id.strip() != 'nan':
-                if '.' in item_id:
-                    if item_id.count('.') == 1:  # e.g., "1.1", "1.2"
-                        activity_type = "sub-activity"
-                        is_title = False
-                    elif item_id.count('.') > 1:  # e.g., "1.4.1"
-                        activity_type = "sub-sub-activity"
-                        is_title = False
-                    else:
-                        activity_type = "main-item"
-                        is_title = True
-                elif item_id.isdigit():
-                    activity_type = "main-item"
-                    is_title = True  # Main items are titles
-                else:
-                    # For items without dots, check if they're main activities
-                    # Main activities are typically single numbers or have no hierarchical structure
-                    activity_type = "main-item"
-                    is_title = True
-            else:
-                # If no item_id, treat as main activity
-                activity_type = "main-item"
-                is_title = True
-            
-            # Clean up the project name
-            if project_name and project_name.strip() and project_name.strip() != "nan":
-                clean_name = project_name.strip()
-                project_data = {
-                    "name": clean_name,
-                    "item_id": item_id if item_id.strip() != 'nan' else "",
-                    "activity_type": activity_type,
-                    "is_title": is_title,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "team": team,
-                    "status": status,
-                    "completed": completed
-                }
-                projects.append(project_data)
-                print(f"DEBUG: Added project '{clean_name}' with item_id='{item_id}', is_title={is_title}, activity_type={activity_type}")
-                
+        if '%' in text:
+            return round(float(text.replace('%', '').strip()))
+        if text.replace('.', '').isdigit():
+            return round(float(text) * 100)
+    except (ValueError, TypeError):
+        pass
+    return 0
 
-        
-        # Store projects in global variable for task proposals
-        global current_projects
-        current_projects = projects
-        
-        return {
-            "message": "Excel file uploaded successfully",
-            "filename": file.filename,
-            "projects": projects,
-            "total_rows": len(df)
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing Excel file: {str(e)}")
+class Percentage(int):
+    """A completion percentage to write back into a worksheet cell (see completion_cell_value)"""
 
-@app.post("/process-audio")
-async def process_audio(audio_file: UploadFile = File(...)):
-    """Process audio file and extract project updates using OpenAI Whisper API"""
-    
-    print(f"DEBUG: Received audio file: {audio_file.filename}, size: {audio_file.size}")
-    
-    # Accept more audio formats including webm
-    allowed_extensions = ('.wav', '.mp3', '.m4a', '.webm', '.ogg')
-    if not audio_file.filename.lower().endswith(allowed_extensions):
-        print(f"DEBUG: Invalid file extension: {audio_file.filename}")
-        raise HTTPException(status_code=400, detail=f"Audio file must be one of: {', '.join(allowed_extensions)}")
-    
+def completion_cell_value(percentage: int, old_value, percent_format: bool):
+    """The cell value for a completion percentage, in the form the cell already uses
+
+    %-formatted cells and cells holding a fraction get a fraction, "NN%" text stays text and
+    anything else gets the whole percentage. Every form parses back to the same percentage;
+    a whole 1 would read as the fraction 100%, so it is written as 0.01.
+    """
+    if isinstance(old_value, str) and '%' in old_value:
+        return f"{percentage}%"
+    if percent_format or (_is_number(old_value) and 0 < old_value <= 1) or percentage == 1:
+        return percentage / 100
+    return int(percentage)
+
+def _completion_column(column: "pd.Series") -> "pd.Series":
+    """Convert the completion column to integer percentages (0.2 -> 20, 35 -> 35, "35%" -> 35)"""
+    completed = pd.Series(0, index=column.index, dtype='int64')
+    present = column.notna()
+    if column.dtype.kind in 'biuf':
+        numeric = present
+    else:
+        numeric = present & column.map(_is_number).astype(bool)
+
+    if numeric.any():
+        # Decimals are fractions (e.g., 0.2 -> 20, 1 -> 100), larger numbers are percentages already
+        values = column[numeric].astype(float).to_numpy()
+        completed[numeric] = np.rint(np.where(values <= 1, values * 100, values)).astype('int64')
+
+    text = present & ~numeric
+    if text.any():
+        completed[text] = column[text].map(lambda value: _parse_completion_text(str(value).strip())).astype('int64')
+    return completed
+
+# Dates are normalized once at ingest: date cells and free-text dates (Dutch or English, day
+# first unless the year leads) become "YYYY-MM-DD"; text that is not a date is kept as it is.
+# ProjectStore keeps the parsed dates as arrays of proleptic ordinals (0 = no date).
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}(?![\d])")
+DUTCH_DATE_WORDS = {
+    "januari": "january", "februari": "february", "maart": "march", "mrt": "mar", "mei": "may",
+    "juni": "june", "juli": "july", "augustus": "august", "oktober": "october", "okt": "oct",
+    "maandag": "monday", "dinsdag": "tuesday", "woensdag": "wednesday", "donderdag": "thursday",
+    "vrijdag": "friday", "zaterdag": "saturday", "zondag": "sunday",
+}
+DUTCH_DATE_WORD = re.compile(r"\b(" + "|".join(DUTCH_DATE_WORDS) + r")\b", re.IGNORECASE)
+YEAR_FIRST = re.compile(r"^\d{4}\D")
+
+def parse_date_text(text: str) -> Optional[datetime.date]:
+    """Parse a free-text date, or None when it is not a complete day and month"""
+    parts = _parse_date_parts(text)
+    if parts is None:
+        return None
+    year, month, day = parts
     try:
-        # Check if OpenAI API key is available
-        openai_api_key = os.environ.get("OPENAI_API_KEY")
-        if not openai_api_key:
-            print("DEBUG: OpenAI API key not found")
-            return {
-                "transcript": "Audio processing requires OpenAI API key. Please contact support.",
-                "summary": "Audio processing service is not properly configured.",
-                "taskProposals": [],
-                "project_updates": []
-            }
-        
-        # Initialize OpenAI client
-        print(f"DEBUG: Starting OpenAI client initialization...")
-        use_new_format = False
+        return datetime.date(year or datetime.date.today().year, month, day)  # "5 augustus": this year
+    except ValueError:
+        return None  # "29 februari" outside a leap year
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_parts(text: str) -> Optional[Tuple[Optional[int], int, int]]:
+    """(year or None when the text has none, month, day) of a free-text date; memoized, so it must
+    not depend on the current date"""
+    text = text.strip()
+    if ISO_DATE.match(text):
         try:
-            client = OpenAI(api_key=openai_api_key)
-            print(f"DEBUG: OpenAI client initialized successfully with new format")
-            use_new_format = True
-        except Exception as init_error:
-            print(f"DEBUG: OpenAI client initialization failed: {str(init_error)}")
-            # Try alternative initialization
-            try:
-                import openai
-                openai.api_key = openai_api_key
-                client = openai
-                print(f"DEBUG: OpenAI client initialized with old format")
-                use_new_format = False
-            except Exception as alt_error:
-                print(f"DEBUG: Alternative initialization also failed: {str(alt_error)}")
-                return {
-                    "transcript": "Audio processing service is temporarily unavailable. Please try again later.",
-                    "summary": "Audio processing service is being updated.",
-                    "taskProposals": [],
-                    "project_updates": []
-                }
-        
-        # Save audio file temporarily
-        file_extension = os.path.splitext(audio_file.filename)[1].lower()
-        temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=file_extension)
-        shutil.copyfileobj(audio_file.file, temp_audio)
-        temp_audio.close()
-        
-        audio_file_path = temp_audio.name
-        cleanup_files = [temp_audio.name]
-        
-        # Process audio with OpenAI Whisper API
+            date = datetime.date.fromisoformat(text[:10])
+        except ValueError:
+            return None
+        return date.year, date.month, date.day
+    if not text or text.replace(".", "").isdigit():
+        return None  # Bare numbers are not dates
+    translated = DUTCH_DATE_WORD.sub(lambda match: DUTCH_DATE_WORDS[match.group(0).lower()], text)
+    year_first = YEAR_FIRST.match(translated) is not None
+    try:
+        # Parse against two different defaults to tell which parts the text really contains; both
+        # are leap years so a year-less "29 februari" parses (parse_date_text checks the real year)
+        first = parser.parse(translated, dayfirst=not year_first, yearfirst=year_first,
+                             default=datetime.datetime(2000, 1, 1))
+        second = parser.parse(translated, dayfirst=not year_first, yearfirst=year_first,
+                              default=datetime.datetime(2004, 3, 3))
+    except (ValueError, OverflowError):
+        return None
+    if (first.month, first.day) != (second.month, second.day):
+        return None
+    return first.year if first.year == second.year else None, first.month, first.day
+
+def normalize_date_value(value) -> Optional[str]:
+    """A cell value as "YYYY-MM-DD" when it is a date, its text otherwise, None when empty"""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    text = str(value)
+    if not text.strip():
+        return None
+    parsed = parse_date_text(text)
+    return parsed.isoformat() if parsed else text
+
+def date_ordinal(value: Optional[str]) -> int:
+    """Ordinal of a normalized "YYYY-MM-DD" date, 0 for text and missing dates"""
+    if value and ISO_DATE.match(value):
         try:
-            print("DEBUG: Starting speech recognition with OpenAI Whisper API...")
-            print(f"DEBUG: Audio file path: {audio_file_path}")
-            print(f"DEBUG: Audio file size: {os.path.getsize(audio_file_path)} bytes")
-            
-            with open(audio_file_path, "rb") as file_obj:
-                print(f"DEBUG: File opened successfully, making API call...")
-                # Always use the new API format since that's what's available
-                print("DEBUG: Making API call to OpenAI...")
-                try:
-                    # Try using the old client format that was successfully initialized
-                    print("DEBUG: Using old client format for API call")
-                    transcript_response = client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=file_obj,
-                        language="nl",  # Dutch language
-                        response_format="text",
-                        prompt="This is a Dutch business meeting about project management and task updates."
-                    )
-                    print("DEBUG: API call completed successfully")
-                    transcript = transcript_response
-                except Exception as api_error:
-                    print(f"DEBUG: API call failed: {str(api_error)}")
-                    # Try alternative approach with requests library
-                    try:
-                        print("DEBUG: Trying alternative API call method")
-                        import requests
-                        headers = {
-                            'Authorization': f'Bearer {openai_api_key}'
-                        }
-                        files = {
-                            'file': ('audio.webm', file_obj, 'audio/webm'),
-                            'model': (None, 'whisper-1'),
-                            'language': (None, 'nl'),
-                            'response_format': (None, 'text'),
-                            'prompt': (None, 'This is a Dutch business meeting about project management and task updates.')
-                        }
-                        response = requests.post(
-                            'https://api.openai.com/v1/audio/transcriptions',
-                            headers=headers,
-                            files=files
-                        )
-                        if response.status_code == 200:
-                            transcript = response.text
-                            print("DEBUG: Alternative API call completed successfully")
-                        else:
-                            print(f"DEBUG: Alternative API call failed with status {response.status_code}")
-                            transcript = "Could not understand audio. Please try again with clearer speech."
-                    except Exception as alt_error:
-                        print(f"DEBUG: Alternative API call also failed: {str(alt_error)}")
-                        transcript = "Could not understand audio. Please try again with clearer speech."
-            
-            print(f"DEBUG: Speech recognition successful: {transcript[:100]}...")
-            
-            # Check if transcript is empty or contains error messages
-            if not transcript or transcript.strip() == "":
-                transcript = "Could not understand audio. Please try again with clearer speech."
-            elif "could not understand" in transcript.lower() or "unclear" in transcript.lower():
-                transcript = "Could not understand audio. Please try again with clearer speech."
-            
-        except Exception as api_error:
-            print(f"DEBUG: OpenAI API processing failed: {str(api_error)}")
-            transcript = "Could not understand audio. Please try again with clearer speech."
-        
-        # Clean up temp files
-        for file_path in cleanup_files:
-            try:
-                os.unlink(file_path)
-            except:
-                pass
-        
-        # Extract project updates from transcript
-        project_updates = extract_project_updates(transcript)
-        
-        # Generate AI-powered task proposals based on transcript
-        task_proposals = generate_task_proposals(transcript)
-        
-        # Generate meeting summary
-        summary = generate_meeting_summary(transcript)
-        
-        return {
-            "transcript": transcript,
-            "summary": summary,
-            "taskProposals": task_proposals,
-            "project_updates": project_updates
-        }
-        
-    except Exception as e:
-        print(f"DEBUG: Error in audio processing: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
+            return datetime.date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            return 0
+    return 0
 
-def extract_project_updates(transcript: str) -> List[ProjectUpdate]:
-    """Extract project updates from transcript using regex patterns"""
-    updates = []
-    
-    # Patterns to match project updates
-    patterns = [
-        r"(\w+)\s+(?:is|are)\s+(\d+)\s*%?\s*(?:complete|done|finished)",
-        r"(\w+)\s+(?:has|have)\s+(?:been\s+)?(completed|finished|done)",
-        r"(\w+)\s+(?:start|begin)\s+(?:on|from)\s+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
-        r"(\w+)\s+(?:end|finish)\s+(?:on|by)\s+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            project_name = match.group(1)
-            update_info = match.group(2)
-            
-            # Create a basic update (you can enhance this)
-            update = ProjectUpdate(
-                project_name=project_name,
-                task_name=project_name,
-                new_start_date="",
-                new_end_date=""
-            )
-            updates.append(update)
-    
-    return updates
+# Project records: one __slots__ object per task instead of a nine-key dict, so a large portfolio
+# takes a fraction of the memory. Records still read like the project dicts (record["name"]).
+PROJECT_FIELDS = ("name", "item_id", "activity_type", "is_title", "start_date", "end_date", "team", "status", "completed")
+# Fields with a value -> positions index in ProjectStore
+INDEXED_FIELDS = ("item_id", "team", "status", "activity_type")
 
-def generate_task_proposals(transcript: str) -> List[dict]:
-    """Generate AI-powered task proposals based on transcript analysis"""
-    proposals = []
-    
-    # Keywords that indicate task status changes
-    status_keywords = {
-        "completed": ["complete", "finished", "done", "accomplished", "finalized", "klaar", "voltooid", "afgerond"],
-        "in_progress": ["progress", "ongoing", "working", "developing", "implementing", "bezig", "lopen", "werken"],
-        "delayed": ["delay", "behind", "late", "postponed", "extended", "vertraagd", "achter", "laat"],
-        "blocked": ["block", "stuck", "issue", "problem", "obstacle", "blokker", "probleem", "obstakel"]
-    }
-    
-    # Get current projects from global variable
-    global current_projects
-    available_tasks = current_projects if current_projects else []
-    
-    # Dutch and English task patterns
-    task_patterns = [
-        # Dutch patterns
-        r"(?:tussentijds|opslaan|bestand)\s+(?:is|zijn)\s+(\d+)\s*%?\s*(?:klaar|voltooid|gedaan)",
-        r"(?:tussentijds|opslaan|bestand)\s+(?:heeft|hebben)\s+(?:al\s+)?(voltooid|afgerond|klaar)",
-        r"(?:tussentijds|opslaan|bestand)\s+(?:is|zijn)\s+(vertraagd|achter|laat)",
-        r"(?:tussentijds|opslaan|bestand)\s+(?:is|zijn)\s+(geblokkeerd|vastgelopen|geblokkeerd)",
-        # English patterns
-        r"(\w+)\s+(?:is|are)\s+(\d+)\s*%?\s*(?:complete|done|finished)",
-        r"(\w+)\s+(?:has|have)\s+(?:been\s+)?(completed|finished|done)",
-        r"(\w+)\s+(?:is|are)\s+(delayed|behind|late)",
-        r"(\w+)\s+(?:is|are)\s+(blocked|stuck|blocking)"
-    ]
-    
-    # First, try to match specific tasks mentioned in the transcript
-    for task in available_tasks:
-        task_name_lower = task['name'].lower()
-        transcript_lower = transcript.lower()
-        
-        # Check if task name is mentioned in transcript
-        if task_name_lower in transcript_lower:
-            # Look for status indicators near the task mention
-            status_found = None
-            progress_found = None
-            
-            # Check for Dutch status patterns
-            if any(keyword in transcript_lower for keyword in status_keywords["completed"]):
-                status_found = "Completed"
-                progress_found = 100
-            elif any(keyword in transcript_lower for keyword in status_keywords["delayed"]):
-                status_found = "Delayed"
-                progress_found = 30
-            elif any(keyword in transcript_lower for keyword in status_keywords["blocked"]):
-                status_found = "Blocked"
-                progress_found = 20
-            elif any(keyword in transcript_lower for keyword in status_keywords["in_progress"]):
-                status_found = "In Progress"
-                progress_found = 50
-            
-            if status_found:
-                proposals.append({
-                    "id": f"proposal-{len(proposals) + 1}",
-                    "taskId": task['item_id'],  # Use actual task ID from Excel
-                    "proposedStatus": status_found,
-                    "proposedProgress": progress_found,
-                    "reason": f"Task '{task['name']}' status mentioned in meeting",
-                    "confidence": 0.8,
-                    "meetingId": f"meeting-{int(time.time())}",
-                    "timestamp": datetime.datetime.now().isoformat()
-                })
-    
-    # If no specific tasks found, create general proposals based on transcript content
-    if not proposals and available_tasks:
-        # Look for general status mentions
-        if any(keyword in transcript.lower() for keyword in status_keywords["completed"]):
-            # Propose completion for first main task
-            main_tasks = [t for t in available_tasks if t['activity_type'] == 'main-item']
-            if main_tasks:
-                task = main_tasks[0]
-                proposals.append({
-                    "id": f"proposal-{len(proposals) + 1}",
-                    "taskId": task['item_id'],
-                    "proposedStatus": "Completed",
-                    "proposedProgress": 100,
-                    "reason": "Completion mentioned in meeting",
-                    "confidence": 0.6,
-                    "meetingId": f"meeting-{int(time.time())}",
-                    "timestamp": datetime.datetime.now().isoformat()
-                })
-        
-        elif any(keyword in transcript.lower() for keyword in status_keywords["delayed"]):
-            # Propose delay for first main task
-            main_tasks = [t for t in available_tasks if t['activity_type'] == 'main-item']
-            if main_tasks:
-                task = main_tasks[0]
-                proposals.append({
-                    "id": f"proposal-{len(proposals) + 1}",
-                    "taskId": task['item_id'],
-                    "proposedStatus": "Delayed",
-                    "proposedProgress": 30,
-                    "reason": "Delay mentioned in meeting",
-                    "confidence": 0.6,
-                    "meetingId": f"meeting-{int(time.time())}",
-                    "timestamp": datetime.datetime.now().isoformat()
-                })
-    
-    return proposals
+class ProjectRecord:
+    """One parsed task row"""
+    __slots__ = PROJECT_FIELDS
 
-def generate_meeting_summary(transcript: str) -> str:
-    """Generate a concise meeting summary from transcript"""
-    
-    # Extract key points
-    key_points = []
-    
-    # Look for action items (Dutch and English)
-    action_patterns = [
-        # Dutch patterns
-        r"(?:we moeten|we moeten|we moeten|actie|todo)\s+(.+?)(?:\.|$)",
-        r"(?:toewijzen|delegeren)\s+(.+?)\s+aan\s+(.+?)(?:\.|$)",
-        r"(?:aanpassen|wijzigen|veranderen)\s+(.+?)(?:\.|$)",
-        r"(?:hulp nodig|help nodig)\s+(?:van|bij)\s+(.+?)(?:\.|$)",
-        r"(?:stuurgroep|steering group)\s+(.+?)(?:\.|$)",
-        # English patterns
-        r"(?:need to|should|must|will)\s+(.+?)(?:\.|$)",
-        r"(?:action item|todo|task)\s*:\s*(.+?)(?:\.|$)",
-        r"(?:next step|next action)\s*:\s*(.+?)(?:\.|$)"
-    ]
-    
-    for pattern in action_patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            if len(match.groups()) > 1:
-                key_points.append(f"Action: {match.group(1).strip()} to {match.group(2).strip()}")
-            else:
-                key_points.append(f"Action: {match.group(1).strip()}")
-    
-    # Look for progress updates (Dutch and English)
-    progress_patterns = [
-        # Dutch patterns
-        r"(\w+)\s+(?:is|zijn)\s+(\d+)\s*%?\s*(?:klaar|voltooid|gedaan)",
-        r"(\w+)\s+(?:heeft|hebben)\s+(?:al\s+)?(voltooid|afgerond|klaar)",
-        # English patterns
-        r"(\w+)\s+(?:is|are)\s+(\d+)\s*%?\s*(?:complete|done)",
-        r"(\w+)\s+(?:has|have)\s+(?:been\s+)?(completed|finished)"
+    def __init__(self, name, item_id, activity_type, is_title, start_date, end_date, team, status, completed):
+        self.name = name
+        self.item_id = item_id
+        self.activity_type = activity_type
+        self.is_title = is_title
+        self.start_date = start_date
+        self.end_date = end_date
+        self.team = team
+        self.status = status
+        self.completed = completed
+
+    @classmethod
+    def from_dict(cls, project: dict) -> "ProjectRecord":
+        return cls(*(project.get(field) for field in PROJECT_FIELDS))
+
+    def __getitem__(self, field: str):
+        if field not in PROJECT_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field: str, default=None):
+        return getattr(self, field) if field in PROJECT_FIELDS else default
+
+    def values(self) -> tuple:
+        return _record_values(self)
+
+    def to_dict(self) -> dict:
+        return dict(zip(PROJECT_FIELDS, self.values()))
+
+    def copy(self) -> "ProjectRecord":
+        return ProjectRecord(*self.values())
+
+_record_values = operator.attrgetter(*PROJECT_FIELDS)
+
+class ProjectStore:
+    """Project records in sheet order with value -> positions indexes on INDEXED_FIELDS and
+    start/end date ordinal arrays.
+
+    Positions are stable (they are shared with RowIndex and TaskMatcher); change records through
+    update() so the indexes and the version stay current.
+    """
+
+    def __init__(self, projects):
+        self.records = [project if isinstance(project, ProjectRecord) else ProjectRecord.from_dict(project)
+                        for project in projects]
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        for position, record in enumerate(self.records):
+            for field in INDEXED_FIELDS:
+                self.indexes[field].setdefault(getattr(record, field), []).append(position)
+        self.start_ordinals = array.array("i", (date_ordinal(record.start_date) for record in self.records))
+        self.end_ordinals = array.array("i", (date_ordinal(record.end_date) for record in self.records))
+        self.version = 0
+
+    def __getstate__(self):
+        # Pickled column-wise when results leave the process pool: a few long lists of plain values
+        # are far cheaper to pickle than one object state per record
+        columns = [list(column) for column in zip(*(record.values() for record in self.records))]
+        return columns, self.indexes, self.start_ordinals, self.end_ordinals, self.version
+
+    def __setstate__(self, state):
+        columns, self.indexes, self.start_ordinals, self.end_ordinals, self.version = state
+        self.records = [ProjectRecord(*values) for values in zip(*columns)]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, position: int) -> ProjectRecord:
+        return self.records[position]
+
+    def positions(self, field: str, value) -> List[int]:
+        """Ascending positions of the records whose indexed `field` equals `value`"""
+        return self.indexes[field].get(value, [])
+
+    def first(self, field: str, value) -> Optional[ProjectRecord]:
+        positions = self.positions(field, value)
+        return self.records[positions[0]] if positions else None
+
+    def update(self, position: int, **changes):
+        record = self.records[position]
+        for field, value in changes.items():
+            old = getattr(record, field)
+            if old == value:
+                continue
+            if field in self.indexes:
+                index = self.indexes[field]
+                index[old].remove(position)
+                if not index[old]:
+                    del index[old]
+                bisect.insort(index.setdefault(value, []), position)
+            elif field == "start_date":
+                self.start_ordinals[position] = date_ordinal(value)
+            elif field == "end_date":
+                self.end_ordinals[position] = date_ordinal(value)
+            setattr(record, field, value)
+        self.version += 1
+
+    def to_dicts(self) -> List[dict]:
+        return [record.to_dict() for record in self.records]
+
+    def copy(self) -> "ProjectStore":
+        store = ProjectStore.__new__(ProjectStore)
+        store.records = [record.copy() for record in self.records]
+        store.indexes = {field: {value: list(positions) for value, positions in index.items()}
+                         for field, index in self.indexes.items()}
+        store.start_ordinals = array.array("i", self.start_ordinals)
+        store.end_ordinals = array.array("i", self.end_ordinals)
+        store.version = self.version
+        return store
+
+# Rollups: parents come from the item_id outline ("1.4.1" -> "1.4" -> "1"; a missing level
+# attaches to the nearest existing ancestor). Every node keeps its aggregate (earliest start,
+# latest end and duration-weighted completion), so a task change only recomputes its path to the root.
+
+class RollupTree:
+    """item_id hierarchy over a ProjectStore with per-node rollups, indexed by store position"""
+
+    def __init__(self, store: ProjectStore):
+        self.store = store
+        count = len(store)
+        self.parent = [-1] * count
+        self.children = [[] for _ in range(count)]
+        first_position = {}
+        for position, record in enumerate(store):
+            if record.item_id and record.item_id not in first_position:
+                first_position[record.item_id] = position
+        for position, record in enumerate(store):
+            parts = record.item_id.split(".") if record.item_id else []
+            for depth in range(len(parts) - 1, 0, -1):
+                parent = first_position.get(".".join(parts[:depth]))
+                if parent is not None:
+                    self.parent[position] = parent
+                    self.children[parent].append(position)
+                    break
+        # Date ordinals like the store's, 0 when no task below the node has a date
+        self.start = array.array("i", bytes(4 * count))
+        self.end = array.array("i", bytes(4 * count))
+        self.weighted = [0.0] * count
+        self.weight = [0.0] * count
+        # Deeper outline levels first, so children are aggregated before their parents
+        for position in sorted(range(count), key=lambda position: -store[position].item_id.count(".")):
+            self._recompute(position)
+
+    def _recompute(self, position: int):
+        children = self.children[position]
+        if children:
+            self.start[position] = min((self.start[child] for child in children if self.start[child]), default=0)
+            self.end[position] = max((self.end[child] for child in children), default=0)
+            self.weighted[position] = sum(self.weighted[child] for child in children)
+            self.weight[position] = sum(self.weight[child] for child in children)
+            return
+        start, end = self.store.start_ordinals[position], self.store.end_ordinals[position]
+        # Weight by duration in days; undated tasks count as a single day
+        weight = max(end - start, 0) + 1 if start and end else 1
+        self.start[position], self.end[position] = start, end
+        self.weighted[position] = min(max(self.store[position].completed or 0, 0), 100) * weight
+        self.weight[position] = weight
+
+    def update(self, position: int) -> List[int]:
+        """Recompute a changed task and its ancestors; returns the recomputed positions, task first"""
+        path = []
+        while position != -1:
+            self._recompute(position)
+            path.append(position)
+            position = self.parent[position]
+        return path
+
+    def path(self, position: int) -> List[int]:
+        path = []
+        while position != -1:
+            path.append(position)
+            position = self.parent[position]
+        return path
+
+    def rollup(self, position: int) -> dict:
+        record = self.store[position]
+        start, end = self.start[position], self.end[position]
+        return {
+            "item_id": record.item_id,
+            "name": record.name,
+            "start_date": datetime.date.fromordinal(start).isoformat() if start else None,
+            "end_date": datetime.date.fromordinal(end).isoformat() if end else None,
+            "completed": round(self.weighted[position] / self.weight[position]) if self.weight[position] else 0,
+            "children": len(self.children[position]),
+            "parent_item_id": self.store[self.parent[position]].item_id if self.parent[position] != -1 else None
+        }
+
+# Timeline: a static interval index over the typed dates, rebuilt lazily after date edits.
+# For overlap queries a task with only one date is a one-day interval on that date.
+FINISHED_STATUSES = {"completed", "complete", "done", "afgerond", "klaar", "gereed", "voltooid"}
+
+class TimelineIndex:
+    """Interval index over task date ordinals.
+
+    Intervals are sorted by start with an implicit segment tree of maximum ends over that order,
+    so an overlap query costs O(log n) plus O(log n) per reported task. Due-date queries bisect
+    a second array sorted by end.
+    """
+
+    def __init__(self, store: ProjectStore):
+        intervals = []
+        for position in range(len(store)):
+            start, end = store.start_ordinals[position], store.end_ordinals[position]
+            if start or end:
+                start, end = start or end, end or start
+                intervals.append((min(start, end), max(start, end), position))
+        intervals.sort()
+        self.starts = array.array("i", (interval[0] for interval in intervals))
+        self.ends = array.array("i", (interval[1] for interval in intervals))
+        self.positions = array.array("i", (interval[2] for interval in intervals))
+        self.size = 1
+        while self.size < len(intervals):
+            self.size *= 2
+        self.max_end = array.array("i", bytes(4 * 2 * self.size))  # Empty leaves stay 0
+        self.max_end[self.size:self.size + len(intervals)] = self.ends
+        for node in range(self.size - 1, 0, -1):
+            self.max_end[node] = max(self.max_end[2 * node], self.max_end[2 * node + 1])
+        # Only tasks with an end date of their own have a due date
+        due = sorted((end, position) for position, end in enumerate(store.end_ordinals) if end)
+        self.due_ends = array.array("i", (end for end, _ in due))
+        self.due_positions = array.array("i", (position for _, position in due))
+
+    def overlapping(self, first_day: int, last_day: int) -> List[int]:
+        """Positions of tasks whose interval overlaps [first_day, last_day] (ordinals)"""
+        limit = bisect.bisect_right(self.starts, last_day)
+        found = []
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, node_lo, node_hi = stack.pop()
+            if node_lo >= limit or self.max_end[node] < first_day:
+                continue
+            if node >= self.size:
+                found.append(self.positions[node - self.size])
+                continue
+            middle = (node_lo + node_hi) // 2
+            stack.append((2 * node + 1, middle, node_hi))
+            stack.append((2 * node, node_lo, middle))
+        return found
+
+    def due(self, first_day: int, last_day: int) -> List[int]:
+        """Positions of tasks ending within [first_day, last_day] (ordinals)"""
+        first = bisect.bisect_left(self.due_ends, first_day)
+        last = bisect.bisect_right(self.due_ends, last_day)
+        return list(self.due_positions[first:last])
+
+def parse_projects_frame(df: "pd.DataFrame", sheet_rows: Optional[List[int]] = None) -> List[ProjectRecord]:
+    """Parse Gantt chart rows from a DataFrame column by column instead of row by row
+
+    When `sheet_rows` is given, it is filled with the worksheet row number of every project.
+    """
+    data = df.iloc[EXCEL_HEADER_ROWS:]
+    column_count = data.shape[1]
+    if data.empty or column_count < 2:
+        return []
+
+    # Skip rows without a meaningful name, header rows and section headers
+    names = _column_text(data.iloc[:, 1]).str.strip()
+    keep = names.ne("") & ~names.str.lower().isin(SKIPPED_ROW_NAMES)
+    data = data[keep]
+    names = names[keep]
+    if sheet_rows is not None:
+        # DataFrame index i is worksheet row i + 2 (row 1 holds the column headers)
+        sheet_rows.extend((data.index + 2).tolist())
+
+    # Determine activity type based on item ID: "1" is a main item, "1.1" a sub-activity, "1.4.1" a sub-sub-activity
+    item_ids = _column_text(data.iloc[:, 0])
+    has_id = item_ids.ne("") & item_ids.str.strip().ne('nan')
+    dots = item_ids.str.count(r'\.')
+    activity_types = pd.Series(
+        np.select([has_id & dots.eq(1), has_id & dots.gt(1)], ["sub-activity", "sub-sub-activity"], "main-item"),
+        index=data.index
+    )
+    item_ids = item_ids.where(item_ids.str.strip().ne('nan'), "")
+
+    # Team from column 3, defaulting to "Unassigned"
+    teams = pd.Series("Unassigned", index=data.index, dtype=object)
+    if column_count > 3:
+        team_values = _column_text(data.iloc[:, 3]).str.strip()
+        teams = team_values.where(team_values.ne("") & team_values.str.lower().ne('nan'), "Unassigned")
+
+    # Start and end dates from columns 4 and 5
+    def date_column(position):
+        if column_count <= position:
+            return pd.Series([None] * len(data), index=data.index, dtype=object)
+        column = data.iloc[:, position]
+        present = column.notna().tolist()
+        if pd.api.types.is_datetime64_any_dtype(column):
+            values = column.dt.strftime('%Y-%m-%d').tolist()
+        else:
+            values = [normalize_date_value(value) if is_present else None
+                      for value, is_present in zip(column.tolist(), present)]
+        # Built from a list: Series.where(..., None) would turn the gaps into NaN
+        return pd.Series([value if is_present else None for value, is_present in zip(values, present)],
+                         index=data.index, dtype=object)
+
+    start_dates = date_column(4)
+    end_dates = date_column(5)
+
+    # Status from column 7, completion percentage from column 8
+    statuses = pd.Series("Planning", index=data.index, dtype=object)
+    if column_count > 7:
+        statuses = _column_text(data.iloc[:, 7]).where(data.iloc[:, 7].notna(), "Planning")
+    completed = pd.Series(0, index=data.index, dtype='int64')
+    if column_count > 8:
+        completed = _completion_column(data.iloc[:, 8])
+
+    return [
+        ProjectRecord(name, item_id, activity_type, activity_type == "main-item",
+                      start_date, end_date, team, status, completion)
+        for name, item_id, activity_type, start_date, end_date, team, status, completion in zip(
+            names.tolist(), item_ids.tolist(), activity_types.tolist(), start_dates.tolist(),
+            end_dates.tolist(), teams.tolist(), statuses.tolist(), completed.tolist()
+        )
     ]
+
+# Strings that pd.read_excel treats as empty cells by default
+EXCEL_NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+
+def _cell_value(value):
+    """Convert a raw openpyxl value the way pd.read_excel does, returning None for empty cells"""
+    if value is None or (isinstance(value, str) and value in EXCEL_NA_STRINGS):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _project_from_values(values: tuple) -> Optional[ProjectRecord]:
+    """Build a project record from one row of raw cell values, or None for header/empty rows"""
+    row = [_cell_value(value) for value in values]
+    row += [None] * (9 - len(row))
+    item_value, name_value, _, team_value, start_value, end_value, _, status_value, completed_value = row[:9]
+
+    name = str(name_value).strip() if name_value is not None else ""
+    if not name or name.lower() in SKIPPED_ROW_NAMES:
+        return None
+
+    item_id = str(item_value) if item_value is not None else ""
+    activity_type = "main-item"
+    if item_id and item_id.strip() != 'nan':
+        if item_id.count('.') == 1:
+            activity_type = "sub-activity"
+        elif item_id.count('.') > 1:
+            activity_type = "sub-sub-activity"
+
+    team = "Unassigned"
+    if team_value is not None:
+        team_text = str(team_value).strip()
+        if team_text and team_text.lower() != 'nan':
+            team = team_text
+
+    completed = 0
+    if completed_value is not None:
+        if _is_number(completed_value):
+            completed = round(completed_value * 100) if completed_value <= 1 else round(completed_value)
+        else:
+            completed = _parse_completion_text(str(completed_value).strip())
+
+    return ProjectRecord(
+        name,
+        item_id if item_id.strip() != 'nan' else "",
+        activity_type,
+        activity_type == "main-item",
+        normalize_date_value(start_value),
+        normalize_date_value(end_value),
+        team,
+        str(status_value) if status_value is not None else "Planning",
+        completed
+    )
+
+def iter_projects_streaming(file_path: str, counts: Optional[dict] = None,
+                            sheet_name: Optional[str] = None) -> Iterator[Tuple[int, ProjectRecord]]:
+    """Stream (worksheet row, project record) pairs from a sheet (default: the first) without building a DataFrame
+
+    Rows come from a read-only, values-only openpyxl iterator, so memory stays flat
+    regardless of the sheet size and the other sheets are never read. When `counts` is
+    given, counts["total_rows"] is set to the number of data rows pd.read_excel would have returned.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0] if sheet_name is None else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        next(rows, None)  # First row holds the column headers
+        total_rows = 0
+        for index, values in enumerate(rows):
+            if any(value is not None and value != '' for value in values):
+                total_rows = index + 1  # Trailing empty rows are not counted
+            if index < EXCEL_HEADER_ROWS:
+                continue
+            project = _project_from_values(values)
+            if project:
+                yield index + 2, project
+        if counts is not None:
+            counts["total_rows"] = total_rows
+    finally:
+        workbook.close()
+
+class RowIndex:
+    """Maps lowercased task names and item_ids to project positions and worksheet rows
+
+    Exact lookups are a dict hit, prefix lookups a binary search over the sorted keys and
+    substring lookups a scan over the distinct keys (never over the cells of the sheet).
+    """
+
+    MATCH_MODES = ("exact", "prefix", "substring")
+
+    def __init__(self, projects: List[dict], sheet_rows: List[int]):
+        self.sheet_rows = sheet_rows
+        self._positions = {}
+        self._sorted_keys = None  # Built on the first prefix lookup
+        for position, project in enumerate(projects):
+            self.add(position, project)
+
+    def add(self, position: int, project: dict):
+        for key in self._keys(project):
+            self._positions.setdefault(key, []).append(position)
+        self._sorted_keys = None
+
+    def lookup(self, query: str, match: str = "exact") -> List[int]:
+        """Return the positions of the projects whose name or item_id matches `query`"""
+        query = query.strip().lower()
+        if not query:
+            return []
+        if match == "exact":
+            return list(self._positions.get(query, []))
+        if match == "prefix":
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self._positions)
+            start = bisect.bisect_left(self._sorted_keys, query)
+            keys = itertools.takewhile(lambda key: key.startswith(query), self._sorted_keys[start:])
+        else:
+            keys = (key for key in self._positions if query in key)
+        return sorted({position for key in keys for position in self._positions[key]})
+
+    @staticmethod
+    def _keys(project: dict) -> set:
+        return {key for key in (project["name"].strip().lower(), project["item_id"].strip().lower()) if key}
+
+class TaskMatcher:
+    """Aho-Corasick automaton over lowercased task names and hierarchical item_ids
+
+    One linear scan of a transcript reports every task mention with its position, however many
+    tasks there are. Only item_ids with a dot ("1.4") are matched, and only when they stand
+    alone, so ordinary numbers in the transcript are not mistaken for tasks.
+    """
+
+    def __init__(self, projects: List[dict]):
+        keys = {}
+        for position, project in enumerate(projects):
+            name = project['name'].lower()
+            if name:
+                keys.setdefault((name, False), []).append(position)
+            item_id = project['item_id'].strip().lower()
+            if '.' in item_id:
+                keys.setdefault((item_id, True), []).append(position)
+
+        # Trie of all keys; outputs hold (key length, project positions, is item_id) per state
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+        for (key, is_item_id), positions in keys.items():
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] += ((len(key), positions, is_item_id),)
+
+        # Failure links, breadth first; every state also reports the keys that end in its suffixes
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                if self._outputs[fail]:
+                    self._outputs[next_state] += self._outputs[fail]
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, List[int]]]:
+        """Yield (start, end, project positions) for every task mention in lowercased `text`"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, positions, is_item_id in outputs[state]:
+                start = index - length + 1
+                if is_item_id and not self._stands_alone(text, start, index + 1):
+                    continue
+                yield start, index + 1, positions
+
+    @staticmethod
+    def _stands_alone(text: str, start: int, end: int) -> bool:
+        if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '.'):
+            return False
+        if end < len(text) and (text[end].isalnum() or (text[end] == '.' and text[end + 1:end + 2].isdigit())):
+            return False
+        return True
+
+class ParsedWorkbook:
+    """Projects parsed from an upload plus the indexes built over them at ingest"""
+
+    def __init__(self, projects: List[ProjectRecord], sheet_rows: List[int], total_rows: int):
+        self.projects = ProjectStore(projects)
+        self.total_rows = total_rows
+        self.row_index = RowIndex(projects, sheet_rows)
+        self.task_matcher = TaskMatcher(projects)
+        self._rollups = None
+        self._timeline = None
+
+    @property
+    def timeline(self) -> TimelineIndex:
+        """Interval index over the task dates, built on first use and after date edits"""
+        if self._timeline is None:
+            self._timeline = TimelineIndex(self.projects)
+        return self._timeline
+
+    @property
+    def rollups(self) -> RollupTree:
+        """Rollup tree, built on first use (it is not sent back from the parse pool)"""
+        if self._rollups is None:
+            self._rollups = RollupTree(self.projects)
+        return self._rollups
+
+    def update_project(self, position: int, **changes) -> List[int]:
+        """Change one task and recompute its rollup path; returns the positions on that path"""
+        self.projects.update(position, **changes)
+        if "start_date" in changes or "end_date" in changes:
+            self._timeline = None
+        if self._rollups is None:
+            return self.rollups.path(position)
+        return self._rollups.update(position)
+
+    def copy(self) -> "ParsedWorkbook":
+        """Copy with its own project store (sessions edit it); the read-only indexes are shared"""
+        workbook = copy.copy(self)
+        workbook.projects = self.projects.copy()
+        workbook._rollups = None
+        return workbook
+
+def log_parsed_rows(sheet_rows: List[int], projects: List[ProjectRecord]):
+    """One DEBUG line per parsed project, only with LOG_ROWS=true"""
+    if LOG_ROWS and log.isEnabledFor(logging.DEBUG):
+        for sheet_row, project in zip(sheet_rows, projects):
+            log_event(logging.DEBUG, "project_parsed", row=sheet_row, item_id=project.item_id, name=project.name,
+                      is_title=project.is_title, activity_type=project.activity_type)
+
+def parse_workbook(file_path: str, filename: str) -> ParsedWorkbook:
+    """Parse an uploaded workbook and build its indexes; runs in the parse process pool"""
+    if EXCEL_INGEST_MODE == "streaming" and filename.endswith('.xlsx'):
+        # Stream rows straight into project records without building a DataFrame
+        counts = {}
+        sheet_rows, projects = [], []
+        for sheet_row, project in iter_projects_streaming(file_path, counts):
+            sheet_rows.append(sheet_row)
+            projects.append(project)
+        total_rows = counts["total_rows"]
+    else:
+        # Read Excel file and extract project data column by column
+        df = pd.read_excel(file_path)
+        sheet_rows = []
+        projects = parse_projects_frame(df, sheet_rows)
+        total_rows = len(df)
+    log_parsed_rows(sheet_rows, projects)
+    return ParsedWorkbook(projects, sheet_rows, total_rows)
+
+# Parsed uploads keyed by the SHA-256 of the workbook bytes, so re-uploading the same file
+# (page reload, reopening the sheet) skips parsing. Bounded by entry count and upload size.
+UPLOAD_CACHE_MAX_ENTRIES = int(os.environ.get("UPLOAD_CACHE_MAX_ENTRIES", 16))
+UPLOAD_CACHE_MAX_BYTES = int(os.environ.get("UPLOAD_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class ParsedUploadCache:
+    """LRU cache of parsed workbooks by upload digest"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest: str) -> Optional[ParsedWorkbook]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache="upload", outcome="miss")
+                return None
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="upload", outcome="hit")
+            self._entries.move_to_end(digest)
+        # Sessions edit their projects in place, so every hit gets its own copies
+        return entry[0].copy()
+
+    def put(self, digest: str, size: int, workbook: ParsedWorkbook):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if digest in self._entries:
+                return
+            self._entries[digest] = (workbook.copy(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[1]
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+upload_cache = ParsedUploadCache(UPLOAD_CACHE_MAX_ENTRIES, UPLOAD_CACHE_MAX_BYTES)
+
+def save_upload_with_digest(source, target) -> str:
+    """Copy an upload to `target` in chunks, returning the SHA-256 of the bytes as they stream through"""
+    digest = hashlib.sha256()
+    while True:
+        chunk = source.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return digest.hexdigest()
+        digest.update(chunk)
+        target.write(chunk)
+
+# NDJSON uploads: /upload-excel?format=ndjson streams one project per line while the sheet is
+# still being read, followed by a {"done": true, ...} summary line. Rows come from the streaming
+# openpyxl reader on an I/O thread and reach the response through a small bounded queue.
+NDJSON_BATCH_ROWS = 500
+NDJSON_QUEUE_BATCHES = 8
+
+def ndjson_lines(records) -> bytes:
+    return b"".join(orjson.dumps(record.to_dict()) + b"\n" for record in records)
+
+def parse_workbook_ndjson(file_path: str, emit) -> ParsedWorkbook:
+    """Stream-parse an .xlsx, passing NDJSON batches of projects to `emit` as they are read"""
+    counts = {}
+    sheet_rows, projects = [], []
+    emitted = 0
+    for sheet_row, project in iter_projects_streaming(file_path, counts):
+        sheet_rows.append(sheet_row)
+        projects.append(project)
+        if len(projects) - emitted >= NDJSON_BATCH_ROWS:
+            emit(ndjson_lines(projects[emitted:]))
+            emitted = len(projects)
+    emit(ndjson_lines(projects[emitted:]))
+    log_parsed_rows(sheet_rows, projects)
+    return ParsedWorkbook(projects, sheet_rows, counts["total_rows"])
+
+def discard_unstored_upload(file_path: str, outcome: dict):
+    """Background task of an NDJSON upload: delete the upload unless a session took it over
+
+    Also covers clients that go away before the response body starts, when the body
+    generator (and its own cleanup) never runs.
+    """
+    if not outcome.get("stored") and os.path.exists(file_path):
+        os.unlink(file_path)
+
+async def stream_upload_ndjson(file_path: str, filename: str, digest: str, session_id: str,
+                               workbook: Optional[ParsedWorkbook], outcome: dict):
+    """Response body for an NDJSON upload; stores the session once the whole sheet is parsed
+
+    outcome["stored"] is set once the session owns the file (see discard_unstored_upload).
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=NDJSON_QUEUE_BATCHES)
+    closed = threading.Event()
+    stored = False
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def emit(chunk: bytes):
+        if closed.is_set():
+            raise ConnectionAbortedError("NDJSON client went away")
+        put(chunk)
+
+    def produce():
+        # The parsed workbook (or the error) is the last item on the queue
+        try:
+            with STAGE_SECONDS.time(stage="parse"):
+                result = parse_workbook_ndjson(file_path, emit)
+        except Exception as error:
+            result = error
+        if not closed.is_set():
+            put(result)
+
+    try:
+        cache_hit = workbook is not None
+        if cache_hit:
+            log_event(logging.DEBUG, "upload_cache_hit", digest=digest[:12])
+            records = workbook.projects.records
+            for start in range(0, len(records), NDJSON_BATCH_ROWS):
+                yield ndjson_lines(records[start:start + NDJSON_BATCH_ROWS])
+        else:
+            loop.run_in_executor(get_io_pool(), produce)
+            while True:
+                item = await queue.get()
+                if isinstance(item, bytes):
+                    if item:
+                        yield item
+                    continue
+                if isinstance(item, Exception):
+                    log_event(logging.WARNING, "ndjson_parse_failed", error=str(item))
+                    yield orjson.dumps({"error": f"Error processing Excel file: {str(item)}"}) + b"\n"
+                    return
+                workbook = item
+                break
+            log_event(logging.INFO, "workbook_parsed", projects=len(workbook.projects), rows=workbook.total_rows)
+            upload_cache.put(digest, os.path.getsize(file_path), workbook)
+
+        await workbook_store.put(WorkbookSession(session_id, file_path, filename, workbook))
+        stored = outcome["stored"] = True
+        yield orjson.dumps({
+            "done": True,
+            "message": "Excel file uploaded successfully",
+            "session_id": session_id,
+            "filename": filename,
+            "project_count": len(workbook.projects),
+            "total_rows": workbook.total_rows,
+            "cache_hit": cache_hit
+        }) + b"\n"
+    finally:
+        if not stored:
+            # Stop the producer (it checks `closed` before every batch) and unblock a pending put
+            closed.set()
+            while not queue.empty():
+                queue.get_nowait()
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+
+@app.post("/upload-excel")
+async def upload_excel(file: UploadFile = File(...), session_id: str = Depends(get_session_id),
+                       response_format: str = Query("json", alias="format")):
+    """Upload and parse Excel file containing Gantt chart data (format=ndjson streams the projects)"""
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="File must be an Excel file")
+    if response_format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
     
-    for pattern in progress_patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            key_points.append(f"Progress: {match.group(1)} - {match.group(2)}")
-    
-    # Look for issues/blockers (Dutch and English)
-    issue_patterns = [
-        # Dutch patterns
-        r"(?:probleem|blokker|obstakel|issue)\s*:\s*(.+?)(?:\.|$)",
-        r"(?:vertraagd|achter|laat)\s+omdat\s+(.+?)(?:\.|$)",
-        r"(?:blokker|blokkeert)\s+(.+?)(?:\.|$)",
-        r"(?:daar hebben we een blokker|we hebben een probleem)\s+(.+?)(?:\.|$)",
-        # English patterns
-        r"(?:issue|problem|blocker|obstacle)\s*:\s*(.+?)(?:\.|$)",
-        r"(?:delayed|behind|late)\s+because\s+(.+?)(?:\.|$)"
-    ]
+    try:
+        # Save uploaded file, hashing it on the way
+        temp_file = new_session_file()
+        with STAGE_SECONDS.time(stage="ingest"):
+            digest = await run_blocking_io(save_upload_with_digest, file.file, temp_file)
+        temp_file.close()
+        
+        workbook = upload_cache.get(digest)
+        if response_format == "ndjson" and (workbook is not None or file.filename.endswith('.xlsx')):
+            outcome = {"stored": False}
+            return StreamingResponse(stream_upload_ndjson(temp_file.name, file.filename, digest, session_id, workbook,
+                                                          outcome),
+                                     background=BackgroundTask(discard_unstored_upload, temp_file.name, outcome),
+                                     media_type="application/x-ndjson")
+        cache_hit = workbook is not None
+        if cache_hit:
+            log_event(logging.DEBUG, "upload_cache_hit", digest=digest[:12])
+        else:
+            # Parse in the process pool so the event loop keeps serving other requests
+            try:
+                with STAGE_SECONDS.time(stage="parse"):
+                    workbook = await run_cpu_bound(parse_workbook, temp_file.name, file.filename)
+            except Exception:
+                os.unlink(temp_file.name)
+                raise
+            log_event(logging.INFO, "workbook_parsed", projects=len(workbook.projects), rows=workbook.total_rows)
+            upload_cache.put(digest, os.path.getsize(temp_file.name), workbook)
+        
+        # Store the workbook and its projects in the session for updates and task proposals
+        await workbook_store.put(WorkbookSession(session_id, temp_file.name, file.filename, workbook))
+        
+        # Serialized directly with orjson; FastAPI's encoder pass over every project is skipped
+        return ORJSONResponse({
+            "message": "Excel file uploaded successfully",
+            "session_id": session_id,
+            "filename": file.filename,
+            "projects": workbook.projects.to_dicts(),
+            "total_rows": workbook.total_rows,
+            "cache_hit": cache_hit
+        })
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing Excel file: {str(e)}")
+
+# Portfolio uploads: /upload-portfolio takes several workbooks and/or ZIP archives of them and
+# parses every sheet of every workbook as its own task in the parse process pool, largest files
+# first, so the wall time shrinks with PARSE_POOL_SIZE. .xlsx sheets are read with the read-only
+# streaming reader of EXCEL_INGEST_MODE=streaming (a task never loads the other sheets); .xls
+# workbooks go through pandas as one task each.
+# The sheets are merged into one session whose item_ids carry their sheet's namespace
+# ("finance/planning:1.4", the workbook path without extension plus the sheet name when the
+# workbook has several), so outlines from different files never mix in the rollups. The parsed
+# workbooks are kept together in a ZIP as the session's backing file; edits stay in the
+# session and its exports, there is no single workbook to write them back into.
+PORTFOLIO_MAX_FILES = int(os.environ.get("PORTFOLIO_MAX_FILES", 200))
+PORTFOLIO_MAX_BYTES = int(os.environ.get("PORTFOLIO_MAX_BYTES", 1024 * 1024 * 1024))
+PORTFOLIO_SUFFIX = ".zip"
+EXCEL_SUFFIXES = ('.xlsx', '.xls')
+
+def is_portfolio(session: WorkbookSession) -> bool:
+    return session.filename.lower().endswith(PORTFOLIO_SUFFIX)
+
+def portfolio_namespace(name: str, sheet_name: Optional[str]) -> str:
+    """Namespace for a sheet's item_ids; dots and colons are replaced so the item_id outline stays intact"""
+    namespace = os.path.splitext(name)[0]
+    if sheet_name is not None:
+        namespace = f"{namespace}/{sheet_name}"
+    return re.sub(r"[.:]", "_", namespace)
+
+def workbook_sheet_names(file_path: str) -> List[Optional[str]]:
+    """Worksheet names of an .xlsx workbook in order (chart sheets left out); [None] for .xls"""
+    if not file_path.lower().endswith('.xlsx'):
+        return [None]  # Parsed as a whole
+    with zipfile.ZipFile(file_path) as archive:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    types = {relationship.get('Id'): relationship.get('Type', '')
+             for relationship in relationships.iter(f'{{{PACKAGE_RELATIONSHIPS_NS}}}Relationship')}
+    return [sheet.get('name') for sheet in workbook.iter(f'{{{SPREADSHEET_NS}}}sheet')
+            if types.get(sheet.get(f'{{{RELATIONSHIPS_NS}}}id'), '').endswith('/worksheet')]
+
+def parse_portfolio_sheet(file_path: str, sheet_name: Optional[str]) -> Tuple[float, list]:
+    """Parse one sheet of an .xlsx workbook, or every sheet of an .xls workbook (sheet_name None);
+    runs in the parse process pool
+
+    Returns the parse time and (sheet name, projects, worksheet rows, total rows) per sheet. The
+    projects come back as a ProjectStore, which crosses the process boundary column-wise.
+    """
+    started = time.perf_counter()
+    sheets = []
+    if sheet_name is not None:
+        counts = {}
+        sheet_rows, projects = [], []
+        for sheet_row, project in iter_projects_streaming(file_path, counts, sheet_name):
+            sheet_rows.append(sheet_row)
+            projects.append(project)
+        sheets.append((sheet_name, ProjectStore(projects), sheet_rows, counts["total_rows"]))
+    else:
+        for name, df in pd.read_excel(file_path, sheet_name=None).items():
+            sheet_rows = []
+            projects = parse_projects_frame(df, sheet_rows)
+            sheets.append((str(name), ProjectStore(projects), sheet_rows, len(df)))
+    return time.perf_counter() - started, sheets
+
+def collect_portfolio_files(uploads: List[Tuple[str, object]], work_dir: str) -> Tuple[List[Tuple[str, str]], list]:
+    """Save the uploaded workbooks and the workbooks inside uploaded ZIPs to `work_dir`
+
+    Returns (name, path) per workbook, named by upload or archive member path, and (name, error)
+    for uploads that are neither. Raises 413 past PORTFOLIO_MAX_FILES or PORTFOLIO_MAX_BYTES.
+    """
+    workbooks, errors = [], []
+    total_bytes = 0
+    names = set()
+
+    def add(name: str, source):
+        nonlocal total_bytes
+        if len(workbooks) >= PORTFOLIO_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"A portfolio holds at most {PORTFOLIO_MAX_FILES} workbooks")
+        unique = name
+        while unique in names:  # The same file name in two uploads or archives
+            stem, suffix = os.path.splitext(unique)
+            unique = f"{stem}~{suffix}"
+        names.add(unique)
+        # Files in the work dir are numbered: names from archives never become paths
+        path = os.path.join(work_dir, f"{len(workbooks)}{os.path.splitext(name)[1].lower()}")
+        with open(path, "wb") as target:
+            shutil.copyfileobj(source, target, UPLOAD_CHUNK_SIZE)
+            total_bytes += target.tell()
+        if total_bytes > PORTFOLIO_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"A portfolio holds at most {PORTFOLIO_MAX_BYTES} bytes of workbooks")
+        workbooks.append((unique, path))
+
+    for filename, source in uploads:
+        if filename.lower().endswith(EXCEL_SUFFIXES):
+            add(filename, source)
+        elif filename.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(source) as archive:
+                    for info in archive.infolist():
+                        base = posixpath.basename(info.filename)
+                        if (info.is_dir() or info.filename.startswith('__MACOSX/') or base.startswith(('~$', '.'))
+                                or not base.lower().endswith(EXCEL_SUFFIXES)):
+                            continue  # Folders, OS metadata and Excel lock files
+                        if total_bytes + info.file_size > PORTFOLIO_MAX_BYTES:
+                            raise HTTPException(status_code=413,
+                                                detail=f"A portfolio holds at most {PORTFOLIO_MAX_BYTES} bytes of workbooks")
+                        with archive.open(info) as member:
+                            add(info.filename, member)
+            except zipfile.BadZipFile as e:
+                errors.append((filename, f"Not a valid ZIP archive: {e}"))
+        else:
+            errors.append((filename, "Not an Excel workbook or ZIP archive"))
+    return workbooks, errors
+
+def write_portfolio_archive(workbooks: List[Tuple[str, str]], target: str):
+    """Store the workbooks (already compressed) in a ZIP under their portfolio names"""
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_STORED) as archive:
+        for name, path in workbooks:
+            archive.write(path, name)
+
+def merge_portfolio(sheets: List[Tuple[str, ProjectStore, List[int], int]]) -> ParsedWorkbook:
+    """One workbook over the parsed sheets, item_ids prefixed with their sheet's namespace"""
+    projects, sheet_rows, total_rows = [], [], 0
+    for namespace, store, rows, sheet_total_rows in sheets:
+        for record in store:
+            if record.item_id:
+                record.item_id = f"{namespace}:{record.item_id}"
+            projects.append(record)
+        sheet_rows.extend(rows)
+        total_rows += sheet_total_rows
+    return ParsedWorkbook(projects, sheet_rows, total_rows)
+
+@app.post("/upload-portfolio")
+async def upload_portfolio(files: List[UploadFile] = File(...), session_id: str = Depends(get_session_id)):
+    """Upload several workbooks and/or ZIP archives of them and parse every sheet in parallel
+
+    The projects of all sheets become one session with namespaced item_ids; the response reports
+    the parse time, project count and errors per file (page through the projects with /projects).
+    """
+    started = time.perf_counter()
+    upload_names = [upload.filename or "" for upload in files]
+    work_dir = tempfile.mkdtemp(prefix="portfolio-")
+    try:
+        with STAGE_SECONDS.time(stage="ingest"):
+            workbooks, upload_errors = await run_blocking_io(
+                collect_portfolio_files, [(name, upload.file) for name, upload in zip(upload_names, files)], work_dir)
+        if not workbooks:
+            raise HTTPException(status_code=400, detail="The upload holds no Excel workbooks")
+
+        # One parse task per .xlsx sheet (per .xls workbook), biggest workbooks first
+        reports = {name: {"file": name, "sheets": [], "parse_seconds": 0.0, "error": None} for name, _ in workbooks}
+        tasks = []
+        for name, path in sorted(workbooks, key=lambda workbook: -os.path.getsize(workbook[1])):
+            try:
+                sheet_names = await run_blocking_io(workbook_sheet_names, path)
+            except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+                reports[name]["error"] = f"Not a readable workbook: {e}"
+                continue
+            tasks.extend((name, path, sheet_name) for sheet_name in sheet_names)
+        with STAGE_SECONDS.time(stage="parse"):
+            results = await asyncio.gather(*(run_cpu_bound(parse_portfolio_sheet, path, sheet_name)
+                                             for _, path, sheet_name in tasks), return_exceptions=True)
+
+        parsed = {}  # workbook name -> [(sheet name, store, rows, total rows)]
+        for (name, _, sheet_name), result in zip(tasks, results):
+            report = reports[name]
+            if isinstance(result, Exception):
+                error = f"{sheet_name}: {result}" if sheet_name is not None else str(result)
+                report["error"] = error if report["error"] is None else f"{report['error']}; {error}"
+                continue
+            seconds, sheets = result
+            report["parse_seconds"] += seconds
+            parsed.setdefault(name, []).extend(sheets)
+
+        merged = []
+        for name, _ in workbooks:  # Upload order
+            sheets = parsed.get(name, [])
+            for sheet_name, store, rows, total_rows in sheets:
+                namespace = portfolio_namespace(name, sheet_name if len(sheets) > 1 else None)
+                merged.append((namespace, store, rows, total_rows))
+                reports[name]["sheets"].append({"sheet": sheet_name, "namespace": namespace,
+                                                "project_count": len(store), "total_rows": total_rows})
+            reports[name]["parse_seconds"] = round(reports[name]["parse_seconds"], 3)
+        if not merged:
+            raise HTTPException(status_code=400, detail="No workbook in the upload could be parsed")
+
+        # Building the merged indexes takes a while for a big portfolio: keep it off the event loop
+        workbook = await run_blocking_io(merge_portfolio, merged)
+        archive_file = new_session_file(PORTFOLIO_SUFFIX)
+        archive_file.close()
+        try:
+            await run_blocking_io(write_portfolio_archive, [(name, path) for name, path in workbooks if name in parsed],
+                                  archive_file.name)
+            single_archive = len(upload_names) == 1 and upload_names[0].lower().endswith(PORTFOLIO_SUFFIX)
+            filename = upload_names[0] if single_archive else f"portfolio{PORTFOLIO_SUFFIX}"
+            await workbook_store.put(WorkbookSession(session_id, archive_file.name, filename, workbook))
+        except Exception:
+            delete_session_files(archive_file.name)
+            raise
+
+        wall_seconds = time.perf_counter() - started
+        log_event(logging.INFO, "portfolio_parsed", workbooks=len(workbooks), sheets=len(merged),
+                  projects=len(workbook.projects), seconds=round(wall_seconds, 3))
+        return ORJSONResponse({
+            "message": "Portfolio uploaded successfully",
+            "session_id": session_id,
+            "project_count": len(workbook.projects),
+            "total_rows": workbook.total_rows,
+            "files": list(reports.values()) + [{"file": name, "sheets": [], "parse_seconds": 0.0, "error": error}
+                                               for name, error in upload_errors],
+            "parse_seconds": round(sum(report["parse_seconds"] for report in reports.values()), 3),
+            "wall_seconds": round(wall_seconds, 3),
+            "parse_workers": PARSE_POOL_SIZE
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing portfolio: {str(e)}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+# /projects: one team's or one status's tasks without transferring the whole portfolio. Filters
+# intersect the store indexes; cursors carry the offset, the session version and a query digest,
+# so a page is never silently taken from a store that changed or from a different query.
+PROJECT_PAGE_SIZE = 100
+MAX_PROJECT_PAGE_SIZE = 1000
+
+def _item_id_sort_key(item_id: str) -> tuple:
+    """Natural order for outline numbers: 1.2 < 1.10 < 2; portfolio item_ids by namespace first
+    ("team_a/w1:1.10" after "team_a/w1:1.2", before "team_b/w1:1")"""
+    namespace, _, outline = item_id.rpartition(":")
+    if not outline:
+        return namespace, (float("inf"),)
+    return namespace, tuple(int(part) if part.isdigit() else float("inf") for part in outline.split("."))
+
+def query_projects(store: ProjectStore, filters: dict, name: Optional[str], sort: Optional[str]) -> List[int]:
+    """Positions of the matching projects, in sheet order or sorted by one field ("-field" descending)"""
+    candidates = [store.positions(field, value) for field, value in filters.items() if value is not None]
+    if candidates:
+        candidates.sort(key=len)
+        others = [set(positions) for positions in candidates[1:]]
+        positions = [position for position in candidates[0] if all(position in other for other in others)]
+    else:
+        positions = list(range(len(store)))
+    if name:
+        needle = name.lower()
+        positions = [position for position in positions if needle in store[position].name.lower()]
+
+    if sort:
+        field = sort.lstrip("-")
+        if field not in PROJECT_FIELDS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(PROJECT_FIELDS)}")
+        key = _item_id_sort_key if field == "item_id" else (lambda value: value)
+        # Empty values go last in both directions
+        present = [position for position in positions if getattr(store[position], field) not in (None, "")]
+        missing = [position for position in positions if getattr(store[position], field) in (None, "")]
+        present.sort(key=lambda position: key(getattr(store[position], field)), reverse=sort.startswith("-"))
+        positions = present + missing
+    return positions
+
+def _encode_cursor(offset: int, version: int, query_key: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([offset, version, query_key]).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[int, int, str]:
+    try:
+        offset, version, query_key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if int(offset) < 0:
+            raise ValueError("negative offset")
+        return int(offset), int(version), str(query_key)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/projects")
+async def list_projects(team: Optional[str] = None, status: Optional[str] = None, activity_type: Optional[str] = None,
+                        item_id: Optional[str] = None, name: Optional[str] = None, sort: Optional[str] = None,
+                        limit: int = PROJECT_PAGE_SIZE, cursor: Optional[str] = None,
+                        session_id: str = Depends(get_session_id)):
+    """Filtered, sorted page of the session's projects; pass next_cursor back to fetch the next page"""
+    session = await require_session(session_id)
+    if not 1 <= limit <= MAX_PROJECT_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PROJECT_PAGE_SIZE}")
+    store = session.workbook.projects
+    filters = {"team": team, "status": status, "activity_type": activity_type, "item_id": item_id}
+    query_key = hashlib.sha1(json.dumps([filters, name, sort]).encode()).hexdigest()[:12]
+
+    offset = 0
+    if cursor:
+        offset, version, cursor_query = _decode_cursor(cursor)
+        if cursor_query != query_key:
+            raise HTTPException(status_code=400, detail="Cursor belongs to a different query")
+        if version != session.version:
+            raise HTTPException(status_code=409, detail="Projects changed since this cursor was issued; start again without a cursor")
+
+    positions = query_projects(store, filters, name, sort)
+    page = positions[offset:offset + limit]
+    next_offset = offset + len(page)
+    return ORJSONResponse({
+        "projects": [store[position].to_dict() for position in page],
+        "total": len(positions),
+        "next_cursor": _encode_cursor(next_offset, session.version, query_key) if next_offset < len(positions) else None,
+        "version": session.version
+    })
+
+# Transcription client: one long-lived AsyncOpenAI per process on a pooled httpx client, so
+# keep-alive connections are reused across requests. Every call is bounded by timeouts and a
+# concurrency semaphore, and 429/5xx responses are retried with jittered exponential backoff.
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+TRANSCRIPTION_MODEL = os.environ.get("TRANSCRIPTION_MODEL", "whisper-1")
+TRANSCRIPTION_LANGUAGE = "nl"  # Dutch language
+TRANSCRIPTION_PROMPT = "This is a Dutch business meeting about project management and task updates."
+TRANSCRIPTION_TIMEOUT_SECONDS = float(os.environ.get("TRANSCRIPTION_TIMEOUT_SECONDS", 120))
+TRANSCRIPTION_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("TRANSCRIPTION_CONNECT_TIMEOUT_SECONDS", 10))
+TRANSCRIPTION_MAX_CONCURRENCY = int(os.environ.get("TRANSCRIPTION_MAX_CONCURRENCY", 8))
+TRANSCRIPTION_MAX_CONNECTIONS = int(os.environ.get("TRANSCRIPTION_MAX_CONNECTIONS", 16))
+TRANSCRIPTION_MAX_RETRIES = int(os.environ.get("TRANSCRIPTION_MAX_RETRIES", 3))
+TRANSCRIPTION_BACKOFF_SECONDS = float(os.environ.get("TRANSCRIPTION_BACKOFF_SECONDS", 0.5))
+TRANSCRIPTION_BACKOFF_MAX_SECONDS = float(os.environ.get("TRANSCRIPTION_BACKOFF_MAX_SECONDS", 20))
+
+class TranscriptionClient:
+    """Pooled async Whisper client with bounded concurrency and retries"""
+
+    def __init__(self, api_key: str, base_url: str = OPENAI_BASE_URL):
+        self.http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(TRANSCRIPTION_TIMEOUT_SECONDS, connect=TRANSCRIPTION_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=TRANSCRIPTION_MAX_CONNECTIONS,
+                                max_keepalive_connections=TRANSCRIPTION_MAX_CONNECTIONS),
+        )
+        # Retries are handled here so the backoff and the semaphore slot are under our control
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=self.http_client)
+        self.semaphore = asyncio.Semaphore(TRANSCRIPTION_MAX_CONCURRENCY)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), TRANSCRIPTION_BACKOFF_MAX_SECONDS)
+            except ValueError:
+                pass
+        # Full jitter: spread retries of concurrent callers instead of retrying in lockstep
+        return random.uniform(0, min(TRANSCRIPTION_BACKOFF_MAX_SECONDS, TRANSCRIPTION_BACKOFF_SECONDS * 2 ** attempt))
+
+    async def transcribe(self, file_obj, filename: str, content_type: str = "application/octet-stream") -> str:
+        """Transcribe an open binary audio file, retrying rate limits, server errors and timeouts"""
+        start = file_obj.tell()
+        async with self.semaphore:
+            attempt = 0
+            while True:
+                self.requests += 1
+                file_obj.seek(start)
+                try:
+                    with STAGE_SECONDS.time(stage="transcription"):
+                        transcript = await self.client.audio.transcriptions.create(
+                            model=TRANSCRIPTION_MODEL,
+                            file=(filename, file_obj, content_type),
+                            language=TRANSCRIPTION_LANGUAGE,
+                            response_format="text",
+                            prompt=TRANSCRIPTION_PROMPT,
+                        )
+                    OPENAI_REQUESTS.inc(outcome="success")
+                    return transcript
+                except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as error:
+                    # APITimeoutError is an APIConnectionError; 4xx other than 429 are not retried
+                    OPENAI_REQUESTS.inc(outcome=error.__class__.__name__)
+                    if attempt >= TRANSCRIPTION_MAX_RETRIES:
+                        self.failures += 1
+                        raise
+                    delay = self._retry_delay(attempt, error)
+                    log_event(logging.WARNING, "transcription_retry", attempt=attempt + 1,
+                              error=error.__class__.__name__, delay=round(delay, 2))
+                    attempt += 1
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+                except Exception as error:
+                    OPENAI_REQUESTS.inc(outcome=error.__class__.__name__)
+                    self.failures += 1
+                    raise
+
+    def stats(self) -> dict:
+        return {
+            "base_url": str(self.client.base_url),
+            "max_concurrency": TRANSCRIPTION_MAX_CONCURRENCY,
+            "in_flight": TRANSCRIPTION_MAX_CONCURRENCY - self.semaphore._value,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+    async def aclose(self):
+        await self.client.close()
+
+transcription_client = None
+
+def get_transcription_client() -> Optional[TranscriptionClient]:
+    """Return the process-wide transcription client, or None when no API key is configured"""
+    global transcription_client
+    if transcription_client is None:
+        openai_api_key = os.environ.get("OPENAI_API_KEY")
+        if not openai_api_key:
+            return None
+        transcription_client = TranscriptionClient(openai_api_key)
+    return transcription_client
+
+@app.on_event("shutdown")
+async def shutdown_transcription_client():
+    global transcription_client
+    if transcription_client is not None:
+        await transcription_client.aclose()
+        transcription_client = None
+
+# Audio intake: uploads are capped while the body is still arriving, so an oversized recording is
+# rejected before it is spooled to disk. The spooled upload itself is streamed into the
+# transcription request; a copy on disk is only written (asynchronously) when a tool needs a path.
+MAX_AUDIO_UPLOAD_BYTES = int(os.environ.get("MAX_AUDIO_UPLOAD_BYTES", 200 * 1024 * 1024))
+AUDIO_UPLOAD_PATH_PREFIX = "/process-audio"
+
+def format_bytes(size: int) -> str:
+    """A byte count for messages: "512 bytes", "300 KB", "1.5 MB" (1 KB = 1024 bytes)"""
+    if size < 1024:
+        return f"{size} bytes"
+    for unit, scale in (("KB", 1024), ("MB", 1024 * 1024), ("GB", 1024 ** 3)):
+        if size < scale * 1024 or unit == "GB":
+            text = f"{size / scale:.1f}"
+            return f"{text[:-2] if text.endswith('.0') else text} {unit}"
+
+class AudioUploadLimitMiddleware:
+    """Reject audio uploads larger than MAX_AUDIO_UPLOAD_BYTES with a 413 while they stream in"""
+
+    def __init__(self, app, max_bytes: int = MAX_AUDIO_UPLOAD_BYTES, path_prefix: str = AUDIO_UPLOAD_PATH_PREFIX):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix) or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Audio file is larger than the {format_bytes(self.max_bytes)} limit"
+        declared = dict(scope["headers"]).get(b"content-length")
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            # Raised from inside body parsing so the error goes through the regular
+            # exception handlers (and CORS) instead of a bare response from out here
+            if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+                raise HTTPException(status_code=413, detail=detail)
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    log_event(logging.WARNING, "audio_upload_aborted", received=received)
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(AudioUploadLimitMiddleware)
+
+async def write_upload_async(upload: UploadFile, target_path: str) -> int:
+    """Copy an upload to disk in chunks without blocking the event loop; returns the bytes written"""
+    await upload.seek(0)
+    written = 0
+    async with aiofiles.open(target_path, "wb") as target:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await target.write(chunk)
+            written += len(chunk)
+    await upload.seek(0)
+    return written
+
+# Transcript cache: the frontend retries /process-audio with the identical recording, so
+# transcripts are persisted in SQLite by audio digest and transcription parameters, evicted
+# least-recently-used first once they exceed the byte budget. Concurrent requests for the same
+# audio share one upstream call. Transcripts are meeting content: the cache lives in STATE_DIR.
+TRANSCRIPT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", os.path.join(STATE_DIR, "transcripts.sqlite3"))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.environ.get("TRANSCRIPT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+def file_digest(file_obj) -> str:
+    """SHA-256 of an open binary file from its start; the file is rewound afterwards"""
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    while True:
+        chunk = file_obj.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+class TranscriptCache:
+    """SQLite-backed transcript cache with size-based LRU eviction and in-flight coalescing"""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.max_bytes > 0
+
+    @staticmethod
+    def key(digest: str, model: str, language: str, prompt: str) -> str:
+        return hashlib.sha256("\0".join((digest, model, language, prompt)).encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            make_state_dir(os.path.dirname(os.path.abspath(self.path)))
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "key TEXT PRIMARY KEY, transcript TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS transcripts_last_access ON transcripts (last_access)")
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT transcript FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache="transcript", outcome="miss")
+                return None
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="transcript", outcome="hit")
+            conn.execute("UPDATE transcripts SET last_access = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, transcript: str):
+        size = len(transcript.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO transcripts (key, transcript, size, last_access) VALUES (?, ?, ?, ?)",
+                         (key, transcript, size, time.time()))
+            excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0] - self.max_bytes
+            if excess <= 0:
+                return
+            evicted = []
+            for evict_key, evict_size in conn.execute("SELECT key, size FROM transcripts ORDER BY last_access"):
+                evicted.append((evict_key,))
+                excess -= evict_size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM transcripts WHERE key = ?", evicted)
+            self.evictions += len(evicted)
+
+    async def transcribe(self, client: "TranscriptionClient", file_obj, filename: str, content_type: str) -> Tuple[str, bool]:
+        """Transcribe through the cache; returns the transcript and whether the upstream call was avoided"""
+        if not self.enabled:
+            return await client.transcribe(file_obj, filename, content_type), False
+        digest = await run_blocking_io(file_digest, file_obj)
+        key = self.key(digest, TRANSCRIPTION_MODEL, TRANSCRIPTION_LANGUAGE, TRANSCRIPTION_PROMPT)
+
+        while key in self._in_flight:
+            pending = self._in_flight[key]
+            try:
+                transcript = await asyncio.shield(pending)
+                self.coalesced += 1
+                CACHE_REQUESTS.inc(cache="transcript", outcome="coalesced")
+                return transcript, True
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request doing the upstream call went away; take over from it
+
+        pending = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = pending
+        try:
+            transcript = await run_blocking_io(self.get, key)
+            cached = transcript is not None
+            if not cached:
+                transcript = await client.transcribe(file_obj, filename, content_type)
+                if transcript and transcript.strip():
+                    await run_blocking_io(self.put, key, transcript)
+            pending.set_result(transcript)
+            return transcript, cached
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as error:
+            pending.set_exception(error)
+            pending.exception()  # waiters re-raise it; don't warn when there are none
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = (0, 0)
+            if self.enabled:
+                entries, total = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+            return {
+                "entries": entries,
+                "bytes": total,
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+transcript_cache = TranscriptCache(TRANSCRIPT_CACHE_PATH, TRANSCRIPT_CACHE_MAX_BYTES)
+
+@app.on_event("shutdown")
+async def shutdown_transcript_cache():
+    transcript_cache.close()
+
+# Long audio: recordings above the upstream file size limit are decoded once to 16 kHz mono wav,
+# cut into overlapping segments and transcribed with a bounded fan-out. Segment texts are
+# stitched back in order, dropping the words both sides of an overlap heard.
+FFMPEG_PATH = os.environ.get("FFMPEG_PATH", "ffmpeg")
+LONG_AUDIO_THRESHOLD_BYTES = int(os.environ.get("LONG_AUDIO_THRESHOLD_BYTES", 24 * 1024 * 1024))
+LONG_AUDIO_SEGMENT_SECONDS = float(os.environ.get("LONG_AUDIO_SEGMENT_SECONDS", 300))
+LONG_AUDIO_OVERLAP_SECONDS = float(os.environ.get("LONG_AUDIO_OVERLAP_SECONDS", 5))
+LONG_AUDIO_MAX_PARALLEL = int(os.environ.get("LONG_AUDIO_MAX_PARALLEL", 4))
+# Overlap words are searched this many words per overlap second deep into both texts
+STITCH_WORDS_PER_SECOND = 4
+STITCH_MIN_MATCH_WORDS = 3
+
+def long_audio_available(filename: str) -> bool:
+    """Wav can always be split in-process; other formats need ffmpeg"""
+    return filename.lower().endswith(".wav") or shutil.which(FFMPEG_PATH) is not None
+
+def plan_segments(duration: float, segment_seconds: float = LONG_AUDIO_SEGMENT_SECONDS,
+                  overlap_seconds: float = LONG_AUDIO_OVERLAP_SECONDS) -> List[Tuple[float, float]]:
+    """(start, end) seconds of segments covering `duration`, each overlapping the next one"""
+    segments = []
+    start = 0.0
+    while True:
+        end = min(duration, start + segment_seconds + overlap_seconds)
+        segments.append((start, end))
+        if end >= duration:
+            return segments
+        start += segment_seconds
+
+def _wav_duration(path: str) -> float:
+    with wave.open(path, "rb") as reader:
+        return reader.getnframes() / reader.getframerate()
+
+def _write_wav_segment(source_path: str, start: float, end: float, target_path: str):
+    with wave.open(source_path, "rb") as reader:
+        rate = reader.getframerate()
+        first = int(start * rate)
+        reader.setpos(first)
+        frames = reader.readframes(min(reader.getnframes(), int(end * rate)) - first)
+        with wave.open(target_path, "wb") as writer:
+            writer.setparams(reader.getparams())
+            writer.writeframes(frames)
+
+async def decode_to_wav(source_path: str, target_path: str):
+    """Decode any recording to 16 kHz mono PCM wav with ffmpeg"""
+    process = await asyncio.create_subprocess_exec(
+        FFMPEG_PATH, "-hide_banner", "-loglevel", "error", "-y", "-i", source_path,
+        "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le", target_path,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace')[-500:]}")
+
+def stitch_transcripts(left: str, right: str, overlap_seconds: float = LONG_AUDIO_OVERLAP_SECONDS) -> str:
+    """Join two consecutive segment transcripts, removing the words repeated across their overlap"""
+    if not left.strip():
+        return right.strip()
+    if not right.strip():
+        return left.strip()
+    left_words = left.split()
+    right_words = right.split()
+    window = max(STITCH_MIN_MATCH_WORDS, int(overlap_seconds * STITCH_WORDS_PER_SECOND))
+    tail = left_words[-window:]
+    head = right_words[:window]
+    normalize = lambda word: re.sub(r"\W+", "", word.lower())
+    matcher = difflib.SequenceMatcher(None, [normalize(w) for w in tail], [normalize(w) for w in head], autojunk=False)
+    match = matcher.find_longest_match(0, len(tail), 0, len(head))
+    if match.size < STITCH_MIN_MATCH_WORDS:
+        return " ".join(left_words + right_words)
+    # Keep the left text through the matched run and continue the right text after it
+    cut = len(left_words) - len(tail) + match.a + match.size
+    return " ".join(left_words[:cut] + right_words[match.b + match.size:])
+
+async def stage_audio_upload(audio_file: UploadFile) -> Tuple[str, str]:
+    """Copy an upload into a fresh work directory; returns (work_dir, source_path)"""
+    work_dir = tempfile.mkdtemp(prefix="audio-")
+    source_path = os.path.join(work_dir, "source" + os.path.splitext(audio_file.filename)[1].lower())
+    await write_upload_async(audio_file, source_path)
+    return work_dir, source_path
+
+async def transcribe_long_audio(client: TranscriptionClient, work_dir: str, source_path: str):
+    """Transcribe a staged recording segment by segment, yielding (event, payload) as segments finish.
+
+    Events are "segments" (the plan), "segment" (one finished segment) and "transcript" (the
+    stitched text grew). The work directory is removed when the generator finishes or is closed.
+    """
+    tasks = []
+    try:
+        wav_path = source_path
+        duration = None
+        if source_path.endswith(".wav"):
+            try:
+                duration = await run_blocking_io(_wav_duration, source_path)
+            except (wave.Error, EOFError):
+                pass
+        if duration is None:
+            wav_path = os.path.join(work_dir, "decoded.wav")
+            await decode_to_wav(source_path, wav_path)
+            duration = await run_blocking_io(_wav_duration, wav_path)
+
+        segments = plan_segments(duration)
+        yield "segments", {"count": len(segments), "duration": round(duration, 2)}
+        fan_out = asyncio.Semaphore(LONG_AUDIO_MAX_PARALLEL)
+
+        async def transcribe_segment(index: int, start: float, end: float):
+            async with fan_out:
+                segment_path = os.path.join(work_dir, f"segment-{index:04d}.wav")
+                try:
+                    await run_blocking_io(_write_wav_segment, wav_path, start, end, segment_path)
+                    with open(segment_path, "rb") as segment_file:
+                        text, cached = await transcript_cache.transcribe(
+                            client, segment_file, os.path.basename(segment_path), "audio/wav")
+                    return index, text, cached, None
+                except Exception as error:
+                    log_event(logging.WARNING, "segment_failed", segment=index, error=str(error))
+                    return index, "", False, str(error)
+                finally:
+                    if os.path.exists(segment_path):
+                        os.unlink(segment_path)
+
+        tasks = [asyncio.ensure_future(transcribe_segment(i, start, end)) for i, (start, end) in enumerate(segments)]
+        texts = [None] * len(segments)
+        stitched = ""
+        stitched_count = 0
+        all_cached = True
+        for finished in asyncio.as_completed(tasks):
+            index, text, cached, error = await finished
+            texts[index] = text
+            all_cached = all_cached and cached
+            start, end = segments[index]
+            yield "segment", {"index": index, "start": round(start, 2), "end": round(end, 2),
+                              "text": text, "cached": cached, "error": error}
+            if stitched_count == index:
+                while stitched_count < len(texts) and texts[stitched_count] is not None:
+                    stitched = stitch_transcripts(stitched, texts[stitched_count])
+                    stitched_count += 1
+                yield "transcript", {"transcript": stitched, "segments_done": stitched_count,
+                                     "segments": len(segments), "cached": all_cached}
+    finally:
+        for task in tasks:
+            task.cancel()
+        await run_blocking_io(shutil.rmtree, work_dir, True)
+
+async def transcribe_long_upload(client: TranscriptionClient, audio_file: UploadFile) -> Tuple[str, bool]:
+    """Run the long-audio pipeline to completion; returns the stitched transcript and whether it was all cached"""
+    work_dir, source_path = await stage_audio_upload(audio_file)
+    transcript, cached = "", False
+    async for event, payload in transcribe_long_audio(client, work_dir, source_path):
+        if event == "transcript":
+            transcript, cached = payload["transcript"], payload["cached"]
+    return transcript, cached
+
+def clean_transcript(transcript: str) -> str:
+    """Replace empty or unintelligible transcripts with the user-facing retry message"""
+    if not transcript or transcript.strip() == "":
+        return "Could not understand audio. Please try again with clearer speech."
+    if "could not understand" in transcript.lower() or "unclear" in transcript.lower():
+        return "Could not understand audio. Please try again with clearer speech."
+    return transcript
+
+def sse_event(event: str, payload: dict) -> str:
+    """One server-sent event; the payload must be plain JSON data (dump pydantic models first)"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.post("/process-audio")
+async def process_audio(audio_file: UploadFile = File(...), session_id: str = Depends(get_session_id), mode: str = "sync"):
+    """Process audio file and extract project updates using OpenAI Whisper API (mode=job queues it instead)"""
     
-    for pattern in issue_patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            key_points.append(f"Issue: {match.group(1).strip()}")
+    log_event(logging.INFO, "audio_received", filename=audio_file.filename, size=audio_file.size)
     
-    # Look for date changes (Dutch and English)
-    date_patterns = [
-        # Dutch patterns
-        r"(?:aanpassen|wijzigen|veranderen)\s+(?:naar|to)\s+(\d+\s+\w+|\w+\s+\d+)",
-        r"(?:nieuwe datum|nieuwe deadline)\s*:\s*(\d+\s+\w+|\w+\s+\d+)",
-        r"(?:passen.*aan naar)\s+(\d+\s+\w+|\w+\s+\d+)",
-        # English patterns
-        r"(?:change|move|update)\s+(?:to|date)\s+(\d+\s+\w+|\w+\s+\d+)",
-        r"(?:new date|new deadline)\s*:\s*(\d+\s+\w+|\w+\s+\d+)"
-    ]
+    # Accept more audio formats including webm
+    allowed_extensions = ('.wav', '.mp3', '.m4a', '.webm', '.ogg')
+    if not audio_file.filename.lower().endswith(allowed_extensions):
+        log_event(logging.INFO, "audio_rejected", filename=audio_file.filename, reason="extension")
+        raise HTTPException(status_code=400, detail=f"Audio file must be one of: {', '.join(allowed_extensions)}")
     
-    for pattern in date_patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            key_points.append(f"Date Change: {match.group(1).strip()}")
+    if mode not in ("sync", "job"):
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'job'")
+    if mode == "job":
+        return await submit_audio_job(audio_file, session_id)
     
-    if key_points:
-        summary = "Meeting Summary:\n" + "\n".join(key_points[:8])  # Limit to 8 key points
-    else:
+    try:
+        # Check if OpenAI API key is available
+        try:
+            client = get_transcription_client()
+        except Exception as init_error:
+            log_event(logging.ERROR, "openai_client_init_failed", error=str(init_error))
+            return {
+                "transcript": "Audio processing service is temporarily unavailable. Please try again later.",
+                "summary": "Audio processing service is being updated.",
+                "taskProposals": [],
+                "project_updates": []
+            }
+        if client is None:
+            log_event(logging.WARNING, "openai_api_key_missing")
+            return {
+                "transcript": "Audio processing requires OpenAI API key. Please contact support.",
+                "summary": "Audio processing service is not properly configured.",
+                "taskProposals": [],
+                "project_updates": []
+            }
+        
+        # Stream the spooled upload straight into the transcription request; no temp copy is made
+        try:
+            if (audio_file.size or 0) > LONG_AUDIO_THRESHOLD_BYTES and long_audio_available(audio_file.filename):
+                # Too large for one upstream call: transcribe overlapping segments in parallel
+                transcript, cached = await transcribe_long_upload(client, audio_file)
+            else:
+                transcript, cached = await transcript_cache.transcribe(
+                    client, audio_file.file, audio_file.filename, audio_file.content_type or "application/octet-stream")
+            log_event(logging.INFO, "audio_transcribed", cached=cached, characters=len(transcript))
+            log_event(logging.DEBUG, "transcript_preview", text=transcript[:100])
+            
+            # Check if transcript is empty or contains error messages
+            transcript = clean_transcript(transcript)
+            
+        except Exception as api_error:
+            log_event(logging.ERROR, "transcription_failed", error=str(api_error))
+            transcript = "Could not understand audio. Please try again with clearer speech."
+            cached = False
+        
+        # Extract project updates, task proposals and the meeting summary in one analysis
+        session = await workbook_store.get(session_id)
+        analysis = analyze_transcript(transcript, session.workbook if session else None)
+        
+        return {
+            "transcript": transcript,
+            "summary": analysis["summary"],
+            "taskProposals": analysis["taskProposals"],
+            "project_updates": analysis["project_updates"],
+            "cached": cached
+        }
+        
+    except Exception as e:
+        log_event(logging.ERROR, "audio_processing_failed", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
+
+@app.post("/process-audio/stream")
+async def process_audio_stream(audio_file: UploadFile = File(...), session_id: str = Depends(get_session_id)):
+    """Transcribe a (long) recording in segments, streaming partial transcripts and proposals as SSE"""
+    allowed_extensions = ('.wav', '.mp3', '.m4a', '.webm', '.ogg')
+    if not audio_file.filename.lower().endswith(allowed_extensions):
+        raise HTTPException(status_code=400, detail=f"Audio file must be one of: {', '.join(allowed_extensions)}")
+    if not long_audio_available(audio_file.filename):
+        raise HTTPException(status_code=503, detail="Segmenting this audio format requires ffmpeg")
+    client = get_transcription_client()
+    if client is None:
+        raise HTTPException(status_code=503, detail="Audio processing requires OpenAI API key")
+
+    # Stage the upload before responding; the stream outlives the request body
+    work_dir, source_path = await stage_audio_upload(audio_file)
+    session = await workbook_store.get(session_id)
+    workbook = session.workbook if session else None
+
+    async def events():
+        transcript, cached = "", False
+        try:
+            async for event, payload in transcribe_long_audio(client, work_dir, source_path):
+                if event == "transcript":
+                    transcript, cached = payload["transcript"], payload["cached"]
+                    analysis = analyze_transcript(transcript, workbook)
+                    payload = {**payload, "taskProposals": analysis["taskProposals"],
+                               "project_updates": [update.model_dump() for update in analysis["project_updates"]]}
+                yield sse_event(event, payload)
+        except Exception as e:
+            log_event(logging.ERROR, "audio_processing_failed", error=str(e), streamed=True)
+            yield sse_event("error", {"detail": f"Error processing audio: {str(e)}"})
+            return
+        transcript = clean_transcript(transcript)
+        analysis = analyze_transcript(transcript, workbook)
+        yield sse_event("done", {
+            "transcript": transcript,
+            "summary": analysis["summary"],
+            "taskProposals": analysis["taskProposals"],
+            "project_updates": [update.model_dump() for update in analysis["project_updates"]],
+            "cached": cached
+        })
+
+    # transcribe_long_audio removes the work directory too, but never runs when the client
+    # leaves before the body starts
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                             background=BackgroundTask(shutil.rmtree, work_dir, True))
+
+# Audio jobs: /process-audio?mode=job stages the upload, queues it and returns a job id right
+# away, so proxies never hold a connection open for a whole transcription. A fixed number of
+# workers drain a bounded queue; when it is full new jobs are refused instead of piling up.
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", 32))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+JOB_RESULT_TTL_SECONDS = int(os.environ.get("JOB_RESULT_TTL_SECONDS", 3600))
+
+class AudioJob:
+    """One queued /process-audio request with its progress events, timings and result"""
+
+    def __init__(self, session_id: str, filename: str, content_type: str, size: int, work_dir: str, source_path: str):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.work_dir = work_dir
+        self.source_path = source_path
+        self.status = "queued"
+        self.created_at = datetime.datetime.now().isoformat()
+        self.queued_at = time.perf_counter()
+        self.finished_at = None
+        self.timings = {}
+        self.result = None
+        self.error = None
+        self.events = []
+        self.changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def publish(self, event: str, payload: dict):
+        self.events.append((event, payload))
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def set_status(self, status: str):
+        self.status = status
+        if self.finished:
+            self.finished_at = time.perf_counter()
+        self.publish("status", self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+            "created_at": self.created_at,
+            "timings": self.timings,
+            "error": self.error
+        }
+
+class AudioJobQueue:
+    """Bounded queue of audio jobs drained by a fixed pool of worker tasks"""
+
+    def __init__(self, max_queued: int, workers: int, result_ttl: int):
+        self.max_queued = max_queued
+        self.worker_count = workers
+        self.result_ttl = result_ttl
+        self.jobs = OrderedDict()
+        self._queue = None
+        self._workers = []
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def submit(self, job: AudioJob) -> int:
+        """Queue a job, raising asyncio.QueueFull when saturated; returns the queue depth"""
+        self._prune()
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.worker_count)]
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        self.jobs[job.id] = job
+        self.submitted += 1
+        job.publish("status", job.to_dict())
+        return self._queue.qsize()
+
+    def get(self, job_id: str) -> Optional[AudioJob]:
+        self._prune()
+        return self.jobs.get(job_id)
+
+    def _prune(self):
+        now = time.perf_counter()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished and now - job.finished_at > self.result_ttl]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+                self.completed += 1
+            except Exception as e:
+                log_event(logging.ERROR, "audio_job_failed", job_id=job.id, error=str(e))
+                job.error = str(e)
+                job.set_status("failed")
+                job.publish("error", {"detail": f"Error processing audio: {str(e)}"})
+                self.failed += 1
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AudioJob):
+        started = time.perf_counter()
+        job.timings["queue_wait"] = round(started - job.queued_at, 3)
+        job.set_status("running")
+        client = get_transcription_client()
+        if client is None:
+            raise RuntimeError("Audio processing requires OpenAI API key")
+
+        transcript, cached = "", False
+        try:
+            if job.size > LONG_AUDIO_THRESHOLD_BYTES and long_audio_available(job.filename):
+                # The long-audio pipeline removes the work directory itself
+                async for event, payload in transcribe_long_audio(client, job.work_dir, job.source_path):
+                    job.publish(event, payload)
+                    if event == "transcript":
+                        transcript, cached = payload["transcript"], payload["cached"]
+            else:
+                try:
+                    with open(job.source_path, "rb") as audio:
+                        transcript, cached = await transcript_cache.transcribe(client, audio, job.filename, job.content_type)
+                finally:
+                    await run_blocking_io(shutil.rmtree, job.work_dir, True)
+        except Exception as api_error:
+            log_event(logging.ERROR, "transcription_failed", error=str(api_error))
+        transcript = clean_transcript(transcript)
+        analysis_started = time.perf_counter()
+        job.timings["transcription"] = round(analysis_started - started, 3)
+
+        # The session is looked up now so proposals match the workbook as it is when the job runs
+        session = await workbook_store.get(job.session_id)
+        analysis = analyze_transcript(transcript, session.workbook if session else None)
+        job.timings["analysis"] = round(time.perf_counter() - analysis_started, 3)
+        job.timings["total"] = round(time.perf_counter() - job.queued_at, 3)
+        # Plain data: the result is also published as a server-sent event
+        job.result = {
+            "transcript": transcript,
+            "summary": analysis["summary"],
+            "taskProposals": analysis["taskProposals"],
+            "project_updates": [update.model_dump() for update in analysis["project_updates"]],
+            "cached": cached
+        }
+        job.set_status("done")
+        job.publish("done", job.result)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "workers": self.worker_count,
+            "running": sum(1 for job in self.jobs.values() if job.status == "running"),
+            "retained": len(self.jobs),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    async def shutdown(self):
+        for worker in self._workers:
+            worker.cancel()
+        for job in self.jobs.values():
+            if job.status == "queued":
+                shutil.rmtree(job.work_dir, True)
+
+audio_jobs = AudioJobQueue(JOB_QUEUE_SIZE, JOB_WORKERS, JOB_RESULT_TTL_SECONDS)
+
+@app.on_event("shutdown")
+async def shutdown_audio_jobs():
+    await audio_jobs.shutdown()
+
+async def submit_audio_job(audio_file: UploadFile, session_id: str) -> JSONResponse:
+    """Stage an upload and queue it; 503 with Retry-After when the queue is full"""
+    queue_full = HTTPException(status_code=503, detail="Audio job queue is full, please retry shortly",
+                               headers={"Retry-After": "5"})
+    if audio_jobs.full():
+        audio_jobs.rejected += 1
+        raise queue_full
+    work_dir, source_path = await stage_audio_upload(audio_file)
+    job = AudioJob(session_id, audio_file.filename, audio_file.content_type or "application/octet-stream",
+                   os.path.getsize(source_path), work_dir, source_path)
+    try:
+        queued = audio_jobs.submit(job)
+    except asyncio.QueueFull:
+        await run_blocking_io(shutil.rmtree, work_dir, True)
+        raise queue_full
+    log_event(logging.INFO, "audio_job_queued", job_id=job.id, waiting=queued)
+    return JSONResponse(status_code=202, content={**job.to_dict(), "queued": queued})
+
+def require_job(job_id: str) -> AudioJob:
+    job = audio_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and per-stage timings of an audio job"""
+    return require_job(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a finished audio job; 202 with the status while it is still queued or running"""
+    job = require_job(job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Error processing audio: {job.error}")
+    if not job.finished:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    return {**job.result, "job_id": job.id, "timings": job.timings}
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """Server-sent events of an audio job: past events are replayed, then new ones follow until it finishes"""
+    job = require_job(job_id)
+
+    async def events():
+        index = 0
+        while True:
+            changed = job.changed
+            while index < len(job.events):
+                yield sse_event(*job.events[index])
+                index += 1
+            if job.finished:
+                return
+            await changed.wait()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Transcript analysis: every Dutch and English pattern is compiled once at import, and one
+# TranscriptAnalysis produces the project updates, task proposals and meeting summary. The status
+# keywords are found in one scan; the update and summary patterns keep a finditer() each, because
+# their matches may overlap one another (one alternation would drop those), and one scan that
+# reports overlapping matches through a lookahead per pattern measured ~6x slower on a
+# 10k-word transcript than these scans, which stop once the summary is full.
+UPDATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r"(\w+)\s+(?:is|are)\s+(\d+)\s*%?\s*(?:complete|done|finished)",
+    r"(\w+)\s+(?:has|have)\s+(?:been\s+)?(completed|finished|done)",
+    r"(\w+)\s+(?:start|begin)\s+(?:on|from)\s+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
+    r"(\w+)\s+(?:end|finish)\s+(?:on|by)\s+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"
+]]
+
+ACTION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Dutch patterns
+    r"(?:we moeten|actie|todo)\s+(.+?)(?:\.|$)",
+    r"(?:toewijzen|delegeren)\s+(.+?)\s+aan\s+(.+?)(?:\.|$)",
+    r"(?:aanpassen|wijzigen|veranderen)\s+(.+?)(?:\.|$)",
+    r"(?:hulp nodig|help nodig)\s+(?:van|bij)\s+(.+?)(?:\.|$)",
+    r"(?:stuurgroep|steering group)\s+(.+?)(?:\.|$)",
+    # English patterns
+    r"(?:need to|should|must|will)\s+(.+?)(?:\.|$)",
+    r"(?:action item|todo|task)\s*:\s*(.+?)(?:\.|$)",
+    r"(?:next step|next action)\s*:\s*(.+?)(?:\.|$)"
+]]
+
+PROGRESS_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Dutch patterns
+    r"(\w+)\s+(?:is|zijn)\s+(\d+)\s*%?\s*(?:klaar|voltooid|gedaan)",
+    r"(\w+)\s+(?:heeft|hebben)\s+(?:al\s+)?(voltooid|afgerond|klaar)",
+    # English patterns
+    r"(\w+)\s+(?:is|are)\s+(\d+)\s*%?\s*(?:complete|done)",
+    r"(\w+)\s+(?:has|have)\s+(?:been\s+)?(completed|finished)"
+]]
+
+ISSUE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Dutch patterns
+    r"(?:probleem|blokker|obstakel|issue)\s*:\s*(.+?)(?:\.|$)",
+    r"(?:vertraagd|achter|laat)\s+omdat\s+(.+?)(?:\.|$)",
+    r"(?:blokker|blokkeert)\s+(.+?)(?:\.|$)",
+    r"(?:daar hebben we een blokker|we hebben een probleem)\s+(.+?)(?:\.|$)",
+    # English patterns
+    r"(?:issue|problem|blocker|obstacle)\s*:\s*(.+?)(?:\.|$)",
+    r"(?:delayed|behind|late)\s+because\s+(.+?)(?:\.|$)"
+]]
+
+DATE_CHANGE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Dutch patterns
+    r"(?:aanpassen|wijzigen|veranderen)\s+(?:naar|to)\s+(\d+\s+\w+|\w+\s+\d+)",
+    r"(?:nieuwe datum|nieuwe deadline)\s*:\s*(\d+\s+\w+|\w+\s+\d+)",
+    r"(?:passen.*aan naar)\s+(\d+\s+\w+|\w+\s+\d+)",
+    # English patterns
+    r"(?:change|move|update)\s+(?:to|date)\s+(\d+\s+\w+|\w+\s+\d+)",
+    r"(?:new date|new deadline)\s*:\s*(\d+\s+\w+|\w+\s+\d+)"
+]]
+
+# Keywords that indicate task status changes (Dutch and English)
+STATUS_KEYWORDS = {
+    "completed": ["complete", "finished", "done", "accomplished", "finalized", "klaar", "voltooid", "afgerond"],
+    "in_progress": ["progress", "ongoing", "working", "developing", "implementing", "bezig", "lopen", "werken"],
+    "delayed": ["delay", "behind", "late", "postponed", "extended", "vertraagd", "achter", "laat"],
+    "blocked": ["block", "stuck", "issue", "problem", "obstacle", "blokker", "probleem", "obstakel"]
+}
+# Proposed status and progress per keyword group, in order of precedence
+STATUS_PROPOSALS = [
+    ("completed", "Completed", 100),
+    ("delayed", "Delayed", 30),
+    ("blocked", "Blocked", 20),
+    ("in_progress", "In Progress", 50)
+]
+# Key Dutch phrases for the summary when no pattern matched
+SUMMARY_FALLBACK_KEYWORDS = ["tussentijds", "opslaan", "blokker", "probleem", "5 augustus"]
+MAX_SUMMARY_POINTS = 8
+# Status keywords count for a task mention when they are within this many characters of it
+MENTION_WINDOW_CHARS = int(os.environ.get("MENTION_WINDOW_CHARS", 150))
+
+KEYWORD_GROUPS = {keyword: group for group, keywords in STATUS_KEYWORDS.items() for keyword in keywords}
+ALL_KEYWORDS = sorted(set(KEYWORD_GROUPS) | set(SUMMARY_FALLBACK_KEYWORDS), key=len, reverse=True)
+# A zero-width lookahead reports the longest keyword starting at every position in one scan;
+# shorter keywords contained in it are implied, so substring semantics are kept exactly
+KEYWORD_SCAN = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in ALL_KEYWORDS) + "))")
+IMPLIED_KEYWORDS = {keyword: {other for other in ALL_KEYWORDS if other in keyword} for keyword in ALL_KEYWORDS}
+
+class TranscriptAnalysis:
+    """A transcript lowercased and scanned for status keywords once, shared by all analysis outputs"""
+
+    @timed(ANALYSIS_SECONDS, function="keyword_scan")
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+        self.lower = transcript.lower()
+        self.keywords = set()
+        self.keyword_positions = {group: [] for group in STATUS_KEYWORDS}
+        for match in KEYWORD_SCAN.finditer(self.lower):
+            found = match.group(1)
+            for keyword in IMPLIED_KEYWORDS[found]:
+                self.keywords.add(keyword)
+                if keyword in KEYWORD_GROUPS:
+                    self.keyword_positions[KEYWORD_GROUPS[keyword]].append(match.start() + found.index(keyword))
+        for positions in self.keyword_positions.values():
+            positions.sort()
+        self.keyword_groups = {group for group, positions in self.keyword_positions.items() if positions}
+        self.meeting_id = f"meeting-{int(time.time())}"
+        self.timestamp = datetime.datetime.now().isoformat()
+
+    @timed(ANALYSIS_SECONDS, function="project_updates")
+    def project_updates(self) -> List[ProjectUpdate]:
+        """Extract project updates from transcript using regex patterns"""
+        return [
+            ProjectUpdate(project_name=match.group(1), task_name=match.group(1), new_start_date="", new_end_date="")
+            for pattern in UPDATE_PATTERNS
+            for match in pattern.finditer(self.transcript)
+        ]
+
+    @timed(ANALYSIS_SECONDS, function="task_proposals")
+    def task_proposals(self, workbook: Optional["ParsedWorkbook"]) -> List[dict]:
+        """Generate task proposals for tasks mentioned in the transcript"""
+        proposals = []
+        if workbook is None or not workbook.projects:
+            return proposals
+        projects = workbook.projects
+
+        # One scan finds every task mention; the status comes from keywords near the mention
+        mentions = {}
+        for start, end, positions in workbook.task_matcher.find(self.lower):
+            status = self._status_near(start, end)
+            if status:
+                for position in positions:
+                    mentions.setdefault(position, (status, start))
+        for position in sorted(mentions):
+            (status, progress), start = mentions[position]
+            task = projects[position]
+            proposal = self._proposal(
+                len(proposals), task, status, progress, f"Task '{task['name']}' status mentioned in meeting", 0.8
+            )
+            proposal["mentionPosition"] = start
+            proposals.append(proposal)
+
+        # If no specific tasks found, propose completion or delay for the first main task
+        if not proposals:
+            main_task = projects.first('activity_type', 'main-item')
+            if main_task and "completed" in self.keyword_groups:
+                proposals.append(self._proposal(0, main_task, "Completed", 100, "Completion mentioned in meeting", 0.6))
+            elif main_task and "delayed" in self.keyword_groups:
+                proposals.append(self._proposal(0, main_task, "Delayed", 30, "Delay mentioned in meeting", 0.6))
+        return proposals
+
+    def _status_near(self, start: int, end: int) -> Optional[Tuple[str, int]]:
+        """(status, progress) for the highest-precedence keyword group within the mention window"""
+        window_start, window_end = start - MENTION_WINDOW_CHARS, end + MENTION_WINDOW_CHARS
+        for group, status, progress in STATUS_PROPOSALS:
+            positions = self.keyword_positions[group]
+            index = bisect.bisect_left(positions, window_start)
+            if index < len(positions) and positions[index] < window_end:
+                return status, progress
+        return None
+
+    @timed(ANALYSIS_SECONDS, function="summary")
+    def summary(self) -> str:
+        """Generate a concise meeting summary from transcript"""
+        key_points = list(itertools.islice(self._key_points(), MAX_SUMMARY_POINTS))
+        if key_points:
+            return "Meeting Summary:\n" + "\n".join(key_points)
+
         # If no specific patterns found, create a basic summary with key Dutch phrases
-        if "tussentijds" in transcript.lower() or "opslaan" in transcript.lower():
+        if "tussentijds" in self.keywords or "opslaan" in self.keywords:
             key_points.append("Action: Review interim saving functionality")
-        if "blokker" in transcript.lower() or "probleem" in transcript.lower():
+        if "blokker" in self.keywords or "probleem" in self.keywords:
             key_points.append("Issue: Blocker identified - needs steering group assistance")
-        if "5 augustus" in transcript.lower():
+        if "5 augustus" in self.keywords:
             key_points.append("Date Change: Adjust timeline to August 5th")
-        
         if key_points:
-            summary = "Meeting Summary:\n" + "\n".join(key_points)
-        else:
-            summary = f"Meeting discussion recorded. Key topics: {transcript[:200]}..."
-    
-    return summary
+            return "Meeting Summary:\n" + "\n".join(key_points)
+        return f"Meeting discussion recorded. Key topics: {self.transcript[:200]}..."
+
+    def _key_points(self) -> Iterator[str]:
+        """Yield summary points lazily, so scanning stops once the summary is full"""
+        for pattern in ACTION_PATTERNS:
+            for match in pattern.finditer(self.transcript):
+                if len(match.groups()) > 1:
+                    yield f"Action: {match.group(1).strip()} to {match.group(2).strip()}"
+                else:
+                    yield f"Action: {match.group(1).strip()}"
+        for pattern in PROGRESS_PATTERNS:
+            for match in pattern.finditer(self.transcript):
+                yield f"Progress: {match.group(1)} - {match.group(2)}"
+        for pattern in ISSUE_PATTERNS:
+            for match in pattern.finditer(self.transcript):
+                yield f"Issue: {match.group(1).strip()}"
+        for pattern in DATE_CHANGE_PATTERNS:
+            for match in pattern.finditer(self.transcript):
+                yield f"Date Change: {match.group(1).strip()}"
+
+    def _proposal(self, index: int, task: dict, status: str, progress: int, reason: str, confidence: float) -> dict:
+        return {
+            "id": f"proposal-{index + 1}",
+            "taskId": task['item_id'],  # Use actual task ID from Excel
+            "proposedStatus": status,
+            "proposedProgress": progress,
+            "reason": reason,
+            "confidence": confidence,
+            "meetingId": self.meeting_id,
+            "timestamp": self.timestamp
+        }
+
+def analyze_transcript(transcript: str, workbook: Optional["ParsedWorkbook"]) -> dict:
+    """Project updates, task proposals and meeting summary from a single transcript analysis"""
+    analysis = TranscriptAnalysis(transcript)
+    return {
+        "project_updates": analysis.project_updates(),
+        "taskProposals": analysis.task_proposals(workbook),
+        "summary": analysis.summary()
+    }
+
+def extract_project_updates(transcript: str) -> List[ProjectUpdate]:
+    """Extract project updates from transcript using regex patterns"""
+    return TranscriptAnalysis(transcript).project_updates()
+
+def generate_task_proposals(transcript: str, projects: List[dict]) -> List[dict]:
+    """Generate AI-powered task proposals based on transcript analysis"""
+    return TranscriptAnalysis(transcript).task_proposals(ParsedWorkbook(projects, [], len(projects)))
+
+def generate_meeting_summary(transcript: str) -> str:
+    """Generate a concise meeting summary from transcript"""
+    return TranscriptAnalysis(transcript).summary()
+
+# XLSX patch writer: rewrites only the changed <c> elements of the sheet XML and copies every
+# other zip member through unchanged, instead of a full openpyxl load/save of the workbook.
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+# Built-in number formats that display dates, and percentages
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+BUILTIN_PERCENT_FORMATS = {9, 10}
+
+ROW_XML = re.compile(rb'<row\b[^>]*?(?:/>|>.*?</row>)', re.S)
+CELL_XML = re.compile(rb'<c\b[^>]*?(?:/>|>.*?</c>)', re.S)
+XML_ATTRIBUTE = re.compile(rb'([\w:]+)="([^"]*)"')
+CELL_REFERENCE = re.compile(rb'([A-Z]+)(\d+)')
+CELL_VALUE = re.compile(rb'<v>([^<]*)</v>')
+INLINE_TEXT = re.compile(rb'<t\b[^>]*>([^<]*)</t>')
+CELL_FORMATS_XML = re.compile(rb'(<cellXfs\b[^>]*>)(.*?)</cellXfs>', re.S)
+CELL_FORMAT_XML = re.compile(rb'<xf\b[^>]*?(?:/>|>.*?</xf>)', re.S)
+# Short date (shown in the reader's locale) for dates written into cells without a date format
+DATE_NUMBER_FORMAT_ID = b'14'
+DATE_NUMBER_FORMAT = "mm-dd-yy"  # openpyxl's name for built-in format 14
+
+class UnsupportedWorkbookLayout(Exception):
+    """The workbook uses XML the patch writer does not handle; callers fall back to openpyxl"""
+
+def _column_number(letters: bytes) -> int:
+    number = 0
+    for letter in letters:
+        number = number * 26 + letter - ord('A') + 1
+    return number
+
+def _column_letters(number: int) -> str:
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+def _start_tag_attributes(element: bytes) -> dict:
+    return dict(XML_ATTRIBUTE.findall(element[:element.index(b'>') + 1]))
+
+def _excel_serial(value: datetime.datetime, date1904: bool):
+    epoch = datetime.datetime(1904, 1, 1) if date1904 else datetime.datetime(1899, 12, 30)
+    delta = value - epoch
+    serial = delta.days + delta.seconds / 86400
+    return int(serial) if serial.is_integer() else serial
+
+def _format_tokens(code: str) -> str:
+    # Ignore quoted literals, [colors]/[locales] and escaped characters before looking for tokens
+    return re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', '', code)
+
+def _is_date_format(code: str) -> bool:
+    return bool(re.search(r'[dmyDMY]', _format_tokens(code)))
+
+def _is_percent_format(code: str) -> bool:
+    return '%' in _format_tokens(code)
+
+def _with_attributes(element: bytes, attributes: dict) -> bytes:
+    """`element` with the given attributes set (replaced or added) in its start tag"""
+    end = element.index(b'>')
+    if element[end - 1:end] == b'/':
+        end -= 1
+    start_tag = element[:end]
+    for name, value in attributes.items():
+        attribute = b'%s="%s"' % (name, value)
+        start_tag, found = re.subn(rb'(?<=\s)' + re.escape(name) + rb'="[^"]*"', lambda match: attribute, start_tag)
+        if not found:
+            start_tag += b' ' + attribute
+    return start_tag + element[end:]
+
+class CellStyles:
+    """The cellXfs of xl/styles.xml: which styles show dates or percentages, plus date copies of others
+
+    A date written into a cell without a date style gets a copy of that cell's <xf> (font, fill,
+    border, alignment) with the short date format, as openpyxl does; the copies are appended to
+    cellXfs by patched_styles_xml().
+    """
+
+    def __init__(self, styles_xml: Optional[bytes]):
+        self.styles_xml = styles_xml
+        self.date_styles, self.percent_styles = set(), set()
+        self._date_copies = {}  # {style: index of its copy with a date format}
+        self._cell_formats = []
+        if styles_xml is None:
+            return
+        styles = ElementTree.fromstring(styles_xml)
+        date_formats = set(BUILTIN_DATE_FORMATS)
+        percent_formats = set(BUILTIN_PERCENT_FORMATS)
+        for number_format in styles.iter(f'{{{SPREADSHEET_NS}}}numFmt'):
+            code = number_format.get('formatCode', '')
+            if _is_date_format(code):
+                date_formats.add(int(number_format.get('numFmtId')))
+            elif _is_percent_format(code):
+                percent_formats.add(int(number_format.get('numFmtId')))
+        cell_formats = styles.find(f'{{{SPREADSHEET_NS}}}cellXfs')
+        if cell_formats is not None:
+            self._cell_formats = list(cell_formats)
+            for index, cell_format in enumerate(cell_formats):
+                number_format = int(cell_format.get('numFmtId', 0))
+                if number_format in date_formats:
+                    self.date_styles.add(index)
+                elif number_format in percent_formats:
+                    self.percent_styles.add(index)
+
+    def date_style(self, style: Optional[int]) -> int:
+        """The style to write a date with into a cell that has `style`"""
+        if style in self.date_styles:
+            return style
+        style = style or 0
+        if style >= len(self._cell_formats):
+            raise UnsupportedWorkbookLayout("cell style missing from cellXfs")
+        if style not in self._date_copies:
+            self._date_copies[style] = len(self._cell_formats) + len(self._date_copies)
+        return self._date_copies[style]
+
+    def patched_styles_xml(self) -> Optional[bytes]:
+        """xl/styles.xml with the date copies appended to cellXfs (None when nothing was copied)"""
+        if not self._date_copies:
+            return None
+        cell_formats = CELL_FORMATS_XML.search(self.styles_xml)
+        elements = CELL_FORMAT_XML.findall(cell_formats.group(2)) if cell_formats else []
+        if len(elements) != len(self._cell_formats):
+            raise UnsupportedWorkbookLayout("cellXfs layout not understood")
+        copies = b''.join(_with_attributes(elements[style], {b'numFmtId': DATE_NUMBER_FORMAT_ID,
+                                                             b'applyNumberFormat': b'1'})
+                          for style in self._date_copies)
+        count = str(len(elements) + len(self._date_copies)).encode()
+        return (self.styles_xml[:cell_formats.start()] + _with_attributes(cell_formats.group(1), {b'count': count})
+                + cell_formats.group(2) + copies + self.styles_xml[cell_formats.end(2):])
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    try:
+        strings = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+    except KeyError:
+        return []
+    return [''.join(text.text or '' for text in item.iter(f'{{{SPREADSHEET_NS}}}t'))
+            for item in strings.iter(f'{{{SPREADSHEET_NS}}}si')]
+
+def _xml_cell_value(cell_xml: bytes, shared_strings: Callable[[], List[str]]):
+    """The number or text an existing <c> element holds (None when empty)"""
+    cell_type = _start_tag_attributes(cell_xml).get(b't', b'n')
+    if cell_type == b'inlineStr':
+        return xml_unescape(b''.join(INLINE_TEXT.findall(cell_xml)).decode())
+    value = CELL_VALUE.search(cell_xml)
+    if value is None:
+        return None
+    value = xml_unescape(value.group(1).decode())
+    if cell_type == b's':
+        strings = shared_strings()
+        return strings[int(value)] if int(value) < len(strings) else None
+    if cell_type in (b'str', b'e', b'b'):
+        return value
+    return float(value)
+
+def _first_sheet_part(archive: zipfile.ZipFile, workbook: ElementTree.Element) -> str:
+    sheet = workbook.find(f'{{{SPREADSHEET_NS}}}sheets/{{{SPREADSHEET_NS}}}sheet')
+    relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    if sheet is None:
+        raise UnsupportedWorkbookLayout("workbook has no sheets")
+    relationship_id = sheet.get(f'{{{RELATIONSHIPS_NS}}}id')
+    for relationship in relationships.iter(f'{{{PACKAGE_RELATIONSHIPS_NS}}}Relationship'):
+        if relationship.get('Id') == relationship_id:
+            target = relationship.get('Target')
+            return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    raise UnsupportedWorkbookLayout("first sheet has no relationship target")
+
+def _cell_xml(reference: str, value, style: Optional[int]) -> bytes:
+    style_attribute = "" if style is None else f' s="{style}"'
+    if isinstance(value, str):
+        space = ' xml:space="preserve"' if value != value.strip() else ''
+        return f'<c r="{reference}"{style_attribute} t="inlineStr"><is><t{space}>{xml_escape(value)}</t></is></c>'.encode()
+    return f'<c r="{reference}"{style_attribute}><v>{value!r}</v></c>'.encode()
+
+def _patch_row(row_xml: bytes, row_number: int, cells: dict, styles: CellStyles, date1904: bool,
+               shared_strings: Callable[[], List[str]]) -> bytes:
+    """Replace, insert or clear the <c> elements for `cells` ({column: value}) in one <row> element
+
+    Dates become serials in (a date copy of) the cell's style, numbers and text keep the cell's style, None empties the cell.
+    Percentages take the form of the value they replace (completion_cell_value).
+    """
+    start_tag_end = row_xml.index(b'>') + 1
+    if row_xml[start_tag_end - 2:start_tag_end] == b'/>':
+        start_tag, inner = row_xml[:start_tag_end - 2] + b'>', b''
+    else:
+        start_tag, inner = row_xml[:start_tag_end], row_xml[start_tag_end:-len(b'</row>')]
+
+    existing = {}
+    for cell in CELL_XML.finditer(inner):
+        reference = CELL_REFERENCE.fullmatch(_start_tag_attributes(cell.group(0)).get(b'r', b''))
+        if reference is None:
+            raise UnsupportedWorkbookLayout("cell without a reference")
+        existing[_column_number(reference.group(1))] = cell.group(0)
+    if CELL_XML.sub(b'', inner).strip():
+        raise UnsupportedWorkbookLayout("row contains elements other than cells")
+
+    for column, value in cells.items():
+        old_cell = existing.get(column)
+        old_style = None
+        if old_cell is not None:
+            if b'<f' in old_cell:
+                raise UnsupportedWorkbookLayout("updated cell holds a formula")
+            old_style = _start_tag_attributes(old_cell).get(b's')
+            old_style = None if old_style is None else int(old_style)
+        if value is None:
+            existing.pop(column, None)
+            continue
+        reference = f'{_column_letters(column)}{row_number}'
+        if isinstance(value, Percentage):
+            old_value = None if old_cell is None else _xml_cell_value(old_cell, shared_strings)
+            value = completion_cell_value(value, old_value, old_style in styles.percent_styles)
+        if not isinstance(value, datetime.datetime):
+            existing[column] = _cell_xml(reference, value, old_style)
+            continue
+        existing[column] = _cell_xml(reference, _excel_serial(value, date1904), styles.date_style(old_style))
+
+    return start_tag + b''.join(existing[column] for column in sorted(existing)) + b'</row>'
+
+def _patch_sheet_xml(sheet_xml: bytes, targets: dict, styles: CellStyles, date1904: bool,
+                     shared_strings: Callable[[], List[str]]) -> bytes:
+    """Rewrite the rows in `targets` ({row: {column: value}}) in a single pass over the sheet XML"""
+    found = set()
+
+    def patch(match):
+        row_xml = match.group(0)
+        row_number = _start_tag_attributes(row_xml).get(b'r')
+        if row_number is None:
+            raise UnsupportedWorkbookLayout("row without a row number")
+        row_number = int(row_number)
+        if row_number not in targets:
+            return row_xml
+        found.add(row_number)
+        return _patch_row(row_xml, row_number, targets[row_number], styles, date1904, shared_strings)
+
+    patched = ROW_XML.sub(patch, sheet_xml)
+    if found != set(targets):
+        raise UnsupportedWorkbookLayout("updated rows are missing from the sheet XML")
+    return patched
+
+def _force_full_calc(workbook_xml: bytes) -> bytes:
+    """Ask Excel to recalculate formulas on open (as an openpyxl save does), since cells changed"""
+    calc = re.search(rb'<calcPr\b[^>]*?/?>', workbook_xml)
+    if calc is None or b'fullCalcOnLoad=' in calc.group(0):
+        return workbook_xml
+    tag = calc.group(0)
+    end = -2 if tag.endswith(b'/>') else -1
+    return workbook_xml[:calc.start()] + tag[:end] + b' fullCalcOnLoad="1"' + tag[end:] + workbook_xml[calc.end():]
+
+def patch_xlsx_cells(file_path: str, cell_updates: List[Tuple[int, dict]]) -> bool:
+    """Patch (row, {column: value}) cells in place; returns False when the layout needs a full openpyxl save"""
+    patched_path = file_path + ".patch"
+    try:
+        with zipfile.ZipFile(file_path) as source:
+            workbook_xml = source.read('xl/workbook.xml')
+            workbook = ElementTree.fromstring(workbook_xml)
+            properties = workbook.find(f'{{{SPREADSHEET_NS}}}workbookPr')
+            date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+            sheet_part = _first_sheet_part(source, workbook)
+            try:
+                styles = CellStyles(source.read('xl/styles.xml'))
+            except KeyError:
+                styles = CellStyles(None)
+            shared_strings = functools.lru_cache(maxsize=None)(functools.partial(_shared_strings, source))
+
+            targets = {}
+            for row, cells in cell_updates:
+                targets.setdefault(row, {}).update(cells)
+            patched_members = {
+                sheet_part: _patch_sheet_xml(source.read(sheet_part), targets, styles, date1904, shared_strings),
+                'xl/workbook.xml': _force_full_calc(workbook_xml)
+            }
+            styles_xml = styles.patched_styles_xml()
+            if styles_xml is not None:
+                patched_members['xl/styles.xml'] = styles_xml
+
+            with zipfile.ZipFile(patched_path, 'w') as target:
+                for info in source.infolist():
+                    member = copy.copy(info)  # writestr() fills in the sizes and offsets of the copy
+                    if info.filename in patched_members:
+                        member.compress_type = zipfile.ZIP_DEFLATED
+                        target.writestr(member, patched_members[info.filename])
+                    else:
+                        target.writestr(member, source.read(info))
+        os.replace(patched_path, file_path)
+        return True
+    except (UnsupportedWorkbookLayout, KeyError) as e:
+        log_event(logging.WARNING, "xlsx_patch_fallback", error=str(e))
+        if os.path.exists(patched_path):
+            os.unlink(patched_path)
+        return False
+
+def apply_workbook_updates(file_path: str, cell_updates: List[Tuple[int, dict]]) -> None:
+    """Write (row, {column: value}) changes into the workbook; runs in the parse process pool"""
+    if patch_xlsx_cells(file_path, cell_updates):
+        return
+
+    workbook = openpyxl.load_workbook(file_path)
+    sheet = workbook.worksheets[0]  # The sheet the projects were parsed from
+    for row, cells in cell_updates:
+        for column, value in cells.items():
+            cell = sheet.cell(row=row, column=column)
+            if isinstance(value, Percentage):
+                value = completion_cell_value(value, cell.value, _is_percent_format(cell.number_format))
+            elif isinstance(value, datetime.datetime) and not cell.is_date:
+                cell.number_format = DATE_NUMBER_FORMAT  # Same format the patch writer gives such cells
+            cell.value = value  # cell(value=None) would keep the old value
+    workbook.save(file_path)
 
 @app.post("/update-excel")
-async def update_excel(updates: List[ProjectUpdate]):
-    """Update Excel file with project changes"""
-    global current_excel_file
-    
-    if not current_excel_file:
-        raise HTTPException(status_code=400, detail="No Excel file uploaded")
+async def update_excel(updates: List[ProjectUpdate], match: str = UPDATE_MATCH_MODE,
+                       session_id: str = Depends(get_session_id)):
+    """Update Excel file with project changes
+
+    Tasks are looked up by name or item_id through the session's row index; `match` selects
+    exact, prefix or substring matching. The new dates are stored as task row updates and
+    written into the workbook on the next /download-excel.
+    """
+    if match not in RowIndex.MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"match must be one of: {', '.join(RowIndex.MATCH_MODES)}")
+    session = await require_session(session_id)
     
     try:
-        # Load workbook
-        workbook = openpyxl.load_workbook(current_excel_file)
-        sheet = workbook.active
-        
-        # Apply updates
+        # Resolve every update to task positions through the index
+        changed_projects = []
+        changed_rollups = {}
+        updates_applied = 0
         for update in updates:
-            # Find project in sheet
-            for row in sheet.iter_rows():
-                for cell in row:
-                    if cell.value and update.project_name.lower() in str(cell.value).lower():
-                        # Found project, update dates
-                        row_idx = cell.row
-                        
-                        # Update start date (assuming it's in a specific column)
-                        start_col = 3  # Adjust based on your Excel structure
-                        end_col = 4    # Adjust based on your Excel structure
-                        
-                        try:
-                            start_date = datetime.strptime(update.new_start_date, '%Y-%m-%d')
-                            end_date = datetime.strptime(update.new_end_date, '%Y-%m-%d')
-                            
-                            sheet.cell(row=row_idx, column=start_col, value=start_date)
-                            sheet.cell(row=row_idx, column=end_col, value=end_date)
-                        except:
-                            pass
-                        break
+            try:
+                start_date = datetime.datetime.strptime(update.new_start_date, '%Y-%m-%d')
+                end_date = datetime.datetime.strptime(update.new_end_date, '%Y-%m-%d')
+            except ValueError:
+                continue
+            
+            row_index = session.workbook.row_index
+            positions = row_index.lookup(update.project_name, match)
+            if not positions and update.task_name != update.project_name:
+                positions = row_index.lookup(update.task_name, match)
+            if not positions:
+                continue
+            
+            updates_applied += 1
+            for position in positions:
+                changed_projects.append((position, start_date, end_date))
         
-        # Save updated workbook
-        workbook.save(current_excel_file)
+        if changed_projects:
+            # Same date format as a fresh upload
+            session = await workbook_store.apply_changes(session, [
+                (position, {"start_date": start_date.strftime('%Y-%m-%d'), "end_date": end_date.strftime('%Y-%m-%d')})
+                for position, start_date, end_date in changed_projects])
+            for position, _, _ in changed_projects:
+                changed_rollups.update(dict.fromkeys(session.workbook.rollups.path(position)))
         
         return {
             "message": "Excel file updated successfully",
-            "updates_applied": len(updates)
+            "updates_applied": updates_applied,
+            "rows_updated": len(changed_projects),
+            "rollups": [session.workbook.rollups.rollup(position) for position in changed_rollups]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating Excel file: {str(e)}")
 
+@app.post("/accept-proposal")
+async def accept_proposal(proposal: ProposalAcceptance, session_id: str = Depends(get_session_id)):
+    """Apply an accepted task proposal's status and progress; returns the recomputed rollups"""
+    session = await require_session(session_id)
+    positions = session.workbook.projects.positions("item_id", proposal.taskId)
+    if not proposal.taskId or not positions:
+        raise HTTPException(status_code=404, detail=f"Task {proposal.taskId!r} not found")
+    positions = list(positions)
+    session = await workbook_store.apply_changes(session, [
+        (position, {"status": proposal.proposedStatus, "completed": proposal.proposedProgress}) for position in positions])
+    changed_rollups = {}
+    for position in positions:
+        changed_rollups.update(dict.fromkeys(session.workbook.rollups.path(position)))
+    return {
+        "message": "Proposal accepted",
+        "tasks": [session.workbook.projects[position].to_dict() for position in positions],
+        "rollups": [session.workbook.rollups.rollup(position) for position in changed_rollups]
+    }
+
+@app.get("/rollups")
+async def get_rollups(item_id: Optional[str] = None, session_id: str = Depends(get_session_id)):
+    """Rollups of every task with children, or of one task and its ancestors when item_id is given"""
+    session = await require_session(session_id)
+    tree = session.workbook.rollups
+    if item_id is not None:
+        positions = session.workbook.projects.positions("item_id", item_id)
+        if not positions:
+            raise HTTPException(status_code=404, detail=f"Task {item_id!r} not found")
+        return {"rollups": [tree.rollup(position) for position in tree.path(positions[0])]}
+    return {"rollups": [tree.rollup(position) for position, children in enumerate(tree.children) if children]}
+
+@app.get("/timeline")
+async def timeline(start: str, end: str, state: str = "active", as_of: Optional[str] = None,
+                   session_id: str = Depends(get_session_id)):
+    """Tasks active in the start-end window, or (state=overdue) due in it and unfinished before as_of (default today)"""
+    session = await require_session(session_id)
+    if state not in ("active", "overdue"):
+        raise HTTPException(status_code=400, detail="state must be 'active' or 'overdue'")
+    try:
+        first_day = datetime.date.fromisoformat(start).toordinal()
+        last_day = datetime.date.fromisoformat(end).toordinal()
+        reference_day = datetime.date.fromisoformat(as_of).toordinal() if as_of else datetime.date.today().toordinal()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be formatted as YYYY-MM-DD")
+    if first_day > last_day:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    store = session.workbook.projects
+    if state == "active":
+        positions = session.workbook.timeline.overlapping(first_day, last_day)
+    else:
+        positions = [
+            position for position in session.workbook.timeline.due(first_day, min(last_day, reference_day - 1))
+            if (store[position].completed or 0) < 100 and str(store[position].status).strip().lower() not in FINISHED_STATUSES
+        ]
+    positions.sort()
+    return ORJSONResponse({
+        "state": state,
+        "start": start,
+        "end": end,
+        "count": len(positions),
+        "projects": [store[position].to_dict() for position in positions]
+    })
+
+# Exports: the workbook itself or its projects as CSV, JSON or Parquet. Derived formats are built
+# lazily and cached per session version; every response carries an ETag and Last-Modified
+# computed from the version alone, so a poll for an unchanged export is a 304 without any work.
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Parquet needs pyarrow or fastparquet, neither of which is a hard dependency
+PARQUET_AVAILABLE = any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet"))
+
+def build_export(export_format: str, projects: List[dict]) -> bytes:
+    """Serialize project dicts as csv, json or parquet (blocking, runs in the I/O pool)"""
+    if export_format == "json":
+        return orjson.dumps(projects)
+    frame = pd.DataFrame(projects, columns=list(PROJECT_FIELDS))
+    if export_format == "csv":
+        return frame.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+async def get_export(session: WorkbookSession, export_format: str) -> bytes:
+    """Cached export body for the session's current version, built on first request"""
+    cached = session.exports.get(export_format)
+    if cached and cached[0] == session.version:
+        CACHE_REQUESTS.inc(cache="export", outcome="hit")
+        return cached[1]
+    async with session.lock:
+        cached = session.exports.get(export_format)
+        if cached and cached[0] == session.version:
+            CACHE_REQUESTS.inc(cache="export", outcome="hit")
+            return cached[1]
+        CACHE_REQUESTS.inc(cache="export", outcome="miss")
+        version = session.version
+        with STAGE_SECONDS.time(stage="export"):
+            body = await run_blocking_io(build_export, export_format, session.workbook.projects.to_dicts())
+        session.exports[export_format] = (version, body)
+        return body
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match list"""
+    opaque = lambda tag: tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()
+    return header.strip() == "*" or any(opaque(tag) == opaque(etag) for tag in header.split(","))
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (first, last) of a single "bytes=" range, or None to send the whole body"""
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None  # Multiple ranges are answered with the full body
+    first, _, last = spec.strip().partition("-")
+    unsatisfiable = HTTPException(status_code=416, detail="Requested range not satisfiable",
+                                  headers={"Content-Range": f"bytes */{size}"})
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise unsatisfiable
+            return max(size - length, 0), size - 1
+        first, last = int(first), int(last) if last else size - 1
+    except ValueError:
+        return None
+    if first >= size or last < first:
+        raise unsatisfiable
+    return first, min(last, size - 1)
+
+def _read_file_range(file_path: str, first: int, last: int) -> bytes:
+    with open(file_path, "rb") as file_obj:
+        file_obj.seek(first)
+        return file_obj.read(last - first + 1)
+
 @app.get("/download-excel")
-async def download_excel():
-    """Download the updated Excel file"""
-    global current_excel_file
+async def download_excel(request: Request, response_format: str = Query("xlsx", alias="format"),
+                         session_id: str = Depends(get_session_id)):
+    """Download the updated Excel file, or its projects as csv, json or parquet
+
+    The xlsx download first writes the tasks edited since the last download into the workbook
+    (only their rows are touched). Responses carry ETag and Last-Modified validators (If-None-Match / If-Modified-Since give a
+    304) and honour single byte ranges (with If-Range).
+    """
+    session = await require_session(session_id, "No Excel file available")
+    if response_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if response_format == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow or fastparquet")
+    if response_format == "xlsx" and is_portfolio(session):
+        raise HTTPException(status_code=400, detail="A portfolio has no single workbook; download it as csv, json or parquet")
     
-    if not current_excel_file:
-        raise HTTPException(status_code=400, detail="No Excel file available")
+    etag = f'"{session.token}-{session.version}-{response_format}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(session.modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            CACHE_REQUESTS.inc(cache="http", outcome="not_modified")
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since:
+        try:
+            if int(session.modified) <= parsedate_to_datetime(if_modified_since).timestamp():
+                CACHE_REQUESTS.inc(cache="http", outcome="not_modified")
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
     
     try:
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            current_excel_file,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            filename='updated_gantt_chart.xlsx'
-        )
+        filename = f"updated_gantt_chart.{response_format}"
+        media_type = EXPORT_FORMATS[response_format]
+        if response_format == "xlsx":
+            await workbook_store.write_back(session)
+            size = os.path.getsize(session.file_path)
+            body = None
+        else:
+            body = await get_export(session, response_format)
+            size = len(body)
+        
+        # A range is only served while If-Range (when sent) still names this version
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        byte_range = _byte_range(range_header, size) if range_header and (not if_range or if_range == etag) else None
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if byte_range:
+            first, last = byte_range
+            chunk = body[first:last + 1] if body is not None else await run_blocking_io(
+                _read_file_range, session.file_path, first, last)
+            headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+            return Response(chunk, status_code=206, media_type=media_type, headers=headers)
+        if body is None:
+            return FileResponse(session.file_path, media_type=media_type, filename=filename, headers=headers)
+        return Response(body, media_type=media_type, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading file: {str(e)}")
 
+@app.get("/metrics")
+async def metrics():
+    """Stage latency histograms and cache/OpenAI counters in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, sort: str = "cumulative", limit: int = Query(40, ge=1, le=500)):
+    """pstats report of a profiled request (see ProfilingMiddleware)"""
+    report = profile_reports.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    method, path, stats = report
+    if sort not in pstats.Stats.sort_arg_dict_default:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(pstats.Stats.sort_arg_dict_default)}")
+    buffer = io.StringIO()
+    stats.stream = buffer
+    stats.sort_stats(sort).print_stats(limit)
+    return PlainTextResponse(f"{method} {path}\n{buffer.getvalue()}")
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Workbook session store, upload and transcript cache, and audio job queue counters"""
+    return {**workbook_store.stats(), "upload_cache": upload_cache.stats(), "transcript_cache": transcript_cache.stats(),
+            "audio_jobs": audio_jobs.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Test settings: applied before main is imported, so every test run gets its own state"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+STATE_DIR = tempfile.mkdtemp(prefix="gantt-tests-")
+os.environ.update(
+    LOG_LEVEL="WARNING",
+    PARSE_POOL_SIZE="0",  # Parse on threads: no process pool to spawn per test run
+    SESSION_STATE_PATH=os.path.join(STATE_DIR, "sessions.sqlite3"),
+    SESSION_FILES_DIR=os.path.join(STATE_DIR, "workbooks"),
+    TRANSCRIPT_CACHE_PATH="",
+)
+
+@pytest.fixture(scope="session")
+def client():
+    """One app lifetime for the whole run, like a server process: shutdown stops the pools for good"""
+    import main
+    with TestClient(main.app) as client:
+        yield client
+
+def request_abandoned_before_body(app, url: str, **request_options):
+    """Send a request through the ASGI app from a client that is gone before the response starts:
+    the request body arrives, then every receive() reports a disconnect and send() never returns"""
+    request = httpx.Request("POST", url, **request_options)
+    messages = [{"type": "http.request", "body": request.read(), "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.Event().wait()
+
+    scope = {"type": "http", "http_version": "1.1", "method": "POST", "scheme": request.url.scheme,
+             "server": (request.url.host, request.url.port or 80), "client": ("testclient", 50000),
+             "path": request.url.path, "raw_path": request.url.raw_path.split(b"?")[0],
+             "query_string": request.url.query, "root_path": "",
+             "headers": [(name.lower().encode(), value.encode()) for name, value in request.headers.items()]}
+    asyncio.run(app(scope, receive, send))
+
+@pytest.fixture
+def abandoned_request(client):
+    """request_abandoned_before_body() against the running app"""
+    import main
+    return lambda url, **request_options: request_abandoned_before_body(main.app, url, **request_options)
@@ -0,0 +1,50 @@
+"""Transcript analysis: task mentions found by the Aho-Corasick matcher"""
+import random
+
+import pytest
+
+import main
+from benchmarks.generate_transcript import generate_transcript
+
+# Names that contain, overlap or repeat each other
+OVERLAPPING_TASKS = ["Portaal", "Klantportaal", "Klantportaal login", "login", "Data", "Datamigratie",
+                     "migratie test", "Test", "data"]
+
+def substring_scan(projects: list, text: str) -> set:
+    """The positions the old task proposal loop matched: every task whose name occurs in the text"""
+    return {position for position, task in enumerate(projects) if task['name'].lower() in text}
+
+def matched(projects: list, text: str) -> set:
+    return {position for _, _, positions in main.TaskMatcher(projects).find(text) for position in positions}
+
+@pytest.mark.parametrize("text", [
+    "klantportaal login werkt, de datamigratie test loopt",
+    "het portaal is klaar",
+    "alleen testdata",
+    "niets over taken",
+])
+def test_matcher_finds_what_the_substring_scan_found(text):
+    projects = [{"name": name, "item_id": ""} for name in OVERLAPPING_TASKS]
+    assert matched(projects, text) == substring_scan(projects, text)
+
+def test_matcher_reports_every_occurrence_with_its_span():
+    projects = [{"name": name, "item_id": ""} for name in OVERLAPPING_TASKS]
+    text = "klantportaal login en daarna klantportaal"
+    mentions = sorted((start, end, text[start:end]) for start, end, _ in main.TaskMatcher(projects).find(text))
+    assert mentions == [(0, 12, "klantportaal"), (0, 18, "klantportaal login"), (5, 12, "portaal"),
+                        (13, 18, "login"), (29, 41, "klantportaal"), (34, 41, "portaal")]
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matcher_matches_the_substring_scan_on_generated_transcripts(seed):
+    rnd = random.Random(seed)
+    names = [f"{rnd.choice(['Klant', 'Data', 'Portaal', 'Test'])}{rnd.choice(['', 'migratie', ' login', 'portaal'])}"
+             for _ in range(40)] + OVERLAPPING_TASKS
+    projects = [{"name": name, "item_id": ""} for name in names]
+    text = generate_transcript(3000, names, seed=seed).lower()
+    assert matched(projects, text) == substring_scan(projects, text)
+
+def test_item_ids_only_match_on_their_own():
+    projects = [{"name": "Livegang", "item_id": "1.4"}, {"name": "Nazorg", "item_id": "1.4.1"}]
+    assert matched(projects, "punt 1.4 is klaar") == {0}
+    assert matched(projects, "punt 1.4.1 is klaar.") == {1}
+    assert matched(projects, "versie 11.4 en 1.45 zijn uit") == set()
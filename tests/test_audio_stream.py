@@ -0,0 +1,168 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import main
+from benchmarks.generate_audio import generate_wav
+from benchmarks.stub_whisper import start_stub_whisper
+
+@pytest.fixture
+def stub_client(client):
+    """App client whose transcription client talks to the stub Whisper server"""
+    stub = start_stub_whisper(latency=0.0)
+    previous = main.transcription_client
+    main.transcription_client = main.TranscriptionClient("sk-test", stub.url)
+    try:
+        yield client
+    finally:
+        main.transcription_client = previous
+        stub.shutdown()
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_stream_sends_project_updates_as_json(stub_client):
+    response = stub_client.post("/process-audio/stream",
+                                files={"audio_file": ("meeting.wav", generate_wav(5, seed=1), "audio/wav")})
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    names = [event for event, _ in events]
+    assert "error" not in names
+    assert names[-1] == "done"
+    transcript = next(payload for event, payload in events if event == "transcript")
+    done = events[-1][1]
+    # The stub transcripts contain "... is NN% complete" phrases, so there are updates to serialize
+    assert done["project_updates"]
+    assert transcript["project_updates"] == done["project_updates"]
+    assert set(done["project_updates"][0]) == set(main.ProjectUpdate.model_fields)
+
+def test_job_events_end_with_the_result(stub_client):
+    response = stub_client.post("/process-audio", params={"mode": "job"},
+                                files={"audio_file": ("meeting.wav", generate_wav(5, seed=2), "audio/wav")})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    events = parse_events(stub_client.get(f"/jobs/{job_id}/events").text)
+    assert events[-1][0] == "done"
+    assert events[-1][1]["project_updates"]
+    assert stub_client.get(f"/jobs/{job_id}/result").json()["project_updates"] == events[-1][1]["project_updates"]
+
+def test_transcript_cache_defaults_to_the_private_state_dir(tmp_path, monkeypatch):
+    state_dir = os.path.join(tmp_path, "state")
+    monkeypatch.setattr(main, "STATE_DIR", state_dir)
+    main.private_state_dir.cache_clear()
+    cache = main.TranscriptCache(os.path.join(state_dir, "transcripts.sqlite3"), 1024)
+    try:
+        cache.put("key", "transcript")
+        assert cache.get("key") == "transcript"
+    finally:
+        cache.close()
+        main.private_state_dir.cache_clear()
+    assert os.stat(state_dir).st_mode & 0o777 == 0o700
+
+@pytest.mark.parametrize("size, text", [
+    (512, "512 bytes"), (300 * 1024, "300 KB"), (1536, "1.5 KB"), (1023 * 1024, "1023 KB"),
+    (200 * 1024 * 1024, "200 MB"), (int(1.5 * 1024 * 1024), "1.5 MB"), (3 * 1024 ** 3, "3 GB"),
+])
+def test_format_bytes(size, text):
+    assert main.format_bytes(size) == text
+
+def test_upload_limit_message_below_one_megabyte(client, monkeypatch):
+    limit = next(middleware for middleware in main.app.user_middleware
+                 if middleware.cls is main.AudioUploadLimitMiddleware)
+    monkeypatch.setitem(limit.options, "max_bytes", 300 * 1024)
+    monkeypatch.setattr(main.app, "middleware_stack", main.app.build_middleware_stack())
+    response = client.post("/process-audio", files={"audio_file": ("big.wav", b"\0" * (400 * 1024), "audio/wav")})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Audio file is larger than the 300 KB limit"
+
+def test_stream_work_dir_is_removed_when_the_client_leaves_before_the_body(stub_client, abandoned_request,
+                                                                           tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))  # Where the upload is staged
+    abandoned_request("http://testserver/process-audio/stream",
+                      files={"audio_file": ("meeting.wav", generate_wav(5, seed=3), "audio/wav")})
+    assert [name for name in os.listdir(tmp_path) if name.startswith("audio-")] == []
+
+def test_rate_limited_transcription_is_retried_with_jitter(monkeypatch):
+    stub = start_stub_whisper(latency=0.0, fail_first=2, retry_after=None)
+    delays = []
+    monkeypatch.setattr(main.random, "uniform", lambda low, high: delays.append((low, high)) or 0.0)
+
+    async def transcribe():
+        transcription_client = main.TranscriptionClient("sk-test", stub.url)
+        try:
+            return await transcription_client.transcribe(io.BytesIO(generate_wav(0.5)), "meeting.wav"), \
+                transcription_client.stats()
+        finally:
+            await transcription_client.aclose()
+
+    try:
+        transcript, stats = asyncio.run(transcribe())
+    finally:
+        stub.shutdown()
+    assert transcript.strip()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (3, 2, 0)
+    # Full jitter: a random delay up to the doubling backoff
+    backoff = main.TRANSCRIPTION_BACKOFF_SECONDS
+    assert delays == [(0, backoff), (0, backoff * 2)]
+
+def test_transcription_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(main, "TRANSCRIPTION_MAX_CONCURRENCY", 2)
+    stub = start_stub_whisper(latency=0.2)
+    recording = generate_wav(0.5)
+
+    async def transcribe_all():
+        transcription_client = main.TranscriptionClient("sk-test", stub.url)
+        try:
+            return await asyncio.gather(*(transcription_client.transcribe(io.BytesIO(recording), "meeting.wav")
+                                          for _ in range(6)))
+        finally:
+            await transcription_client.aclose()
+
+    try:
+        transcripts = asyncio.run(transcribe_all())
+    finally:
+        stub.shutdown()
+    assert len(transcripts) == 6 and all(transcripts)
+    assert (stub.requests, stub.max_in_flight) == (6, 2)
+
+def test_full_job_queue_answers_503(client, monkeypatch):
+    queue = main.AudioJobQueue(max_queued=1, workers=0, result_ttl=60)  # Nothing drains it
+    monkeypatch.setattr(main, "audio_jobs", queue)
+    recording = generate_wav(1)
+
+    def submit():
+        return client.post("/process-audio", params={"mode": "job"},
+                           files={"audio_file": ("meeting.wav", recording, "audio/wav")})
+
+    accepted = submit()
+    assert accepted.status_code == 202
+    job = queue.get(accepted.json()["job_id"])
+    try:
+        assert client.get(f"/jobs/{job.id}/result").json()["status"] == "queued"
+        refused = submit()
+        assert refused.status_code == 503
+        assert refused.headers["Retry-After"] == "5"
+        assert (queue.submitted, queue.rejected) == (1, 1)
+    finally:
+        shutil.rmtree(job.work_dir, True)
+
+def test_job_status_moves_through_its_stages(stub_client):
+    response = stub_client.post("/process-audio", params={"mode": "job"},
+                                files={"audio_file": ("meeting.wav", generate_wav(2, seed=4), "audio/wav")})
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    job_id = response.json()["job_id"]
+    events = parse_events(stub_client.get(f"/jobs/{job_id}/events").text)
+    assert [payload["status"] for event, payload in events if event == "status"] == ["queued", "running", "done"]
+    job = stub_client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "done"
+    assert set(job["timings"]) == {"queue_wait", "transcription", "analysis", "total"}
@@ -0,0 +1,9 @@
+"""Cold start: `import main` stays within its time budget and leaves the heavy libraries unloaded"""
+import statistics
+
+from benchmarks.cold_start import COLD_START_BUDGET_SECONDS, LAZY_MODULES, measure_cold_start
+
+def test_cold_start_is_within_budget():
+    timings, loaded = measure_cold_start(runs=3)
+    assert loaded == [], f"imported at startup although loaded lazily (of {', '.join(LAZY_MODULES)})"
+    assert statistics.median(timings) <= COLD_START_BUDGET_SECONDS, timings
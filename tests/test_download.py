@@ -0,0 +1,64 @@
+"""/download-excel validators: conditional requests and byte ranges"""
+import os
+
+import pytest
+
+from benchmarks.generate_workbook import generate_workbook
+
+HEADERS = {"X-Session-Id": "download-test"}
+
+@pytest.fixture(scope="module")
+def session(client, tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("download"), "planning.xlsx")
+    generate_workbook(path, 40, seed=13)
+    with open(path, "rb") as workbook:
+        response = client.post("/upload-excel", headers=HEADERS,
+                               files={"file": ("planning.xlsx", workbook, "application/octet-stream")})
+    assert response.status_code == 200, response.text
+    return response.json()["projects"]
+
+def download(client, response_format: str, **headers):
+    return client.get("/download-excel", params={"format": response_format}, headers={**HEADERS, **headers})
+
+@pytest.mark.parametrize("response_format", ["xlsx", "csv", "json"])
+def test_matching_etag_answers_304_until_an_edit(client, session, response_format):
+    full = download(client, response_format)
+    assert full.status_code == 200
+    etag = full.headers["ETag"]
+    not_modified = download(client, response_format, **{"If-None-Match": etag})
+    assert (not_modified.status_code, not_modified.content) == (304, b"")
+    # Compressed responses carry the weak form of the tag; either form matches
+    weak = etag if etag.startswith("W/") else f"W/{etag}"
+    assert download(client, response_format, **{"If-None-Match": f'"other", {weak}'}).status_code == 304
+
+    task = next(project for project in session if project["name"])
+    update = {"project_name": task["name"], "task_name": task["name"],
+              "new_start_date": "2031-05-06", "new_end_date": "2031-07-08"}
+    assert client.post("/update-excel", headers=HEADERS, json=[update]).status_code == 200
+    changed = download(client, response_format, **{"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+@pytest.mark.parametrize("response_format", ["xlsx", "csv"])
+def test_byte_ranges(client, session, response_format):
+    # Uncompressed, as resuming downloaders ask for it: If-Range needs the strong ETag
+    full = download(client, response_format, **{"Accept-Encoding": "identity"})
+    body, size, etag = full.content, len(full.content), full.headers["ETag"]
+    assert not etag.startswith("W/")
+    ranges = [("bytes=0-9", 0, 9), ("bytes=10-", 10, size - 1), ("bytes=-5", size - 5, size - 1),
+              (f"bytes=5-{size + 100}", 5, size - 1)]
+    for range_header, first, last in ranges:
+        partial = download(client, response_format, Range=range_header)
+        assert partial.status_code == 206, range_header
+        assert partial.content == body[first:last + 1]
+        assert partial.headers["Content-Range"] == f"bytes {first}-{last}/{size}"
+
+    for range_header in (f"bytes={size}-", "bytes=20-10", "bytes=-0"):
+        unsatisfiable = download(client, response_format, Range=range_header)
+        assert unsatisfiable.status_code == 416, range_header
+        assert unsatisfiable.headers["Content-Range"] == f"bytes */{size}"
+
+    # A stale If-Range gets the whole current body instead of a slice of it
+    stale = download(client, response_format, Range="bytes=0-9", **{"If-Range": '"stale"'})
+    assert (stale.status_code, stale.content) == (200, body)
+    assert download(client, response_format, Range="bytes=0-9", **{"If-Range": etag}).status_code == 206
@@ -0,0 +1,57 @@
+"""Observability: the /metrics exposition and logging instead of print()"""
+import ast
+import os
+import re
+
+import main
+from benchmarks.generate_workbook import generate_workbook
+
+SAMPLE = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+def test_metrics_are_in_prometheus_text_format(client, tmp_path):
+    path = os.path.join(tmp_path, "planning.xlsx")
+    generate_workbook(path, 20, seed=14)
+    with open(path, "rb") as workbook:
+        assert client.post("/upload-excel", headers={"X-Session-Id": "metrics"},
+                           files={"file": ("planning.xlsx", workbook, "application/octet-stream")}).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    types, helped, samples = {}, set(), []
+    for line in response.text.splitlines():
+        if line.startswith("# HELP "):
+            helped.add(line.split()[2])
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            assert kind in ("counter", "histogram"), line
+            types[name] = kind
+        else:
+            match = SAMPLE.fullmatch(line)
+            assert match, line
+            samples.append((match.group(1), dict(LABEL.findall(match.group(2) or "")), float(match.group(3))))
+    assert set(types) == helped
+    assert {"gantt_stage_duration_seconds", "gantt_cache_requests_total"} <= set(types)
+
+    for name, labels, value in samples:
+        family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in types else name
+        assert family in types, name
+        if types[family] == "counter":
+            assert value >= 0
+    # Histogram buckets are cumulative and end in +Inf, which equals the series count
+    stage = "gantt_stage_duration_seconds"
+    buckets = [(labels, value) for name, labels, value in samples if name == stage + "_bucket"
+               and labels["stage"] == "parse"]
+    assert [labels["le"] for labels, _ in buckets][-1] == "+Inf"
+    counts = [value for _, value in buckets]
+    assert counts == sorted(counts)
+    count = next(value for name, labels, value in samples if name == stage + "_count" and labels["stage"] == "parse")
+    assert counts[-1] == count >= 1
+
+def test_main_has_no_print_calls():
+    with open(main.__file__) as source:
+        tree = ast.parse(source.read())
+    prints = [node.lineno for node in ast.walk(tree)
+              if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "print"]
+    assert prints == []
@@ -0,0 +1,213 @@
+"""Upload parsing against the original row-by-row parser, and its memory use on large sheets"""
+import datetime
+import os
+import tracemalloc
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import main
+from benchmarks.generate_workbook import generate_workbook
+
+# Hand-written rows on top of the generated ones: every cell type the parsers tell apart. The
+# fractions are ones the legacy int() reads as the parsers' round() does; fractions such as 0.57
+# (int() gave 56) are covered by test_completion_write_back_keeps_the_cell_form.
+EDGE_ROWS = [
+    ["9", "Datum als tekst", None, "Team Alpha", "2024-03-05", "5 maart 2024", None, "In Progress", "35%"],
+    ["9.1", "Breuken", None, " Data ", datetime.datetime(2024, 6, 1), "1 juni 2025", None, None, 0.25],
+    ["9.2", "Breuk als tekst", None, "nan", "binnenkort", None, None, "Delayed", "0.2"],
+    ["9.2.1", "Helemaal klaar", None, None, None, datetime.datetime(2025, 1, 31), None, "Completed", 1],
+    [None, "Autoschade"],
+    [None, "Activiteiten"],
+    [None, None, None, "Team Beta"],
+    ["10", "  Spaties rond de naam  ", None, "Security", "31-12-2024", "2025-02-30", None, "Blocked", "n.v.t."],
+]
+
+def legacy_projects(df: pd.DataFrame) -> list:
+    """The df.iterrows() loop /upload-excel used before the column-wise parser, verbatim but for its DEBUG print
+
+    `datetime` is the module here, as it was in main.py, so isinstance() raises and every date
+    cell goes through str(); legacy_dates() normalizes those strings as ingest does since.
+    """
+    projects = []
+    for index, row in df.iterrows():
+        # Skip rows before row 8 (where headers start)
+        if index < 8:
+            continue
+
+        # Check if this row contains project data
+        project_name = str(row.iloc[1]) if pd.notna(row.iloc[1]) else ""  # Activiteiten column
+        item_id = str(row.iloc[0]) if pd.notna(row.iloc[0]) else ""      # # column
+
+        # Skip if no meaningful data or if it's a header
+        if not project_name.strip() or project_name.strip().lower() in ['activiteiten', 'nan']:
+            continue
+
+        # Skip section headers (like "Generieke services", "Autoschade")
+        if project_name.strip().lower() in ['generieke services', 'autoschade']:
+            continue
+
+        # Extract data from the row
+        team = "Unassigned"  # Default team value
+        start_date = None
+        end_date = None
+        status = "Planning"
+        completed = 0
+        activity_type = "general"
+
+        # Parse team from column 3 (Team column)
+        if len(row) > 3 and pd.notna(row.iloc[3]):
+            team_value = str(row.iloc[3]).strip()
+            if team_value and team_value.lower() != 'nan':
+                team = team_value
+
+        # Parse dates from columns 4 and 5 (Start and End dates)
+        if len(row) > 4 and pd.notna(row.iloc[4]):
+            try:
+                if isinstance(row.iloc[4], datetime):
+                    start_date = row.iloc[4].strftime('%Y-%m-%d')
+                else:
+                    start_date = str(row.iloc[4])
+            except:
+                start_date = str(row.iloc[4]) if pd.notna(row.iloc[4]) else None
+
+        if len(row) > 5 and pd.notna(row.iloc[5]):
+            try:
+                if isinstance(row.iloc[5], datetime):
+                    end_date = row.iloc[5].strftime('%Y-%m-%d')
+                else:
+                    end_date = str(row.iloc[5])
+            except:
+                end_date = str(row.iloc[5]) if pd.notna(row.iloc[5]) else None
+
+        # Parse status from column 7
+        if len(row) > 7 and pd.notna(row.iloc[7]):
+            status = str(row.iloc[7])
+
+        # Parse completion percentage from column 8
+        if len(row) > 8 and pd.notna(row.iloc[8]):
+            try:
+                completed_value = row.iloc[8]
+                if isinstance(completed_value, (int, float)):
+                    # Convert decimal to percentage (e.g., 0.2 -> 20, 1 -> 100)
+                    if completed_value <= 1:
+                        completed = int(completed_value * 100)
+                    else:
+                        completed = int(completed_value)
+                else:
+                    completed_str = str(completed_value).strip()
+                    if '%' in completed_str:
+                        completed = int(completed_str.replace('%', '').strip())
+                    elif completed_str.replace('.', '').isdigit():
+                        completed = int(float(completed_str) * 100)
+                    else:
+                        completed = 0
+            except (ValueError, TypeError):
+                completed = 0
+
+        # Determine activity type based on item ID
+        is_title = False
+        if item_id and item_id.strip() != 'nan':
+            if '.' in item_id:
+                if item_id.count('.') == 1:  # e.g., "1.1", "1.2"
+                    activity_type = "sub-activity"
+                    is_title = False
+                elif item_id.count('.') > 1:  # e.g., "1.4.1"
+                    activity_type = "sub-sub-activity"
+                    is_title = False
+                else:
+                    activity_type = "main-item"
+                    is_title = True
+            elif item_id.isdigit():
+                activity_type = "main-item"
+                is_title = True  # Main items are titles
+            else:
+                # For items without dots, check if they're main activities
+                # Main activities are typically single numbers or have no hierarchical structure
+                activity_type = "main-item"
+                is_title = True
+        else:
+            # If no item_id, treat as main activity
+            activity_type = "main-item"
+            is_title = True
+
+        # Clean up the project name
+        if project_name and project_name.strip() and project_name.strip() != "nan":
+            clean_name = project_name.strip()
+            project_data = {
+                "name": clean_name,
+                "item_id": item_id if item_id.strip() != 'nan' else "",
+                "activity_type": activity_type,
+                "is_title": is_title,
+                "start_date": start_date,
+                "end_date": end_date,
+                "team": team,
+                "status": status,
+                "completed": completed
+            }
+            projects.append(project_data)
+    return projects
+
+def legacy_dates(project: dict) -> dict:
+    """A legacy project with its dates normalized to "YYYY-MM-DD", as ingest has done since"""
+    return dict(project, start_date=main.normalize_date_value(project["start_date"]),
+                end_date=main.normalize_date_value(project["end_date"]))
+
+@pytest.fixture(scope="module", params=[0, 1, 2])
+def mixed_workbook(request, tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("parity"), f"mixed-{request.param}.xlsx")
+    generate_workbook(path, 1200, seed=request.param)
+    workbook = openpyxl.load_workbook(path)
+    for row in EDGE_ROWS:
+        workbook.active.append(row)
+    workbook.save(path)
+    return path
+
+@pytest.mark.parametrize("ingest_mode", ["dataframe", "streaming"])
+def test_parsers_match_the_legacy_loop(mixed_workbook, ingest_mode, monkeypatch):
+    monkeypatch.setattr(main, "EXCEL_INGEST_MODE", ingest_mode)
+    df = pd.read_excel(mixed_workbook)
+    expected = [legacy_dates(project) for project in legacy_projects(df)]
+    workbook = main.parse_workbook(mixed_workbook, "mixed.xlsx")
+    assert workbook.total_rows == len(df)  # The upload response's total_rows
+    parsed = workbook.projects.to_dicts()
+    assert len(parsed) == len(expected) > 1200
+    for position, (project, reference) in enumerate(zip(parsed, expected)):
+        assert project == reference, position
+
+# Streaming ingest keeps one row at a time; what still grows with the sheet is openpyxl's shared
+# strings table (every task name is unique). Building every record or a DataFrame takes far more.
+STREAMING_PEAK_CEILING_BYTES = 24 * 1024 * 1024
+
+def test_streaming_ingest_memory_ceiling(tmp_path):
+    path = os.path.join(tmp_path, "large.xlsx")
+    generate_workbook(path, 100_000)
+    main.preload_modules()  # Library imports are not part of the peak
+    tracemalloc.start()
+    try:
+        rows = sum(1 for _ in main.iter_projects_streaming(path))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert rows == 100_000
+    assert peak < STREAMING_PEAK_CEILING_BYTES, f"peak {peak / 1024 / 1024:.1f} MB"
+
+def test_year_less_dates_follow_the_current_year(monkeypatch):
+    class FrozenDate(datetime.date):
+        today_value = datetime.date(2025, 12, 31)
+
+        @classmethod
+        def today(cls):
+            return cls.today_value
+
+    monkeypatch.setattr(main.datetime, "date", FrozenDate)
+    assert main.normalize_date_value("5 augustus") == "2025-08-05"
+    FrozenDate.today_value = datetime.date(2026, 1, 1)  # A long-running worker crosses New Year
+    assert main.normalize_date_value("5 augustus") == "2026-08-05"
+    assert main.normalize_date_value("29 februari") == "29 februari"  # Not a date in 2026
+    assert main.normalize_date_value("29 februari 2024") == "2024-02-29"
+    FrozenDate.today_value = datetime.date(2028, 6, 1)
+    assert main.normalize_date_value("29 februari") == "2028-02-29"
+    assert main.normalize_date_value("29 Feb") == "2028-02-29"
+    assert main.normalize_date_value("29 februari 2027") == "29 februari 2027"
@@ -0,0 +1,36 @@
+"""Portfolio uploads: many workbooks and sheets as one session"""
+import pytest
+
+import main
+from benchmarks.portfolio import build_portfolio
+
+HEADERS = {"X-Session-Id": "portfolio-test"}
+
+@pytest.fixture(scope="module")
+def portfolio(client, tmp_path_factory):
+    data = build_portfolio(str(tmp_path_factory.mktemp("portfolio")), workbooks=3, rows=40)
+    response = client.post("/upload-portfolio", headers=HEADERS,
+                           files=[("files", ("portfolio.zip", data, "application/zip"))])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_item_id_sort_groups_namespaces_in_outline_order(client, portfolio):
+    response = client.get("/projects", headers=HEADERS, params={"sort": "item_id", "limit": 1000})
+    item_ids = [project["item_id"] for project in response.json()["projects"]]
+    keys = [(namespace, [int(part) for part in outline.split(".")])
+            for namespace, _, outline in (item_id.partition(":") for item_id in item_ids)]
+    assert keys == sorted(keys)
+    assert len({namespace for namespace, _ in keys}) == 4  # The third workbook has two sheets
+
+def test_portfolio_edits_are_not_marked_dirty(client, portfolio):
+    project = client.get("/projects", headers=HEADERS).json()["projects"][0]
+    update = {"project_name": project["name"], "task_name": project["name"],
+              "new_start_date": "2030-01-01", "new_end_date": "2030-02-01"}
+    response = client.post("/update-excel", headers=HEADERS, json=[update])
+    assert response.json()["rows_updated"] >= 1
+    edited = client.get("/projects", headers=HEADERS, params={"name": project["name"]}).json()["projects"]
+    assert edited[0]["start_date"] == "2030-01-01"
+    # Portfolios are never written back into workbooks, so nothing may wait for a write-back
+    dirty = main.workbook_store.shared._connection().execute(
+        "SELECT COUNT(*) FROM tasks WHERE session_id = ? AND dirty != 0", (HEADERS["X-Session-Id"],)).fetchone()[0]
+    assert dirty == 0
@@ -0,0 +1,152 @@
+"""Sessions stored in the session database: reloads after a restart and edits written back on download"""
+import copy
+import datetime
+import io
+import os
+
+import openpyxl
+import pytest
+from openpyxl.styles import Border, Font, PatternFill, Side
+
+import main
+from benchmarks.generate_workbook import generate_workbook
+
+SESSION_HEADERS = {"X-Session-Id": "reload-test"}
+
+@pytest.fixture
+def workbook_bytes(tmp_path):
+    path = os.path.join(tmp_path, "planning.xlsx")
+    generate_workbook(path, 60, seed=3)
+    with open(path, "rb") as workbook:
+        return workbook.read()
+
+def fresh_store() -> main.WorkbookStore:
+    """What a restarted worker starts with: nothing parsed, only the session database"""
+    return main.WorkbookStore(main.SESSION_MAX_ENTRIES, main.SESSION_MAX_BYTES, main.SESSION_TTL_SECONDS,
+                              main.SharedSessionState(main.SESSION_STATE_PATH, main.SESSION_FILES_DIR))
+
+def test_session_reloads_from_the_database_after_a_restart(client, workbook_bytes, monkeypatch):
+    response = client.post("/upload-excel", headers=SESSION_HEADERS,
+                           files={"file": ("planning.xlsx", workbook_bytes, "application/octet-stream")})
+    assert response.status_code == 200, response.text
+    projects = client.get("/projects", headers=SESSION_HEADERS, params={"limit": 500}).json()["projects"]
+    task = next(project for project in projects if project["name"] and not project["is_title"])
+    update = {"project_name": task["name"], "task_name": task["name"],
+              "new_start_date": "2031-02-03", "new_end_date": "2031-04-05"}
+    assert client.post("/update-excel", headers=SESSION_HEADERS, json=[update]).json()["rows_updated"] >= 1
+
+    store = fresh_store()
+    monkeypatch.setattr(main, "workbook_store", store)
+    reloaded = client.get("/projects", headers=SESSION_HEADERS, params={"limit": 500}).json()["projects"]
+    assert store.reloads == 1
+    assert len(reloaded) == len(projects)
+    edited = next(project for project in reloaded if project["name"] == task["name"])
+    assert (edited["start_date"], edited["end_date"]) == ("2031-02-03", "2031-04-05")
+
+    # The reloaded session takes the edit lock on the event loop and writes the edit back
+    response = client.get("/download-excel", headers=SESSION_HEADERS, params={"format": "xlsx"})
+    assert response.status_code == 200
+    sheet = openpyxl.load_workbook(io.BytesIO(response.content)).active
+    rows = [row for row in sheet.iter_rows(values_only=True) if row[1] == task["name"]]
+    assert any(row[main.START_DATE_COLUMN - 1].date().isoformat() == "2031-02-03" for row in rows)
+    store.clear()
+
+# (cell value, number format) before the edit, the edited percentage and the value written back
+COMPLETION_CELLS = [
+    (10, "General", 29, 29),
+    (0, "General", 57, 57),
+    (None, "General", 58, 58),
+    (0.4, "0%", 57, 0.57),
+    (0.5, "General", 29, 0.29),
+    ("40%", "General", 58, "58%"),
+    (35, "General", 1, 0.01),
+]
+
+@pytest.mark.parametrize("use_patch_writer", [True, False])
+def test_completion_write_back_keeps_the_cell_form(tmp_path, monkeypatch, use_patch_writer):
+    path = os.path.join(tmp_path, "completion.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row, (value, number_format, _, _) in enumerate(COMPLETION_CELLS, start=1):
+        sheet.cell(row=row, column=2, value=f"Task {row}")
+        cell = sheet.cell(row=row, column=main.COMPLETION_COLUMN, value=value)
+        cell.number_format = number_format
+    workbook.save(path)
+    if not use_patch_writer:
+        monkeypatch.setattr(main, "patch_xlsx_cells", lambda file_path, cell_updates: False)
+
+    tasks = [(row, main.DIRTY_COMPLETED, None, None, None, completed)
+             for row, (_, _, completed, _) in enumerate(COMPLETION_CELLS, start=1)]
+    main.apply_workbook_updates(path, main.dirty_cell_updates(tasks))
+
+    sheet = openpyxl.load_workbook(path).active
+    cells = [sheet.cell(row=row, column=main.COMPLETION_COLUMN) for row in range(1, len(COMPLETION_CELLS) + 1)]
+    assert [(cell.value, cell.number_format) for cell in cells] == \
+        [(written, number_format) for _, number_format, _, written in COMPLETION_CELLS]
+    # Both parsers read the edited percentages back
+    expected = [completed for _, _, completed, _ in COMPLETION_CELLS]
+    assert [main._project_from_values(tuple(cell.value for cell in sheet[row])).completed
+            for row in range(1, len(COMPLETION_CELLS) + 1)] == expected
+    assert main._completion_column(main.pd.Series([cell.value for cell in cells], dtype=object)).tolist() == expected
+
+def cell_form(cell) -> tuple:
+    """Value, number format, font, fill and border (copied: openpyxl's style proxies do not compare equal)"""
+    return (cell.value, cell.number_format, copy.copy(cell.font), copy.copy(cell.fill), copy.copy(cell.border))
+
+def test_date_write_back_matches_the_openpyxl_path(tmp_path, monkeypatch):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet["B2"], sheet["E2"], sheet["F2"] = "Styled task", "5 maart 2024", datetime.datetime(2024, 4, 1)
+    sheet["E2"].font = Font(bold=True, color="FFC00000")
+    sheet["E2"].fill = PatternFill("solid", fgColor="FFFFFF00")
+    sheet["F2"].number_format = "d-m-yyyy"
+    sheet["F2"].border = Border(bottom=Side(style="thin"))
+    sheet["B3"] = "Plain task"
+    paths = [os.path.join(tmp_path, name) for name in ("patched.xlsx", "openpyxl.xlsx")]
+    for path in paths:
+        workbook.save(path)
+
+    updates = [(2, {main.START_DATE_COLUMN: datetime.datetime(2030, 1, 2),
+                    main.END_DATE_COLUMN: datetime.datetime(2030, 3, 4)}),
+               (3, {main.START_DATE_COLUMN: datetime.datetime(2030, 5, 6)})]
+    assert main.patch_xlsx_cells(paths[0], updates)
+    monkeypatch.setattr(main, "patch_xlsx_cells", lambda file_path, cell_updates: False)
+    main.apply_workbook_updates(paths[1], updates)
+
+    patched, rewritten = (openpyxl.load_workbook(path).active for path in paths)
+    for row in (2, 3):
+        for column in ("B", "E", "F"):
+            assert cell_form(patched[f"{column}{row}"]) == cell_form(rewritten[f"{column}{row}"])
+    assert patched["E2"].value == datetime.datetime(2030, 1, 2)
+    assert patched["E2"].font.b and patched["E2"].fill.fgColor.rgb == "FFFFFF00"
+    assert patched["F2"].number_format == "d-m-yyyy"
+
+def test_state_dir_is_private(tmp_path, monkeypatch):
+    state_dir = os.path.join(tmp_path, "state")
+    os.makedirs(state_dir, mode=0o777)
+    os.chmod(state_dir, 0o777)  # Left behind with loose permissions: tightened on first use
+    monkeypatch.setattr(main, "STATE_DIR", state_dir)
+    main.private_state_dir.cache_clear()
+    try:
+        main.make_state_dir(os.path.join(state_dir, "workbooks"))
+    finally:
+        main.private_state_dir.cache_clear()
+    for directory in (state_dir, os.path.join(state_dir, "workbooks")):
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+
+@pytest.mark.parametrize("stored_path", ["outside.xlsx", os.path.join("workbooks", "..", "outside.xlsx")])
+def test_stored_paths_outside_the_files_dir_are_never_used(tmp_path, stored_path):
+    outside = os.path.join(tmp_path, "outside.xlsx")
+    with open(outside, "wb") as file:
+        file.write(b"not a session file")
+    state = main.SharedSessionState(os.path.join(tmp_path, "sessions.sqlite3"), os.path.join(tmp_path, "workbooks"))
+    try:
+        for session_id in ("loaded", "deleted"):
+            state._connection().execute("INSERT INTO sessions VALUES (?, 'token', ?, 'x.xlsx', 1, 0, 1, 0, 0)",
+                                        (session_id, os.path.join(tmp_path, stored_path)))
+        assert state.load("loaded") is None
+        assert state.lookup("loaded") is None
+        assert state.delete("deleted") is None
+    finally:
+        state.close()
+    assert os.path.exists(outside)
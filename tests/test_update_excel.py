@@ -0,0 +1,109 @@
+"""/upload-excel caching and cleanup, /projects paging, and the task lookups and rollups of /update-excel"""
+import os
+import random
+
+import pytest
+
+import main
+from benchmarks.generate_workbook import generate_workbook
+from benchmarks.run import workbook_variant
+
+def test_upload_cache_hits_only_identical_bytes(client, tmp_path):
+    path = os.path.join(tmp_path, "planning.xlsx")
+    generate_workbook(path, 40, seed=11)
+    with open(path, "rb") as workbook:
+        original = workbook_variant(workbook.read(), 1)
+    changed = workbook_variant(original, 2)
+    assert len(changed) == len(original) and sum(a != b for a, b in zip(original, changed)) == 1
+
+    def upload(data: bytes) -> dict:
+        response = client.post("/upload-excel", headers={"X-Session-Id": "upload-cache"},
+                               files={"file": ("planning.xlsx", data, "application/octet-stream")})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    responses = [upload(data) for data in (original, original, changed, changed)]
+    assert [response["cache_hit"] for response in responses] == [False, True, False, True]
+    assert all(response["projects"] == responses[0]["projects"] for response in responses)
+
+@pytest.fixture(scope="module")
+def paged_session(client, tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp("paging"), "planning.xlsx")
+    generate_workbook(path, 30, seed=12)
+    headers = {"X-Session-Id": "paging"}
+    with open(path, "rb") as workbook:
+        response = client.post("/upload-excel", headers=headers,
+                               files={"file": ("planning.xlsx", workbook, "application/octet-stream")})
+    assert response.status_code == 200, response.text
+    return headers
+
+def test_projects_cursor_is_stale_after_an_edit(client, paged_session):
+    first = client.get("/projects", headers=paged_session, params={"limit": 10}).json()
+    following = client.get("/projects", headers=paged_session, params={"limit": 10, "cursor": first["next_cursor"]})
+    assert following.status_code == 200
+    assert following.json()["projects"][0] != first["projects"][0]
+
+    task = first["projects"][-1]
+    update = {"project_name": task["name"], "task_name": task["name"],
+              "new_start_date": "2030-01-02", "new_end_date": "2030-02-03"}
+    assert client.post("/update-excel", headers=paged_session, params={"match": "exact"},
+                       json=[update]).json()["rows_updated"] >= 1
+    stale = client.get("/projects", headers=paged_session, params={"limit": 10, "cursor": first["next_cursor"]})
+    assert stale.status_code == 409
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "bm90IGpzb24", "WzEsIDJd"])
+def test_projects_rejects_a_bad_cursor(client, paged_session, cursor):
+    response = client.get("/projects", headers=paged_session, params={"limit": 5, "cursor": cursor})
+    assert response.status_code == 400, response.text
+
+def test_projects_rejects_a_tampered_or_foreign_cursor(client, paged_session):
+    cursor = client.get("/projects", headers=paged_session, params={"limit": 5}).json()["next_cursor"]
+    _, version, query_key = main._decode_cursor(cursor)
+    for params in ({"cursor": main._encode_cursor(-5, version, query_key)},  # Negative offset
+                   {"cursor": cursor, "sort": "name"}):  # Issued for another query
+        response = client.get("/projects", headers=paged_session, params={"limit": 5, **params})
+        assert response.status_code == 400, response.text
+
+@pytest.mark.parametrize("match", main.RowIndex.MATCH_MODES)
+def test_lookup_in_a_workbook_without_tasks(client, tmp_path, match):
+    path = os.path.join(tmp_path, "empty.xlsx")
+    generate_workbook(path, 0)
+    headers = {"X-Session-Id": f"empty-{match}"}
+    with open(path, "rb") as workbook:
+        response = client.post("/upload-excel", headers=headers,
+                               files={"file": ("empty.xlsx", workbook, "application/octet-stream")})
+    assert response.status_code == 200, response.text
+    update = {"project_name": "Klantportaal", "task_name": "Klantportaal",
+              "new_start_date": "2025-01-01", "new_end_date": "2025-02-01"}
+    response = client.post("/update-excel", headers=headers, params={"match": match}, json=[update])
+    assert response.status_code == 200, response.text
+    assert response.json()["updates_applied"] == 0
+
+def test_ndjson_upload_is_deleted_when_the_client_leaves_before_the_body(client, abandoned_request, tmp_path):
+    path = os.path.join(tmp_path, "planning.xlsx")
+    generate_workbook(path, 50, seed=7)
+    before = set(os.listdir(main.SESSION_FILES_DIR))
+    with open(path, "rb") as workbook:
+        abandoned_request("http://testserver/upload-excel?format=ndjson", headers={"X-Session-Id": "ndjson-gone"},
+                          files={"file": ("planning.xlsx", workbook.read(), "application/octet-stream")})
+    assert set(os.listdir(main.SESSION_FILES_DIR)) - before == set()
+    assert client.get("/projects", headers={"X-Session-Id": "ndjson-gone"}).status_code == 400
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_incremental_rollups_match_a_full_rebuild(tmp_path, seed):
+    path = os.path.join(tmp_path, "planning.xlsx")
+    generate_workbook(path, 300, seed=seed)
+    workbook = main.parse_workbook(path, "planning.xlsx")
+    workbook.rollups  # Built before the edits, so they go through the incremental path
+    rnd = random.Random(seed)
+    for _ in range(200):
+        position = rnd.randrange(len(workbook.projects))
+        start = rnd.choice([None, "binnenkort", f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"])
+        end = rnd.choice([None, f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"])
+        changes = rnd.choice([{"start_date": start, "end_date": end}, {"completed": rnd.randint(-10, 120)},
+                              {"start_date": start, "completed": rnd.randint(0, 100)}])
+        workbook.update_project(position, **changes)
+
+    rebuilt = main.RollupTree(workbook.projects)
+    for position in range(len(workbook.projects)):
+        assert workbook.rollups.rollup(position) == rebuilt.rollup(position), position